@@ -16,6 +16,7 @@ import pandas as pd
 import numpy as np
 import pickle
 import datetime as dt
+from codec import ObservationCodec
 
 
 class PostgresReader():
@@ -73,40 +74,54 @@ class PostgresReader():
         """
         try:
             connection = psycopg2.connect(user=conn['user'],password=conn['password'],host=conn['host'],port=conn['port'],database=conn['database'])
-            column_names = ["ObservationMetaDataKey","ObservationKey","name","value","timestamps"]
+            column_names = ["ObservationMetaDataKey","ObservationKey","name","value","codec","encodedValue","startTime","samplePeriod","sampleCount"]
             
             sql = """SELECT 
                     fo."ObservationMetaDataKey",
                     fo."ObservationKey",
                     dob."name",
-                    dob."value",
-                    dob."timestamps"
-                    FROM "FactObservation" fo 
-                    INNER JOIN "DimObservation" dob ON (
+                    ov."value",
+                    dob."codec",
+                    ov."encodedValue",
+                    dob."startTime",
+                    dob."samplePeriod",
+                    dob."sampleCount"
+                    FROM mart."FactObservation" fo 
+                    INNER JOIN mart."DimObservation" dob ON (
                         fo."ObservationKey" = dob."ObservationKey"
+                    )
+                    INNER JOIN "ObservationValue" ov ON (
+                        dob."ObservationKey" = ov."ObservationKey" AND dob."loadTimestamp" = ov."loadTimestamp"
                     ) WHERE dob."name" like '%ViMo%' and dob."name" like '%Oxy%'"""
             cursor = connection.cursor()
             cursor.execute(sql)
             tuples_list = cursor.fetchall()
 
-            groupHbo2DF = pd.DataFrame(tuples_list, columns=column_names)
+            groupHbo2DF = self.decodeValues(pd.DataFrame(tuples_list, columns=column_names))
             
             
             sql = """SELECT 
                     fo."ObservationMetaDataKey",
                     fo."ObservationKey",
                     dob."name",
-                    dob."value",
-                    dob."timestamps"
-                    FROM "FactObservation" fo 
-                    INNER JOIN "DimObservation" dob ON (
+                    ov."value",
+                    dob."codec",
+                    ov."encodedValue",
+                    dob."startTime",
+                    dob."samplePeriod",
+                    dob."sampleCount"
+                    FROM mart."FactObservation" fo 
+                    INNER JOIN mart."DimObservation" dob ON (
                         fo."ObservationKey" = dob."ObservationKey"
+                    )
+                    INNER JOIN "ObservationValue" ov ON (
+                        dob."ObservationKey" = ov."ObservationKey" AND dob."loadTimestamp" = ov."loadTimestamp"
                     ) WHERE dob."name" like '%ViMo%' and dob."name" like '%Deoxy%'"""
             cursor = connection.cursor()
             cursor.execute(sql)
             tuples_list = cursor.fetchall()
 
-            groupHbR2DF = pd.DataFrame(tuples_list, columns=column_names)
+            groupHbR2DF = self.decodeValues(pd.DataFrame(tuples_list, columns=column_names))
             
             return groupHbo2DF,groupHbR2DF
 
@@ -131,23 +146,30 @@ class PostgresReader():
         """
         try:
             connection = psycopg2.connect(user=conn['user'],password=conn['password'],host=conn['host'],port=conn['port'],database=conn['database'])
-            column_names = ["ObservationMetaDataKey","ObservationKey","name","value","timestamps"]
+            column_names = ["ObservationMetaDataKey","ObservationKey","name","value","codec","encodedValue","startTime","samplePeriod","sampleCount"]
               
             sql = """SELECT 
                     fo."ObservationMetaDataKey",
                     fo."ObservationKey",
                     dob."name",
-                    dob."value"[1:array_upper(dob."value", 1)][1:2],
-                    dob."timestamps"
-                    FROM "FactObservation" fo 
-                    INNER JOIN "DimObservation" dob ON (
+                    ov."value"[1:array_upper(ov."value", 1)][1:2],
+                    dob."codec",
+                    ov."encodedValue",
+                    dob."startTime",
+                    dob."samplePeriod",
+                    dob."sampleCount"
+                    FROM mart."FactObservation" fo 
+                    INNER JOIN mart."DimObservation" dob ON (
                         fo."ObservationKey" = dob."ObservationKey"
+                    )
+                    INNER JOIN "ObservationValue" ov ON (
+                        dob."ObservationKey" = ov."ObservationKey" AND dob."loadTimestamp" = ov."loadTimestamp"
                     ) WHERE dob."name" like '%Viso%' and dob."name" like '%Oxy%'"""
             cursor = connection.cursor()
             cursor.execute(sql)
             tuples_list = cursor.fetchall()
 
-            groupHbo2DF = pd.DataFrame(tuples_list, columns=column_names)
+            groupHbo2DF = self.decodeValues(pd.DataFrame(tuples_list, columns=column_names), 1, 2)
             
             return groupHbo2DF
 
@@ -158,36 +180,128 @@ class PostgresReader():
                 cursor.close()
                 connection.close()
 
-    def readObservationDataFromEnterpriseLayer(self,conn)-> pd.core.frame.DataFrame:
+    def decodeValues(self, df, firstChannel = None, lastChannel = None) -> pd.core.frame.DataFrame:
         """
-        this method reads data from postgre and returns observation for a single subject
+        
+        decodes the observations stored with a codec by the staging layer into the value column and removes the codec and encodedValue columns,
+        the observations stored as real arrays keep the value read from postgres
+
+        Args:
+            df : a pandas dataframe of observations with value, codec and encodedValue columns, encodedValue holds an encoded matrix or a list of encoded tiles
+            firstChannel : first channel kept from the decoded matrices, the channels are numbered from 1. Defaults to None which keeps all the channels.
+            lastChannel : last channel kept from the decoded matrices. Defaults to None which keeps all the channels.
+
+        Returns:
+            pd.core.frame.DataFrame: the dataframe with the decoded matrices as lists of samples in the value column
+        """
+        codec = ObservationCodec()
+        channels = slice(firstChannel - 1 if firstChannel else None, lastChannel)
+        
+        def decode(encodedValue, codecName) -> list:
+            tiles = encodedValue if isinstance(encodedValue, list) else [encodedValue]
+            return np.vstack([codec.decode(tile, codecName) for tile in tiles])[:, channels].tolist()
+        
+        df['value'] = [decode(encodedValue, codecName) if codecName else value for value, codecName, encodedValue in zip(df['value'], df['codec'], df['encodedValue'])]
+        return df.drop(columns=['codec', 'encodedValue'])
+    
+    def expandTimestamps(self, df) -> pd.core.frame.DataFrame:
+        """
+        
+        adds the timestamps of every sample to the observations read from postgres, the timestamp of a sample is the start time 
+        plus the sample number times the sampling period
+
+        Args:
+            df : a pandas dataframe of observations with startTime, samplePeriod and sampleCount columns
+
+        Returns:
+            pd.core.frame.DataFrame: the dataframe with a timestamps column containing an array of timestamps for each observation
+            
+        Example:
+        >>> expandTimestamps(pd.DataFrame({'startTime': ['2022-10-01 00:00:00'], 'samplePeriod': [0.5], 'sampleCount': [3]}))['timestamps'][0]
+        ['2022-10-01T00:00:00.000000', '2022-10-01T00:00:00.500000', '2022-10-01T00:00:01.000000']
+        """
+        df['timestamps'] = [np.datetime64(pd.Timestamp(startTime), 'us') + np.round(np.arange(int(sampleCount)) * (float(samplePeriod) * 1e6)).astype('timedelta64[us]')
+                            for startTime, samplePeriod, sampleCount in zip(df['startTime'], df['samplePeriod'], df['sampleCount'])]
+        return df
+    
+    def readObservationChannelsFromEnterpriseLayer(self, conn, name, firstChannel, lastChannel, startTime = None, endTime = None) -> pd.core.frame.DataFrame:
+        """
+        this method reads a range of channels of an observation from postgre, when the observation is stored as tiles in SatObservationChunk
+        only the tiles overlapping startTime to endTime are read and the channels are sliced from the tiles in postgres
 
         Args:
             conn: Connection parameters
+            name: name of the observation
+            firstChannel: first channel to be read, the channels are numbered from 1
+            lastChannel: last channel to be read
+            startTime: the time from which the tiles are read, None reads from the first sample. Defaults to None.
+            endTime: the time up to which the tiles are read, None reads up to the last sample. Defaults to None.
 
         Returns:
-            pd.core.frame.DataFrame: a pandas dataframe containing observation data for a patient for one channel
+            pd.core.frame.DataFrame: a pandas dataframe containing the samples of the channels for the observation
 
+        Example:
+        >>> readObservationChannelsFromEnterpriseLayer(conn, 'VM0001_Moto_HBA_Probe1_Deoxy', 1, 1)
         """
         try:
             connection = psycopg2.connect(user=conn['user'],password=conn['password'],host=conn['host'],port=conn['port'],database=conn['database'])
-            column_names = ["ObservationMetaDataKey","ObservationKey","name","value","timestamps"]
+            column_names = ["ObservationMetaDataKey","ObservationKey","name","loadTimestamp","value","codec","encodedValue","startTime","samplePeriod","sampleCount"]
+            parameters = {'name': name, 'firstChannel': firstChannel, 'lastChannel': lastChannel, 'startTime': startTime, 'endTime': endTime}
             
+            sql = """SELECT 
+                    fo."ObservationMetaDataKey",
+                    doc."ObservationKey",
+                    doc."name",
+                    doc."loadTimestamp",
+                    soc."value"[1:doc."sampleCount"][%(firstChannel)s:%(lastChannel)s],
+                    doc."codec",
+                    soc."encodedValue",
+                    doc."chunkStart",
+                    doc."samplePeriod",
+                    doc."sampleCount"
+                    FROM mart."FactObservation" fo 
+                    INNER JOIN mart."DimObservationChunk" doc ON (
+                        fo."ObservationKey" = doc."ObservationKey"
+                    )
+                    INNER JOIN "SatObservationChunk" soc ON (
+                        doc."ObservationKey" = soc."sequence" AND doc."loadTimestamp" = soc."timestamp" AND doc."chunkStart" = soc."chunkStart"
+                    ) WHERE doc."name" = %(name)s 
+                    AND doc."chunkStart" <= coalesce(%(endTime)s, 'infinity'::timestamp)
+                    AND doc."chunkStart" + doc."sampleCount" * doc."samplePeriod" * interval '1 second' > coalesce(%(startTime)s, '-infinity'::timestamp)
+                    ORDER BY fo."ObservationMetaDataKey", doc."loadTimestamp", doc."chunkStart" """
+            cursor = connection.cursor()
+            cursor.execute(sql, parameters)
+            chunks = self.decodeValues(pd.DataFrame(cursor.fetchall(), columns=column_names), firstChannel, lastChannel)
+            
+            if not chunks.empty:
+                # the tiles of every version of an observation are put together in the order of their start time
+                df = chunks.groupby(["ObservationMetaDataKey","ObservationKey","name","loadTimestamp"], sort=False).agg(
+                    value=("value", lambda values: sum(values, [])), startTime=("startTime", "first"),
+                    samplePeriod=("samplePeriod", "first"), sampleCount=("sampleCount", "sum")).reset_index()
+                return df.drop(columns=["loadTimestamp"])
+            
+            # the observations stored as a single matrix are sliced from SatObservationValue
             sql = """SELECT 
                     fo."ObservationMetaDataKey",
                     fo."ObservationKey",
                     dob."name",
-                    dob."value"[1:array_upper(dob."value", 1)][1:1],
-                    dob."timestamps"
-                    FROM "FactObservation" fo 
-                    INNER JOIN "DimObservation" dob ON (
+                    ov."value"[1:array_upper(ov."value", 1)][%(firstChannel)s:%(lastChannel)s],
+                    dob."codec",
+                    ov."encodedValue",
+                    dob."startTime",
+                    dob."samplePeriod",
+                    dob."sampleCount"
+                    FROM mart."FactObservation" fo 
+                    INNER JOIN mart."DimObservation" dob ON (
                         fo."ObservationKey" = dob."ObservationKey"
-                    ) WHERE dob."name" = 'VM0001_Moto_HBA_Probe1_Deoxy'"""
-            cursor = connection.cursor()
-            cursor.execute(sql)
+                    )
+                    INNER JOIN "ObservationValue" ov ON (
+                        dob."ObservationKey" = ov."ObservationKey" AND dob."loadTimestamp" = ov."loadTimestamp"
+                    ) WHERE dob."name" = %(name)s"""
+            cursor.execute(sql, parameters)
             tuples_list = cursor.fetchall()
 
-            df = pd.DataFrame(tuples_list, columns=column_names)
+            df = self.decodeValues(pd.DataFrame(tuples_list, columns=[column for column in column_names if column != "loadTimestamp"]), firstChannel, lastChannel)
             return df
 
         except (Exception, Error) as error:
@@ -197,9 +311,9 @@ class PostgresReader():
                 cursor.close()
                 connection.close()
     
-    def readBoxPlotObservationDataFromEnterpriseLayer(self,conn)-> pd.core.frame.DataFrame:
+    def readObservationDataFromEnterpriseLayer(self,conn)-> pd.core.frame.DataFrame:
         """
-        this method reads data from postgre and returns observation for a single subject for two intervals
+        this method reads data from postgre and returns observation for a single subject
 
         Args:
             conn: Connection parameters
@@ -208,33 +322,20 @@ class PostgresReader():
             pd.core.frame.DataFrame: a pandas dataframe containing observation data for a patient for one channel
 
         """
-        try:
-            connection = psycopg2.connect(user=conn['user'],password=conn['password'],host=conn['host'],port=conn['port'],database=conn['database'])
-            column_names = ["ObservationMetaDataKey","ObservationKey","name","value","timestamps"]
-            
-            sql = """SELECT 
-                    fo."ObservationMetaDataKey",
-                    fo."ObservationKey",
-                    dob."name",
-                    dob."value"[1:array_upper(dob."value", 1)][1:2],
-                    dob."timestamps"
-                    FROM "FactObservation" fo 
-                    INNER JOIN "DimObservation" dob ON (
-                        fo."ObservationKey" = dob."ObservationKey"
-                    ) WHERE dob."name" = 'VM0001_Moto_HBA_Probe1_Deoxy'"""
-            cursor = connection.cursor()
-            cursor.execute(sql)
-            tuples_list = cursor.fetchall()
+        return self.readObservationChannelsFromEnterpriseLayer(conn, 'VM0001_Moto_HBA_Probe1_Deoxy', 1, 1)
+    
+    def readBoxPlotObservationDataFromEnterpriseLayer(self,conn)-> pd.core.frame.DataFrame:
+        """
+        this method reads data from postgre and returns observation for a single subject for two intervals
 
-            df = pd.DataFrame(tuples_list, columns=column_names)
-            return df
+        Args:
+            conn: Connection parameters
 
-        except (Exception, Error) as error:
-            print("Error while connecting to PostgreSQL", error)
-        finally:
-            if connection:
-                cursor.close()
-                connection.close()
+        Returns:
+            pd.core.frame.DataFrame: a pandas dataframe containing observation data for a patient for one channel
+
+        """
+        return self.readObservationChannelsFromEnterpriseLayer(conn, 'VM0001_Moto_HBA_Probe1_Deoxy', 1, 2)
 
 
     def readKeyvalueFromEnterpriseLayer(self,conn)-> Iterable[Union[pd.core.frame.DataFrame, dict]]:
@@ -255,11 +356,11 @@ class PostgresReader():
             sql = """select 
                         dmd."key",
                         dmd."value"
-                    from "FactObservation" fo
-                    INNER JOIN "DimMetaData" dmd ON (
+                    from mart."FactObservation" fo
+                    INNER JOIN mart."DimMetaData" dmd ON (
                         dmd."MetaDataKey" = fo."MetaDataKey"
                     )
-                    INNER JOIn "DimObservation" dob ON (
+                    INNER JOIn mart."DimObservation" dob ON (
                         dob."ObservationKey" = fo."ObservationKey"
                     ) WHERE dob."name" = 'VM0001_Moto_HBA_Probe1_Deoxy'"""
             cursor = connection.cursor()
@@ -302,11 +403,11 @@ class PostgresReader():
                         de."title",
                         df."name",
                         df."levelValue"
-                    from "FactTreatmentFactors" ftf
-                    INNER JOIN "DimExperiment" de ON (
+                    from mart."FactTreatmentFactors" ftf
+                    INNER JOIN mart."DimExperiment" de ON (
                         de."ExperimentKey" = ftf."Experimentkey"
                     )
-                    INNER JOIN "DimFactor" df ON (
+                    INNER JOIN mart."DimFactor" df ON (
                         df."FactorKey" = ftf."Factorkey"
                     )"""
             cursor = connection.cursor()
@@ -342,11 +443,11 @@ class PostgresReader():
             sql = """select 
                         dg."name",
                         ds."name"
-                    from "FactAssignedTo" fat 
-                    INNER JOIN "DimGroup" dg ON (
+                    from mart."FactAssignedTo" fat 
+                    INNER JOIN mart."DimGroup" dg ON (
                         dg."GroupKey" = fat."GroupKey"
                     )
-                    INNER JOIN "DimSubject" ds ON (
+                    INNER JOIN mart."DimSubject" ds ON (
                         fat."ExperimentalUnitKey" = ds."SubjectKey"
                     ) WHERE ds."name" LIKE 'Subj%'"""
             cursor = connection.cursor()
@@ -383,11 +484,11 @@ class PostgresReader():
             sql = """select 
                         dg."name",
                         ds."name"
-                    from "FactAssignedTo" fat 
-                    INNER JOIN "DimGroup" dg ON (
+                    from mart."FactAssignedTo" fat 
+                    INNER JOIN mart."DimGroup" dg ON (
                         dg."GroupKey" = fat."GroupKey"
                     )
-                    INNER JOIN "DimSubject" ds ON (
+                    INNER JOIN mart."DimSubject" ds ON (
                         fat."ExperimentalUnitKey" = ds."SubjectKey"
                     ) WHERE ds."name" LIKE 'Autism%'"""
             cursor = connection.cursor()
@@ -522,7 +623,8 @@ if __name__ == '__main__':
     print("port :", connectionParameters['port'])
     print("database :",connectionParameters['database'])
     
-    df = pgr.readObservationDataFromEnterpriseLayer(connectionParameters)
+    # the timestamps are expanded only for the observation that is plotted against time
+    df = pgr.expandTimestamps(pgr.readObservationDataFromEnterpriseLayer(connectionParameters))
     dflist = df['value'].tolist()
     observationy = np.ravel(dflist).tolist()
     timelist = df['timestamps'].tolist()
@@ -1,4 +1,10 @@
 \connect smdvault;
+-- concatenates the tiles of SatObservationChunk along the sample dimension
+CREATE AGGREGATE "arrayConcatenate"(anycompatiblearray) (
+	SFUNC = array_cat,
+	STYPE = anycompatiblearray
+);
+
 CREATE VIEW "FactObservation" AS (
 	select 
 		omd."sequence" AS "ObservationMetaDataKey",
@@ -13,18 +19,87 @@ CREATE VIEW "FactObservation" AS (
 	)
 );
 
+-- the matrix of every version of an observation, the information mart keeps the key and load timestamp of the observations and
+-- InformationDelivery reads the matrices from SatObservationValue and SatObservationChunk with them
+CREATE VIEW "ObservationValue" AS (
+	select 
+		sov."sequence" AS "ObservationKey",
+		sov."timestamp" AS "loadTimestamp",
+		-- the observations stored as tiles are put together only when a query selects the value
+		coalesce(sov."value", (
+			select "arrayConcatenate"(soc."value" order by soc."chunkStart")
+			from "SatObservationChunk" soc
+			where soc."sequence" = sov."sequence" and soc."timestamp" = sov."timestamp"
+		)) AS "value",
+		-- the observations compressed by the staging layer are decoded by InformationDelivery from the encoded matrix or its encoded tiles
+		case when sov."encodedValue" is not null then array[sov."encodedValue"] else (
+			select array_agg(soc."encodedValue" order by soc."chunkStart")
+			from "SatObservationChunk" soc
+			where soc."sequence" = sov."sequence" and soc."timestamp" = sov."timestamp" and soc."encodedValue" is not null
+		) end AS "encodedValue"
+	from "SatObservationValue" sov
+);
+
 CREATE VIEW "DimObservation" AS (
 	select 
 		ho."sequence" AS "ObservationKey",
 		son."name",
-		sov."value",
-		sov."timestamps"
+		sov."timestamp" AS "loadTimestamp",
+		ov."value",
+		coalesce(sov."codec", (
+			select min(soc."codec")
+			from "SatObservationChunk" soc
+			where soc."sequence" = sov."sequence" and soc."timestamp" = sov."timestamp"
+		)) AS "codec",
+		ov."encodedValue",
+		sov."startTime",
+		sov."samplePeriod",
+		sov."sampleCount",
+		-- the timestamps are expanded from the time axis only when a query selects them
+		array(
+			select sov."startTime" + sampleNumber * sov."samplePeriod" * interval '1 second'
+			from generate_series(0, sov."sampleCount" - 1) AS sampleNumber
+			order by sampleNumber
+		) AS "timestamps"
 	from "HubObservation" ho
+	-- the latest versions of the satellites are joined on the load timestamps of the point in time table
+	INNER JOIN "PitObservation" pit ON (
+		ho."sequence" = pit."sequence"
+	)
 	INNER JOIN "SatObservationName" son ON (
-		ho."sequence" = son."sequence"
+		pit."sequence" = son."sequence" and pit."SatObservationName" = son."timestamp"
 	)
 	INNER JOIN "SatObservationValue" sov ON (
-		ho."sequence" = sov."sequence"
+		pit."sequence" = sov."sequence" and pit."SatObservationValue" = sov."timestamp"
+	)
+	INNER JOIN "ObservationValue" ov ON (
+		sov."sequence" = ov."ObservationKey" and sov."timestamp" = ov."loadTimestamp"
+	)
+);
+
+CREATE VIEW "DimObservationChunk" AS (
+	select 
+		ho."sequence" AS "ObservationKey",
+		son."name",
+		soc."timestamp" AS "loadTimestamp",
+		soc."chunkStart",
+		soc."sampleCount",
+		sov."samplePeriod",
+		soc."value",
+		soc."codec",
+		soc."encodedValue"
+	from "HubObservation" ho
+	INNER JOIN "PitObservation" pit ON (
+		ho."sequence" = pit."sequence"
+	)
+	INNER JOIN "SatObservationName" son ON (
+		pit."sequence" = son."sequence" and pit."SatObservationName" = son."timestamp"
+	)
+	INNER JOIN "SatObservationValue" sov ON (
+		pit."sequence" = sov."sequence" and pit."SatObservationValue" = sov."timestamp"
+	)
+	INNER JOIN "SatObservationChunk" soc ON (
+		sov."sequence" = soc."sequence" and sov."timestamp" = soc."timestamp"
 	)
 );
 
@@ -42,16 +117,13 @@ CREATE VIEW "DimMetaData" AS(
 
 CREATE VIEW "FactTreatmentFactors" AS (
 	select 
-		he."sequence" AS "Experimentkey",
-		hf."sequence" AS "Factorkey",
-		ht."sequence" AS "Treatmentkey",
+		betf."experiment" AS "Experimentkey",
+		betf."factor" AS "Factorkey",
+		betf."treatment" AS "Treatmentkey",
 		hf."isCofactor"
-	from "HubExperiment" he
+	from "BridgeExperimentTreatmentFactor" betf
 	INNER JOIN "HubFactor" hf ON (
-		he."sequence" = hf."experiment"
-	)
-	INNER JOIN "HubTreatment" ht ON (
-		he."sequence" = ht."sequence"
+		betf."factor" = hf."sequence"
 	)
 );
 
@@ -61,11 +133,14 @@ CREATE VIEW "DimExperiment" AS (
 		st."title",
 		sa."acronym"
 	from "HubExperiment" he 
+	INNER JOIN "PitExperiment" pit ON (
+		he."sequence" = pit."sequence"
+	)
 	INNER JOIN "SatExperimentTitle" st ON (
-		he."sequence" = st."sequence"
+		pit."sequence" = st."sequence" and pit."SatExperimentTitle" = st."timestamp"
 	)
 	INNER JOIN "SatExperimentAcronym" sa ON (
-		he."sequence" = sa."sequence"
+		pit."sequence" = sa."sequence" and pit."SatExperimentAcronym" = sa."timestamp"
 	)
 );
 
@@ -75,11 +150,14 @@ CREATE VIEW "DimFactor" AS (
 		sfn."name",
 		sfl."levelValue"
 	from "HubFactor" hf 
+	INNER JOIN "PitFactor" pit ON (
+		hf."sequence" = pit."sequence"
+	)
 	INNER JOIN "SatFactorName" sfn ON (
-		hf."sequence" = sfn."sequence"
+		pit."sequence" = sfn."sequence" and pit."SatFactorName" = sfn."timestamp"
 	)
 	INNER JOIN "SatFactorLevel" sfl ON (
-		hf."sequence" = sfl."sequence"
+		pit."sequence" = sfl."sequence" and pit."SatFactorLevel" = sfl."timestamp"
 	)
 );
 
@@ -101,8 +179,11 @@ CREATE VIEW "DimSession" AS (
 		hs."sequence" AS "SessionKey",
 		ssn."name"
 	from "HubSession" hs 
+	INNER JOIN "PitSession" pit ON (
+		hs."sequence" = pit."sequence"
+	)
 	INNER JOIN "SatSessionName" ssn ON (
-		hs."sequence" = ssn."sequence"
+		pit."sequence" = ssn."sequence" and pit."SatSessionName" = ssn."timestamp"
 	)
 );
 
@@ -125,8 +206,11 @@ CREATE VIEW "DimGroup" AS (
 		hg."sequence" AS "GroupKey",
 		sgn."name"
 	from "HubGroup" hg
+	INNER JOIN "PitGroup" pit ON (
+		hg."sequence" = pit."sequence"
+	)
 	INNER JOIN "SatGroupName" sgn ON (
-		hg."sequence" = sgn."sequence"
+		pit."sequence" = sgn."sequence" and pit."SatGroupName" = sgn."timestamp"
 	)
 );
 
@@ -136,11 +220,14 @@ CREATE VIEW "DimSubject" AS (
 		ssn."name",
 		ssa."age"
 	from "HubSubject" hs
+	INNER JOIN "PitSubject" pit ON (
+		hs."sequence" = pit."sequence"
+	)
 	INNER JOIN "SatSubjectName" ssn ON (
-		hs."sequence" = ssn."sequence"
+		pit."sequence" = ssn."sequence" and pit."SatSubjectName" = ssn."timestamp"
 	)
 	INNER JOIN "SatSubjectAge" ssa ON (
-		hs."sequence" = ssa."sequence"
+		pit."sequence" = ssa."sequence" and pit."SatSubjectAge" = ssa."timestamp"
 	)
 );
 
@@ -192,4 +279,165 @@ CREATE VIEW "FactParticipants" AS (
 	INNER JOIN "SatExperimentalUnitIdentifier" seui ON (
 		seui."sequence" = pi."sequence"
 	)
-);
\ No newline at end of file
+);
+
+CREATE VIEW "FactExperimentalUnitObservation" AS (
+	select 
+		beuo."observation" AS "ObservationKey",
+		beuo."experimentalUnit" AS "ExperimentalUnitKey",
+		beuo."group" AS "GroupKey",
+		beuo."session" AS "SessionKey"
+	from "BridgeExperimentalUnitObservation" beuo
+);
+
+-- the information mart is materialized as tables of the mart schema with the rows of the views above and indexes on their keys,
+-- InformationDelivery reads these tables so that the dashboard does not run the joins of the views on the vault for every query
+CREATE SCHEMA mart;
+CREATE TABLE mart."FactObservation" AS SELECT * FROM "FactObservation" WITH NO DATA;
+CREATE INDEX ON mart."FactObservation"("ObservationMetaDataKey");
+CREATE INDEX ON mart."FactObservation"("ObservationKey");
+CREATE INDEX ON mart."FactObservation"("MetaDataKey");
+-- the observation dimensions keep the time axis and codec of the observations without their matrices and timestamps, the matrices are read from the vault
+-- with the key and load timestamp of the observation, the refresh inserts the columns of the mart table only
+CREATE TABLE mart."DimObservation" AS SELECT "ObservationKey","name","loadTimestamp","codec","startTime","samplePeriod","sampleCount" FROM "DimObservation" WITH NO DATA;
+CREATE INDEX ON mart."DimObservation"("ObservationKey");
+CREATE INDEX ON mart."DimObservation"("name");
+CREATE TABLE mart."DimObservationChunk" AS SELECT "ObservationKey","name","loadTimestamp","chunkStart","sampleCount","samplePeriod","codec" FROM "DimObservationChunk" WITH NO DATA;
+CREATE INDEX ON mart."DimObservationChunk"("ObservationKey");
+CREATE INDEX ON mart."DimObservationChunk"("name","chunkStart");
+CREATE TABLE mart."DimMetaData" AS SELECT * FROM "DimMetaData" WITH NO DATA;
+CREATE INDEX ON mart."DimMetaData"("MetaDataKey");
+CREATE TABLE mart."FactTreatmentFactors" AS SELECT * FROM "FactTreatmentFactors" WITH NO DATA;
+CREATE INDEX ON mart."FactTreatmentFactors"("Experimentkey");
+CREATE INDEX ON mart."FactTreatmentFactors"("Factorkey");
+CREATE TABLE mart."DimExperiment" AS SELECT * FROM "DimExperiment" WITH NO DATA;
+CREATE INDEX ON mart."DimExperiment"("ExperimentKey");
+CREATE TABLE mart."DimFactor" AS SELECT * FROM "DimFactor" WITH NO DATA;
+CREATE INDEX ON mart."DimFactor"("FactorKey");
+CREATE TABLE mart."DimTreatment" AS SELECT * FROM "DimTreatment" WITH NO DATA;
+CREATE INDEX ON mart."DimTreatment"("TreatmentKey");
+CREATE TABLE mart."DimSession" AS SELECT * FROM "DimSession" WITH NO DATA;
+CREATE INDEX ON mart."DimSession"("SessionKey");
+CREATE TABLE mart."FactSessionMetaData" AS SELECT * FROM "FactSessionMetaData" WITH NO DATA;
+CREATE INDEX ON mart."FactSessionMetaData"("SessionMetaDataKey");
+CREATE INDEX ON mart."FactSessionMetaData"("SessionKey");
+CREATE INDEX ON mart."FactSessionMetaData"("MetaDataKey");
+CREATE TABLE mart."DimGroup" AS SELECT * FROM "DimGroup" WITH NO DATA;
+CREATE INDEX ON mart."DimGroup"("GroupKey");
+CREATE TABLE mart."DimSubject" AS SELECT * FROM "DimSubject" WITH NO DATA;
+CREATE INDEX ON mart."DimSubject"("SubjectKey");
+CREATE INDEX ON mart."DimSubject"("name");
+CREATE TABLE mart."FactAttendsSession" AS SELECT * FROM "FactAttendsSession" WITH NO DATA;
+CREATE INDEX ON mart."FactAttendsSession"("AttendsSessionKey");
+CREATE INDEX ON mart."FactAttendsSession"("ExperimentalUnitKey");
+CREATE INDEX ON mart."FactAttendsSession"("SessionKey");
+CREATE INDEX ON mart."FactAttendsSession"("GroupKey");
+CREATE TABLE mart."FactAssignedTo" AS SELECT * FROM "FactAssignedTo" WITH NO DATA;
+CREATE INDEX ON mart."FactAssignedTo"("AssignedToKey");
+CREATE INDEX ON mart."FactAssignedTo"("ExperimentalUnitKey");
+CREATE INDEX ON mart."FactAssignedTo"("GroupKey");
+CREATE TABLE mart."FactParticipants" AS SELECT * FROM "FactParticipants" WITH NO DATA;
+CREATE INDEX ON mart."FactParticipants"("ParticipatesInKey");
+CREATE INDEX ON mart."FactParticipants"("ExperimentalUnitKey");
+CREATE INDEX ON mart."FactParticipants"("ExperimentKey");
+CREATE TABLE mart."FactExperimentalUnitObservation" AS SELECT * FROM "FactExperimentalUnitObservation" WITH NO DATA;
+CREATE INDEX ON mart."FactExperimentalUnitObservation"("ObservationKey");
+CREATE INDEX ON mart."FactExperimentalUnitObservation"("ExperimentalUnitKey");
+CREATE INDEX ON mart."FactExperimentalUnitObservation"("SessionKey");
+
+-- the mart tables and the column holding their key, every mart table is refreshed for the keys of the vault rows of the loads not refreshed yet
+CREATE TABLE mart."MartTable"("martTable" text PRIMARY KEY,"martKey" text not null);
+-- the vault tables a mart table is built from and the column holding the key of the mart table, a vault table that does not hold the key
+-- has a vaultJoin from the vault table, named v, to the table holding the key, named k
+CREATE TABLE mart."MartSource"("martTable" text REFERENCES mart."MartTable"("martTable"),"vaultTable" text,"vaultKey" text,"vaultJoin" text,PRIMARY KEY("martTable","vaultTable"));
+INSERT INTO mart."MartTable"("martTable","martKey") VALUES
+	('FactObservation','ObservationMetaDataKey'),
+	('DimObservation','ObservationKey'),
+	('DimObservationChunk','ObservationKey'),
+	('DimMetaData','MetaDataKey'),
+	('FactTreatmentFactors','Experimentkey'),
+	('DimExperiment','ExperimentKey'),
+	('DimFactor','FactorKey'),
+	('DimTreatment','TreatmentKey'),
+	('DimSession','SessionKey'),
+	('FactSessionMetaData','SessionMetaDataKey'),
+	('DimGroup','GroupKey'),
+	('DimSubject','SubjectKey'),
+	('FactAttendsSession','AttendsSessionKey'),
+	('FactAssignedTo','AssignedToKey'),
+	('FactParticipants','ParticipatesInKey'),
+	('FactExperimentalUnitObservation','ObservationKey');
+INSERT INTO mart."MartSource"("martTable","vaultTable","vaultKey") VALUES
+	('FactObservation','ObservationMetaData','sequence'),
+	('DimObservation','HubObservation','sequence'),
+	('DimObservation','SatObservationName','sequence'),
+	('DimObservation','SatObservationValue','sequence'),
+	('DimObservation','SatObservationChunk','sequence'),
+	('DimObservationChunk','HubObservation','sequence'),
+	('DimObservationChunk','SatObservationName','sequence'),
+	('DimObservationChunk','SatObservationValue','sequence'),
+	('DimObservationChunk','SatObservationChunk','sequence'),
+	('DimMetaData','HubMetaData','sequence'),
+	('DimMetaData','SatMetaDataKeyValuePair','sequence'),
+	('FactTreatmentFactors','BridgeExperimentTreatmentFactor','experiment'),
+	('DimExperiment','HubExperiment','sequence'),
+	('DimExperiment','SatExperimentTitle','sequence'),
+	('DimExperiment','SatExperimentAcronym','sequence'),
+	('DimFactor','HubFactor','sequence'),
+	('DimFactor','SatFactorName','sequence'),
+	('DimFactor','SatFactorLevel','sequence'),
+	('DimTreatment','HubTreatment','sequence'),
+	('DimTreatment','SatTreatmentFactorLevel','sequence'),
+	('DimSession','HubSession','sequence'),
+	('DimSession','SatSessionName','sequence'),
+	('FactSessionMetaData','SessionMetaData','sequence'),
+	('DimGroup','HubGroup','sequence'),
+	('DimGroup','SatGroupName','sequence'),
+	('DimSubject','HubSubject','sequence'),
+	('DimSubject','SatSubjectName','sequence'),
+	('DimSubject','SatSubjectAge','sequence'),
+	('FactAttendsSession','AttendsSession','sequence'),
+	('FactAssignedTo','AssignedTo','sequence'),
+	('FactParticipants','ParticipatesIn','sequence'),
+	('FactParticipants','SatExperimentalUnitIdentifier','sequence'),
+	('FactExperimentalUnitObservation','BridgeExperimentalUnitObservation','observation');
+-- the level of a treatment is read from SatFactorLevel through the factor level of SatTreatmentFactorLevel
+INSERT INTO mart."MartSource"("martTable","vaultTable","vaultKey","vaultJoin") VALUES
+	('DimTreatment','SatFactorLevel','sequence','JOIN "SatTreatmentFactorLevel" k ON k."factorLevel" = v."sequence"');
+
+-- refreshes the mart tables incrementally, the loads of LoadLog that are not refreshed are marked refreshed and the rows of every key with vault rows
+-- loaded at or after the earliest of these loads, or at or after since, are deleted from the mart table and the columns of the mart table are selected again from its view.
+-- A load is logged in the transaction that commits its rows, so a load committed while the refresh runs is left for the next refresh whatever the timestamp of its rows.
+-- Called with since after loading the vault without logging the load in LoadLog
+CREATE FUNCTION "refreshInformationMart"(since timestamp DEFAULT NULL) RETURNS void AS $$
+DECLARE
+	mt record;
+	changedKeys text;
+	martColumns text;
+	refreshFrom timestamp;
+BEGIN
+	-- a refresh waiting for a running refresh marks the loads committed after the running refresh marked its loads
+	PERFORM 1 FROM mart."MartTable" FOR UPDATE;
+	WITH refreshed AS (UPDATE public."LoadLog" SET "refreshed" = true WHERE NOT "refreshed" RETURNING "timestamp")
+	SELECT least(min("timestamp"), since) INTO refreshFrom FROM refreshed;
+	IF refreshFrom IS NULL THEN
+		RETURN;
+	END IF;
+	
+	FOR mt IN SELECT * FROM mart."MartTable" ORDER BY "martTable" LOOP
+		SELECT string_agg(format('SELECT %s.%I FROM %I v %s WHERE v."timestamp" >= $1',
+			CASE WHEN ms."vaultJoin" IS NULL THEN 'v' ELSE 'k' END, ms."vaultKey", ms."vaultTable", coalesce(ms."vaultJoin", '')), ' UNION ')
+		INTO changedKeys
+		FROM mart."MartSource" ms WHERE ms."martTable" = mt."martTable";
+		SELECT string_agg(quote_ident(a.attname), ',' ORDER BY a.attnum) INTO martColumns
+		FROM pg_attribute a WHERE a.attrelid = format('mart.%I', mt."martTable")::regclass AND a.attnum > 0 AND NOT a.attisdropped;
+		
+		EXECUTE format('DELETE FROM mart.%I WHERE %I IN (%s)', mt."martTable", mt."martKey", changedKeys) USING refreshFrom;
+		EXECUTE format('INSERT INTO mart.%I (%s) SELECT %s FROM public.%I WHERE %I IN (%s)', mt."martTable", martColumns, martColumns, mt."martTable", mt."martKey", changedKeys)
+			USING refreshFrom;
+	END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- the mart tables are filled with the rows already loaded in the vault
+SELECT "refreshInformationMart"('-infinity');
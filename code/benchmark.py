@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from staging import FileReader
+
+
+"""
+
+Benchmark
+--------------------------------------
+
+This python file compares the readers used in the staging layer against the parsers they replace on synthetic data
+shaped like the raw data of the Pre-autism dataset, the timings are printed to the console.
+
+Execute the benchmark from the code folder, the number of rows and columns can be passed as arguments
+    python benchmark.py <rows> <columns>
+
+"""
+class ReaderBenchmark():
+    """
+    ReaderBenchmark writes a synthetic whitespace delimited data file and times each reader on it
+
+    """
+
+    def __init__(self, rows = 50000, columns = 48, repeat = 3):
+        """
+        this constructor sets the shape of the synthetic data file and the number of times each reader is run
+        """
+        self.rows = rows
+        self.columns = columns
+        self.repeat = repeat
+
+    def writeDataFile(self, fileName) -> np.ndarray:
+        """
+        writes a synthetic .wl1 like file with tab seperated values and returns the values written
+
+        Args:
+            fileName : path of the file to be written
+
+        Returns:
+            np.ndarray: a 2D array of values written to the file
+        """
+        values = np.random.default_rng(0).normal(size=(self.rows, self.columns)).round(6)
+        np.savetxt(fileName, values, fmt='%.6f', delimiter='\t')
+        return values
+
+    def timeReader(self, name, reader) -> pd.core.frame.DataFrame:
+        """
+        runs a reader repeat times, prints the best time and returns the data read
+
+        Args:
+            name : name of the reader printed with the timing
+            reader : a function without arguments returning a pandas dataframe
+
+        Returns:
+            pd.core.frame.DataFrame: data returned by the reader
+        """
+        timings = []
+        for i in range(self.repeat):
+            start = time.perf_counter()
+            data = reader()
+            timings.append(time.perf_counter() - start)
+
+        print("%-45s %8.3f s" % (name, min(timings)))
+        return data
+
+    def run(self) -> None:
+        """
+        times np.genfromtxt against FileReader.readDataFile for float64, float32, a subset of columns and several chunk sizes
+        and checks that both readers produce the same array
+        """
+        r = FileReader()
+
+        with tempfile.TemporaryDirectory() as folder:
+            fileName = os.path.join(folder, 'benchmark.wl1')
+            self.writeDataFile(fileName)
+            print("data file : %d rows x %d columns, %.1f MB" % (self.rows, self.columns, os.path.getsize(fileName) / 1e6))
+
+            expected = self.timeReader("np.genfromtxt", lambda: pd.DataFrame(np.genfromtxt(fileName)))
+            actual = self.timeReader("readDataFile float64", lambda: r.readDataFile(fileName))
+            print("same array as np.genfromtxt :", np.array_equal(expected.values, actual.values))
+
+            self.timeReader("readDataFile float32", lambda: r.readDataFile(fileName, np.float32))
+            self.timeReader("readDataFile float64 first 8 columns", lambda: r.readDataFile(fileName, columns=list(range(8))))
+            for chunkSize in [1000, 10000, 100000]:
+                self.timeReader("readDataFile float64 chunkSize %d" % chunkSize, lambda: r.readDataFile(fileName, chunkSize=chunkSize))
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    ReaderBenchmark(*arguments).run()
@@ -0,0 +1,80 @@
+import struct
+import zlib
+import numpy as np
+
+
+"""
+
+Codec
+--------------------------------------
+
+This python file holds the codecs of the observation matrices shared by the staging layer, which encodes them before they are loaded
+into SatObservationValue and SatObservationChunk, and InformationDelivery, which decodes them for the GUI.
+
+"""
+class ObservationCodec():
+    """
+    
+    ObservationCodec encodes the observation matrices as bytes for the compressed storage of SatObservationValue and decodes them back to numpy arrays
+    
+    The float32 codec stores the little endian float32 buffer of a matrix, which is decoded without parsing an array. The delta codec stores the
+    differences between consecutive samples of every channel taken on the bits of the float32 values, the bytes of the differences are grouped
+    by significance and compressed with zlib. The slowly changing fNIRS signals give small differences whose high bytes are mostly zero and compress well.
+    Both codecs keep the float32 values exactly, as the real arrays of SatObservationValue do. Every encoded matrix starts with its number of samples and channels.
+    
+    """
+    
+    codecs = ['float32', 'delta']
+    
+    def encode(self, values, codec) -> bytes:
+        """
+        
+        encodes a matrix of samples by channels with the given codec
+
+        Args:
+            values : a 2D numpy array with a row for every sample
+            codec : 'float32' or 'delta'
+
+        Returns:
+            bytes: the encoded matrix
+        
+        >>> Example: 
+        >>> decode(encode(np.array([[1.5, 2.0], [1.75, 2.25]]), 'delta'), 'delta')
+        >>> array([[1.5 , 2.  ], [1.75, 2.25]], dtype=float32)
+        """
+        values = np.ascontiguousarray(values, dtype='<f4')
+        # a single channel is given as a 1D array of samples
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
+        elif values.ndim != 2:
+            values = values.reshape(len(values), -1)
+        header = struct.pack('<ii', *values.shape)
+        if codec == 'float32':
+            return header + values.tobytes()
+        if codec == 'delta':
+            # integer differences of the float bits wrap around and are undone exactly by the cumulative sum in decode
+            bits = values.view('<i4')
+            differences = np.diff(bits, axis=0, prepend=np.zeros((1, bits.shape[1]), dtype='<i4'))
+            return header + zlib.compress(differences.view(np.uint8).reshape(-1, 4).T.tobytes(), 6)
+        raise ValueError("unknown observation codec " + str(codec))
+    
+    def decode(self, data, codec) -> np.ndarray:
+        """
+        
+        decodes a matrix encoded by encode
+
+        Args:
+            data : the encoded matrix
+            codec : the codec the matrix was encoded with
+
+        Returns:
+            np.ndarray: a 2D float32 array with a row for every sample
+        """
+        data = bytes(data)
+        shape = struct.unpack('<ii', data[:8])
+        if codec == 'float32':
+            return np.frombuffer(data, dtype='<f4', offset=8).reshape(shape)
+        if codec == 'delta':
+            differences = np.frombuffer(zlib.decompress(data[8:]), dtype=np.uint8).reshape(4, -1).T.copy().view('<i4').reshape(shape)
+            return np.cumsum(differences, axis=0, dtype='<i4').view('<f4')
+        raise ValueError("unknown observation codec " + str(codec))
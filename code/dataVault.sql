@@ -1,29 +1,129 @@
 create database smdvault;
 \connect smdvault;
-create table "HubExperiment"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY ("sequence","timestamp","source"));
-create table "HubTreatment"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"experiment" text not null REFERENCES "HubExperiment"("sequence"),PRIMARY KEY ("sequence","timestamp","source"));
-create table "HubFactor"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"experiment" text not null REFERENCES "HubExperiment"("sequence"),"isCofactor" bool DEFAULT false,PRIMARY KEY("sequence","timestamp","source","experiment"));
-create table "SatFactorName"("sequence" text not null REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatFactorLevel"("sequence" text not null unique REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,"source" text not null,"levelValue"  varchar(40),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatTreatmentFactorLevel"("sequence" text not null REFERENCES "HubTreatment"("sequence"),"timestamp" timestamp not null,"source" text not null,"factorLevel"  text not null REFERENCES "SatFactorLevel"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatExperimentTitle"("sequence" text not null REFERENCES "HubExperiment"("sequence"),"timestamp" timestamp not null,"source" text not null,"title"  varchar(255),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatExperimentAcronym"("sequence" text not null REFERENCES "HubExperiment"("sequence"),"timestamp" timestamp not null,"source" text not null,"acronym"  varchar(15),PRIMARY KEY("sequence","timestamp","source"));
-create table "HubExperimentalUnit"("sequence" text not null unique ,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
-create table "ParticipatesIn"("sequence" text not null unique ,"timestamp" timestamp not null,"source" text not null,"experimentalUnit" text not null REFERENCES "HubExperimentalUnit"("sequence"),"experiment" text not null REFERENCES "HubExperiment"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatExperimentalUnitIdentifier"("sequence" text not null REFERENCES "ParticipatesIn"("sequence"),"timestamp" timestamp not null,"source" text not null,"ID" varchar(15),PRIMARY KEY("sequence","timestamp","source"));
-create table "HubSubject"("sequence" text not null unique REFERENCES "HubExperimentalUnit"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatSubjectAge"("sequence" text not null REFERENCES "HubSubject"("sequence"),"timestamp" timestamp not null,"source" text not null,"age" int,PRIMARY KEY("sequence","timestamp","source"));
-create table "SatSubjectName"("sequence" text not null REFERENCES "HubSubject"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
-create table "HubGroup"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"treatment" text not null REFERENCES "HubTreatment"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "AssignedTo"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"experimentalUnit" text not null REFERENCES "HubExperimentalUnit"("sequence"),"group" text not null REFERENCES "HubGroup"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatGroupName"("sequence" text not null REFERENCES "HubGroup"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
-create table "HubSession"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
-create table "SatSessionName"("sequence" text not null REFERENCES "HubSession"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
-create table "AttendsSession"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"experimentalUnit" text not null REFERENCES "HubExperimentalUnit"("sequence"),"group" text not null REFERENCES "HubGroup"("sequence"),"session" text not null REFERENCES "HubSession"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "HubObservation"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"collectedAtSession" text not null REFERENCES "HubSession"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatObservationName"("sequence" text not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatObservationValue"("sequence" text not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"source" text not null,"value" float(8)[][],"timestamps" timestamp[],PRIMARY KEY("sequence","timestamp","source"));
-create table "HubMetaData"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
-create table "ObservationMetaData"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"observation" text not null REFERENCES "HubObservation"("sequence"),"metadata" text not null REFERENCES "HubMetaData"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "SessionMetaData"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"session" text not null REFERENCES "HubSession"("sequence"),"metadata" text not null REFERENCES "HubMetaData"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
-create table "SatMetaDataKeyValuePair"("sequence" text not null REFERENCES "HubMetaData"("sequence"),"timestamp" timestamp not null,"source" text not null,"key" varchar(40) not null,"value" bytea,PRIMARY KEY("sequence","timestamp","source"));
\ No newline at end of file
+create table "HubExperiment"("sequence" uuid not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY ("sequence","timestamp","source"));
+create table "HubTreatment"("sequence" uuid not null unique,"timestamp" timestamp not null,"source" text not null,"experiment" uuid not null REFERENCES "HubExperiment"("sequence"),PRIMARY KEY ("sequence","timestamp","source"));
+create table "HubFactor"("sequence" uuid not null unique,"timestamp" timestamp not null,"source" text not null,"experiment" uuid not null REFERENCES "HubExperiment"("sequence"),"isCofactor" bool DEFAULT false,PRIMARY KEY("sequence","timestamp","source","experiment"));
+create table "SatFactorName"("sequence" uuid not null REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatFactorLevel"("sequence" uuid not null unique REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,"source" text not null,"levelValue"  varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatTreatmentFactorLevel"("sequence" uuid not null REFERENCES "HubTreatment"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"factorLevel" uuid not null REFERENCES "SatFactorLevel"("sequence"),PRIMARY KEY("sequence","factorLevel","timestamp","source"));
+create table "SatExperimentTitle"("sequence" uuid not null REFERENCES "HubExperiment"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"title"  varchar(255),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatExperimentAcronym"("sequence" uuid not null REFERENCES "HubExperiment"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"acronym"  varchar(15),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubExperimentalUnit"("sequence" uuid not null unique ,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
+create table "ParticipatesIn"("sequence" uuid not null unique ,"timestamp" timestamp not null,"source" text not null,"experimentalUnit" uuid not null REFERENCES "HubExperimentalUnit"("sequence"),"experiment" uuid not null REFERENCES "HubExperiment"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatExperimentalUnitIdentifier"("sequence" uuid not null REFERENCES "ParticipatesIn"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"ID" varchar(15),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubSubject"("sequence" uuid not null unique REFERENCES "HubExperimentalUnit"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatSubjectAge"("sequence" uuid not null REFERENCES "HubSubject"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"age" int,PRIMARY KEY("sequence","timestamp","source"));
+create table "SatSubjectName"("sequence" uuid not null REFERENCES "HubSubject"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubGroup"("sequence" uuid not null unique,"timestamp" timestamp not null,"source" text not null,"treatment" uuid not null REFERENCES "HubTreatment"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "AssignedTo"("sequence" uuid not null,"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"experimentalUnit" uuid not null REFERENCES "HubExperimentalUnit"("sequence"),"group" uuid not null REFERENCES "HubGroup"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatGroupName"("sequence" uuid not null REFERENCES "HubGroup"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubSession"("sequence" uuid not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
+create table "SatSessionName"("sequence" uuid not null REFERENCES "HubSession"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "AttendsSession"("sequence" uuid not null,"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"experimentalUnit" uuid not null REFERENCES "HubExperimentalUnit"("sequence"),"group" uuid not null REFERENCES "HubGroup"("sequence"),"session" uuid not null REFERENCES "HubSession"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubObservation"("sequence" uuid not null unique,"timestamp" timestamp not null,"source" text not null,"collectedAtSession" uuid not null REFERENCES "HubSession"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatObservationName"("sequence" uuid not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatObservationValue"("sequence" uuid not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"value" float(8)[][],"codec" text,"encodedValue" bytea,"startTime" timestamp,"samplePeriod" float(8),"sampleCount" integer,"experimentType" varchar(15),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatObservationChunk"("sequence" uuid not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"chunkStart" timestamp not null,"sampleCount" integer,"value" float(8)[][],"codec" text,"encodedValue" bytea,PRIMARY KEY("sequence","chunkStart","timestamp","source"));
+alter table "SatObservationValue" alter column "encodedValue" set storage external;
+alter table "SatObservationChunk" alter column "encodedValue" set storage external;
+create table "HubMetaData"("sequence" uuid not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
+create table "ObservationMetaData"("sequence" uuid not null,"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"observation" uuid not null REFERENCES "HubObservation"("sequence"),"metadata" uuid not null REFERENCES "HubMetaData"("sequence"),PRIMARY KEY("sequence","observation","timestamp","source"));
+create table "SessionMetaData"("sequence" uuid not null,"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"session" uuid not null REFERENCES "HubSession"("sequence"),"metadata" uuid not null REFERENCES "HubMetaData"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatMetaDataKeyValuePair"("sequence" uuid not null REFERENCES "HubMetaData"("sequence"),"timestamp" timestamp not null,"source" text not null,"hashDiff" text,"key" varchar(40) not null,"value" bytea,PRIMARY KEY("sequence","key","timestamp","source"));
+
+-- every load of the vault with the earliest load timestamp of its rows, written in the transaction that commits the rows, the information mart refreshes the loads that are not refreshed yet
+create table "LoadLog"("load" bigint GENERATED ALWAYS AS IDENTITY,"timestamp" timestamp not null,"source" text not null,"refreshed" bool not null DEFAULT false,PRIMARY KEY("load"));
+create index if not exists "LoadLog_refreshed_idx" on "LoadLog"("timestamp") where not "refreshed";
+
+-- point in time tables of the hubs, the load timestamp of the latest row of every satellite for each hub key, updated by the staging layer after every load
+create table if not exists "PitExperiment"("sequence" uuid not null REFERENCES "HubExperiment"("sequence"),"timestamp" timestamp not null,"SatExperimentTitle" timestamp,"SatExperimentAcronym" timestamp,PRIMARY KEY("sequence"));
+create table if not exists "PitFactor"("sequence" uuid not null REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,"SatFactorName" timestamp,"SatFactorLevel" timestamp,PRIMARY KEY("sequence"));
+create table if not exists "PitSubject"("sequence" uuid not null REFERENCES "HubSubject"("sequence"),"timestamp" timestamp not null,"SatSubjectName" timestamp,"SatSubjectAge" timestamp,PRIMARY KEY("sequence"));
+create table if not exists "PitGroup"("sequence" uuid not null REFERENCES "HubGroup"("sequence"),"timestamp" timestamp not null,"SatGroupName" timestamp,PRIMARY KEY("sequence"));
+create table if not exists "PitSession"("sequence" uuid not null REFERENCES "HubSession"("sequence"),"timestamp" timestamp not null,"SatSessionName" timestamp,PRIMARY KEY("sequence"));
+create table if not exists "PitObservation"("sequence" uuid not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"SatObservationName" timestamp,"SatObservationValue" timestamp,PRIMARY KEY("sequence"));
+-- bridge tables of the keys along the paths Experiment, Treatment, Factor and ExperimentalUnit, Group, Session, Observation, updated by the staging layer after every load
+create table if not exists "BridgeExperimentTreatmentFactor"("experiment" uuid not null REFERENCES "HubExperiment"("sequence"),"treatment" uuid not null REFERENCES "HubTreatment"("sequence"),"factor" uuid not null REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,PRIMARY KEY("experiment","treatment","factor"));
+create table if not exists "BridgeExperimentalUnitObservation"("experimentalUnit" uuid not null REFERENCES "HubExperimentalUnit"("sequence"),"group" uuid not null REFERENCES "HubGroup"("sequence"),"session" uuid not null REFERENCES "HubSession"("sequence"),"observation" uuid not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,PRIMARY KEY("experimentalUnit","group","session","observation"));
+
+-- indexes on the foreign keys of the links and hubs joined by the information mart and on the observation names filtered by the dashboard, migration.py applies them to existing vaults
+create index if not exists "HubTreatment_experiment_idx" on "HubTreatment"("experiment");
+create index if not exists "HubFactor_experiment_idx" on "HubFactor"("experiment");
+create index if not exists "SatTreatmentFactorLevel_factorLevel_idx" on "SatTreatmentFactorLevel"("factorLevel");
+create index if not exists "ParticipatesIn_experimentalUnit_idx" on "ParticipatesIn"("experimentalUnit");
+create index if not exists "ParticipatesIn_experiment_idx" on "ParticipatesIn"("experiment");
+create index if not exists "HubGroup_treatment_idx" on "HubGroup"("treatment");
+create index if not exists "AssignedTo_experimentalUnit_idx" on "AssignedTo"("experimentalUnit");
+create index if not exists "AssignedTo_group_idx" on "AssignedTo"("group");
+create index if not exists "AttendsSession_experimentalUnit_idx" on "AttendsSession"("experimentalUnit");
+create index if not exists "AttendsSession_group_idx" on "AttendsSession"("group");
+create index if not exists "AttendsSession_session_idx" on "AttendsSession"("session");
+create index if not exists "HubObservation_collectedAtSession_idx" on "HubObservation"("collectedAtSession");
+create index if not exists "ObservationMetaData_observation_idx" on "ObservationMetaData"("observation");
+create index if not exists "ObservationMetaData_metadata_idx" on "ObservationMetaData"("metadata");
+create index if not exists "SessionMetaData_session_idx" on "SessionMetaData"("session");
+create index if not exists "SessionMetaData_metadata_idx" on "SessionMetaData"("metadata");
+create index if not exists "SatObservationName_name_idx" on "SatObservationName"("name");
+create index if not exists "BridgeExperimentTreatmentFactor_factor_idx" on "BridgeExperimentTreatmentFactor"("factor");
+create index if not exists "BridgeExperimentalUnitObservation_observation_idx" on "BridgeExperimentalUnitObservation"("observation");
+-- indexes on the load timestamps, the point in time, bridge and information mart tables are updated with the rows of the latest loads
+create index if not exists "ObservationMetaData_timestamp_idx" on "ObservationMetaData"("timestamp");
+create index if not exists "HubObservation_timestamp_idx" on "HubObservation"("timestamp");
+create index if not exists "SatObservationName_timestamp_idx" on "SatObservationName"("timestamp");
+create index if not exists "SatObservationValue_timestamp_idx" on "SatObservationValue"("timestamp");
+create index if not exists "SatObservationChunk_timestamp_idx" on "SatObservationChunk"("timestamp");
+create index if not exists "HubMetaData_timestamp_idx" on "HubMetaData"("timestamp");
+create index if not exists "SatMetaDataKeyValuePair_timestamp_idx" on "SatMetaDataKeyValuePair"("timestamp");
+create index if not exists "HubExperiment_timestamp_idx" on "HubExperiment"("timestamp");
+create index if not exists "HubFactor_timestamp_idx" on "HubFactor"("timestamp");
+create index if not exists "HubTreatment_timestamp_idx" on "HubTreatment"("timestamp");
+create index if not exists "SatExperimentTitle_timestamp_idx" on "SatExperimentTitle"("timestamp");
+create index if not exists "SatExperimentAcronym_timestamp_idx" on "SatExperimentAcronym"("timestamp");
+create index if not exists "SatFactorName_timestamp_idx" on "SatFactorName"("timestamp");
+create index if not exists "SatFactorLevel_timestamp_idx" on "SatFactorLevel"("timestamp");
+create index if not exists "SatTreatmentFactorLevel_timestamp_idx" on "SatTreatmentFactorLevel"("timestamp");
+create index if not exists "HubSession_timestamp_idx" on "HubSession"("timestamp");
+create index if not exists "SatSessionName_timestamp_idx" on "SatSessionName"("timestamp");
+create index if not exists "SessionMetaData_timestamp_idx" on "SessionMetaData"("timestamp");
+create index if not exists "HubGroup_timestamp_idx" on "HubGroup"("timestamp");
+create index if not exists "SatGroupName_timestamp_idx" on "SatGroupName"("timestamp");
+create index if not exists "HubSubject_timestamp_idx" on "HubSubject"("timestamp");
+create index if not exists "SatSubjectName_timestamp_idx" on "SatSubjectName"("timestamp");
+create index if not exists "SatSubjectAge_timestamp_idx" on "SatSubjectAge"("timestamp");
+create index if not exists "AttendsSession_timestamp_idx" on "AttendsSession"("timestamp");
+create index if not exists "AssignedTo_timestamp_idx" on "AssignedTo"("timestamp");
+create index if not exists "ParticipatesIn_timestamp_idx" on "ParticipatesIn"("timestamp");
+create index if not exists "SatExperimentalUnitIdentifier_timestamp_idx" on "SatExperimentalUnitIdentifier"("timestamp");
+create index if not exists "BridgeExperimentTreatmentFactor_timestamp_idx" on "BridgeExperimentTreatmentFactor"("timestamp");
+create index if not exists "BridgeExperimentalUnitObservation_timestamp_idx" on "BridgeExperimentalUnitObservation"("timestamp");
+
+-- unlogged copies of the vault tables without keys, the loader copies a batch into them and merges it into the vault tables with INSERT ... SELECT
+create schema staging;
+create unlogged table staging."HubExperiment"(like "HubExperiment" including defaults);
+create unlogged table staging."HubTreatment"(like "HubTreatment" including defaults);
+create unlogged table staging."HubFactor"(like "HubFactor" including defaults);
+create unlogged table staging."SatFactorName"(like "SatFactorName" including defaults);
+create unlogged table staging."SatFactorLevel"(like "SatFactorLevel" including defaults);
+create unlogged table staging."SatTreatmentFactorLevel"(like "SatTreatmentFactorLevel" including defaults);
+create unlogged table staging."SatExperimentTitle"(like "SatExperimentTitle" including defaults);
+create unlogged table staging."SatExperimentAcronym"(like "SatExperimentAcronym" including defaults);
+create unlogged table staging."HubExperimentalUnit"(like "HubExperimentalUnit" including defaults);
+create unlogged table staging."ParticipatesIn"(like "ParticipatesIn" including defaults);
+create unlogged table staging."SatExperimentalUnitIdentifier"(like "SatExperimentalUnitIdentifier" including defaults);
+create unlogged table staging."HubSubject"(like "HubSubject" including defaults);
+create unlogged table staging."SatSubjectAge"(like "SatSubjectAge" including defaults);
+create unlogged table staging."SatSubjectName"(like "SatSubjectName" including defaults);
+create unlogged table staging."HubGroup"(like "HubGroup" including defaults);
+create unlogged table staging."AssignedTo"(like "AssignedTo" including defaults);
+create unlogged table staging."SatGroupName"(like "SatGroupName" including defaults);
+create unlogged table staging."HubSession"(like "HubSession" including defaults);
+create unlogged table staging."SatSessionName"(like "SatSessionName" including defaults);
+create unlogged table staging."AttendsSession"(like "AttendsSession" including defaults);
+create unlogged table staging."HubObservation"(like "HubObservation" including defaults);
+create unlogged table staging."SatObservationName"(like "SatObservationName" including defaults);
+create unlogged table staging."SatObservationValue"(like "SatObservationValue" including defaults);
+create unlogged table staging."SatObservationChunk"(like "SatObservationChunk" including defaults);
+create unlogged table staging."HubMetaData"(like "HubMetaData" including defaults);
+create unlogged table staging."ObservationMetaData"(like "ObservationMetaData" including defaults);
+create unlogged table staging."SessionMetaData"(like "SessionMetaData" including defaults);
+create unlogged table staging."SatMetaDataKeyValuePair"(like "SatMetaDataKeyValuePair" including defaults);
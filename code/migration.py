@@ -0,0 +1,610 @@
+import os
+import re
+import pickle
+import argparse
+import datetime as dt
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2 import Error
+from staging import FileReader, FileLoader
+
+
+"""
+
+Migration
+--------------------------------------
+
+This python file upgrades a data vault created by an earlier version of dataVault.sql, down to the first version of the script, to the tables of the
+current script: it creates the staging schema and the missing tables, adds the missing columns, replaces the timestamps of the observations by their
+time axis, converts the md5 text keys to uuid and the text arrays of the metadata to numbers and applies the primary keys, indexes, point in time
+and bridge tables of the script. It can also partition the SatObservationValue table by experiment type, the tables keep their rows and the views
+of the information mart are created again.
+
+Execute the migration from the code folder with the postgres connection parameters of config.txt
+    python migration.py
+    python migration.py --partition
+
+"""
+class VaultMigration():
+    """
+    VaultMigration brings an existing data vault up to date with dataVault.sql
+
+    The steps of the migration follow the order the tables depend on each other. The staging schema and the tables of the script missing in the vault
+    are created first, then the columns of the script missing in a table are added to the table and to its staging copy. The timestamps array of
+    SatObservationValue, stored by the first version of the script, is replaced by the startTime, samplePeriod and sampleCount of the time axis. The key
+    columns stored as md5 text are converted to the uuid columns of the script, the uuid of a key holds the 16 bytes of its md5 hash, so the keys loaded
+    before and after the conversion are the same. The primary keys that differ from the script are replaced, then the indexes are read from the create
+    index statements of the script and the point in time and bridge tables from its create table if not exists statements, which are skipped when they
+    exist so the migration can run more than once. The new tables are filled from all the rows of the vault.
+    The rows loaded before the hashDiff column was added are given the hashDiff the staging layer computes for them, so loading them again does
+    not store new versions.
+    The experimentType of SatObservationValue is filled from the acronym of the experiment of every observation.
+
+    The views selecting from the vault tables are dropped before the first step and created again from their definitions after the last one. The
+    views of the first version of InformationMart.sql select the timestamps column, when it is dropped the information mart is created again
+    by InformationMart.sql.
+
+    partitionObservationValues turns SatObservationValue into a table partitioned by list of experimentType, with a partition for every experiment
+    type of experimentTypes and a default partition for any other type. The loaders of the staging layer fill experimentType, so a partitioned vault
+    is loaded like an unpartitioned one.
+
+    """
+
+    # experiment types written by the transformers of the staging layer, every experiment type gets its own partition of SatObservationValue
+    experimentTypes = ['VM', 'PreAutism']
+    # acronyms of the Visuomotor experiments, the other experiments of the vault are Pre-autism recordings
+    vmAcronyms = ['ViMo', 'Viso', 'Moto', 'Rest']
+
+    def __init__(self, connectionParameters, vaultScript = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dataVault.sql'),
+                 martScript = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'InformationMart.sql')):
+        """
+        this constructor sets the postgres connection parameters, the path of the vault creation script the tables are read from and the path
+        of the information mart script
+        """
+        self.connectionParameters = connectionParameters
+        self.vaultScript = vaultScript
+        self.martScript = martScript
+
+    def vaultStatements(self, prefix) -> list:
+        """
+        reads the statements of the vault creation script starting with prefix
+
+        Args:
+            prefix : the beginning of the statements in lower case
+
+        Returns:
+            list: a list of statements
+
+        >>> Example:
+        >>> vaultStatements('create index')
+        >>> ['create index if not exists "HubTreatment_experiment_idx" on "HubTreatment"("experiment");', ...]
+        """
+        with open(self.vaultScript, 'r') as script:
+            return [line.strip() for line in script if line.lower().startswith(prefix)]
+
+    def tableColumns(self) -> dict:
+        """
+        reads the columns and their types of every table of the vault creation script
+
+        Returns:
+            dict: a dictionary with key as table name and value as the list of tuples of column name and type
+
+        >>> Example:
+        >>> tableColumns()
+        >>> {'HubExperiment': [('sequence', 'uuid'), ('timestamp', 'timestamp'), ('source', 'text')], ...}
+        """
+        columns = {}
+        for statement in self.vaultStatements('create table'):
+            table = re.match(r'create table (?:if not exists )?"(\w+)"', statement, re.IGNORECASE).group(1)
+            columns[table] = re.findall(r'"(\w+)" +(\w+(?:\(\d+\))?(?:\[\])*)', statement)
+        return columns
+
+    def primaryKeyColumns(self) -> dict:
+        """
+        reads the primary key columns of every table of the vault creation script
+
+        Returns:
+            dict: a dictionary with key as table name and value as the list of primary key columns in their order
+
+        >>> Example:
+        >>> primaryKeyColumns()
+        >>> {'HubExperiment': ['sequence', 'timestamp', 'source'], ...}
+        """
+        primaryKeys = {}
+        for statement in self.vaultStatements('create table'):
+            table = re.match(r'create table (?:if not exists )?"(\w+)"', statement, re.IGNORECASE).group(1)
+            primaryKeys[table] = re.findall(r'"(\w+)"', re.search(r'PRIMARY KEY ?\(([^)]*)\)', statement).group(1))
+        return primaryKeys
+
+    def hashKeyColumns(self) -> dict:
+        """
+        reads the uuid columns of every table of the vault creation script
+
+        Returns:
+            dict: a dictionary with key as table name and value as the list of its uuid columns
+
+        >>> Example:
+        >>> hashKeyColumns()
+        >>> {'HubExperiment': ['sequence'], 'HubTreatment': ['sequence', 'experiment'], ...}
+        """
+        return {table: [column for column, columnType in columns if columnType == 'uuid'] for table, columns in self.tableColumns().items()}
+
+    def missingColumns(self, vaultColumns) -> dict:
+        """
+        compares the columns of the tables of a vault with the columns of the vault creation script
+
+        Args:
+            vaultColumns : a dictionary with key as table name and value as the list of the columns of the table in the vault
+
+        Returns:
+            dict: a dictionary with key as the name of a table of the vault and value as the list of tuples of column name and type of the
+            columns of the script missing in the table
+
+        >>> Example:
+        >>> missingColumns({'SatFactorName': ['sequence', 'timestamp', 'source', 'name'], ...})
+        >>> {'SatFactorName': [('hashDiff', 'text')], ...}
+        """
+        missing = {}
+        for table, columns in self.tableColumns().items():
+            if table in vaultColumns:
+                added = [(column, columnType) for column, columnType in columns if column not in vaultColumns[table]]
+                if added:
+                    missing[table] = added
+        return missing
+
+    def changedPrimaryKeys(self, vaultPrimaryKeys) -> dict:
+        """
+        compares the primary keys of the tables of a vault with the primary keys of the vault creation script
+
+        Args:
+            vaultPrimaryKeys : a dictionary with key as table name and value as the list of primary key columns of the table in the vault
+
+        Returns:
+            dict: a dictionary with key as the name of a table of the vault and value as the primary key columns of the script, for the tables
+            whose primary key differs from the script
+
+        >>> Example:
+        >>> changedPrimaryKeys({'SatTreatmentFactorLevel': ['sequence', 'timestamp', 'source'], ...})
+        >>> {'SatTreatmentFactorLevel': ['sequence', 'factorLevel', 'timestamp', 'source'], ...}
+        """
+        return {table: columns for table, columns in self.primaryKeyColumns().items() if table in vaultPrimaryKeys and vaultPrimaryKeys[table] != columns}
+
+    def metaDataValue(self, key, value):
+        """
+        converts an array of a .hdr section stored by the first version of staging.py, which kept the text of every entry of the array,
+        to the numeric array FileReader.getArray reads from the same lines, the other values are returned unchanged
+
+        Args:
+            key : the key of the metadata value in SatMetaDataKeyValuePair
+            value : the unpickled metadata value
+
+        Returns:
+            the numeric array of the text array, or the value when it is not an array of text or its text is not numeric
+
+        >>> Example:
+        >>> metaDataValue('Gains', np.array([['6', '7'], ['5', '5']]))
+        >>> array([[6, 7], [5, 5]])
+        """
+        if not isinstance(value, np.ndarray) or value.ndim == 2 and value.dtype.kind != 'U':
+            return value
+        
+        arrayType = FileReader.arrayTypes.get(key, float)
+        if value.size == 0:
+            return np.empty((0, 0), dtype=arrayType)
+        if value.dtype.kind != 'U':
+            return value
+        try:
+            return np.loadtxt(['\t'.join(row) for row in np.atleast_2d(value)], dtype=arrayType, ndmin=2)
+        except ValueError:
+            return value
+
+    def schemaColumns(self, cursor, schema) -> dict:
+        """
+        reads the columns of the tables of a schema of the vault
+
+        Args:
+            cursor : cursor of the open transaction
+            schema : name of the schema
+
+        Returns:
+            dict: a dictionary with key as table name and value as the list of its columns
+        """
+        cursor.execute("""SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = %s ORDER BY table_name, ordinal_position""", (schema,))
+        columns = {}
+        for table, column in cursor.fetchall():
+            columns.setdefault(table, []).append(column)
+        return columns
+
+    def createVaultTables(self, cursor) -> None:
+        """
+        creates the staging schema and the tables of the vault creation script and their staging copies that do not exist in the vault
+
+        The key columns of the new tables are created as text when the keys of the vault are still md5 text, so their foreign keys can be created,
+        they are converted to uuid with the other key columns by convertHashKeys
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        cursor.execute("""CREATE SCHEMA IF NOT EXISTS staging""")
+        cursor.execute("""SELECT data_type FROM information_schema.columns WHERE table_schema = 'public' AND table_name = 'HubExperiment' AND column_name = 'sequence'""")
+        keyType = cursor.fetchone()[0]
+        for statement in self.vaultStatements('create table "') + self.vaultStatements('create unlogged table'):
+            table = re.match(r'create (?:unlogged )?table ((?:staging\.)?"\w+")', statement, re.IGNORECASE).group(1)
+            cursor.execute("""SELECT to_regclass(%s)""", (table,))
+            if cursor.fetchone()[0] is None:
+                cursor.execute(statement.replace('" uuid ', '" %s ' % keyType))
+                print("%s created" % table)
+
+    def addColumns(self, cursor) -> None:
+        """
+        adds the columns of the vault creation script missing in the vault tables to the tables and to their staging copies, the alter table
+        statements of the script then set the storage of the added columns
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        for schema in ['public', 'staging']:
+            for table, columns in self.missingColumns(self.schemaColumns(cursor, schema)).items():
+                cursor.execute("""ALTER TABLE %s."%s" %s""" % (schema, table, ','.join('ADD COLUMN "%s" %s' % (column, columnType) for column, columnType in columns)))
+                print("%s.%s : %s added" % (schema, table, ', '.join(column for column, columnType in columns)))
+        for statement in self.vaultStatements('alter table'):
+            cursor.execute(statement)
+
+    def convertTimestamps(self, cursor) -> bool:
+        """
+        fills the startTime, samplePeriod and sampleCount of the observations from the timestamps array stored by the first version of the vault
+        creation script and drops the timestamps column
+
+        The timestamps of an observation are spaced by its sample period, the sample period is the time between the first and the last timestamp
+        divided by the number of intervals between them
+
+        Args:
+            cursor : cursor of the open transaction
+
+        Returns:
+            bool: True when the timestamps column was dropped, False when the vault has no timestamps column
+        """
+        if 'timestamps' not in self.schemaColumns(cursor, 'public').get('SatObservationValue', []):
+            return False
+
+        cursor.execute("""UPDATE "SatObservationValue" SET "startTime" = "timestamps"[1], "sampleCount" = cardinality("timestamps"),
+                          "samplePeriod" = CASE WHEN cardinality("timestamps") > 1
+                              THEN extract(epoch FROM "timestamps"[cardinality("timestamps")] - "timestamps"[1]) / (cardinality("timestamps") - 1) END
+                          WHERE "startTime" IS NULL""")
+        print("time axis set for %d observations" % cursor.rowcount)
+        cursor.execute("""ALTER TABLE "SatObservationValue" DROP COLUMN "timestamps" """)
+        cursor.execute("""ALTER TABLE staging."SatObservationValue" DROP COLUMN IF EXISTS "timestamps" """)
+        return True
+
+    def convertHashKeys(self, cursor) -> None:
+        """
+        converts the key columns of the vault and staging tables that are still md5 text to uuid
+
+        The foreign keys between the converted tables are dropped and added again once both of their columns are uuid. Every table is rewritten
+        once with all its key columns.
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        keyColumns = self.hashKeyColumns()
+        cursor.execute("""SELECT table_schema, table_name, column_name FROM information_schema.columns
+                          WHERE table_schema IN ('public', 'staging') AND data_type = 'text' ORDER BY table_schema, table_name, ordinal_position""")
+        textKeys = {}
+        for schema, table, column in cursor.fetchall():
+            if column in keyColumns.get(table, []):
+                textKeys.setdefault((schema, table), []).append(column)
+        if not textKeys:
+            return
+
+        regclasses = ['"%s"' % table for schema, table in sorted(textKeys) if schema == 'public']
+        cursor.execute("""SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint
+                          WHERE contype = 'f' AND (conrelid = ANY(%s::regclass[]) OR confrelid = ANY(%s::regclass[]))""", (regclasses, regclasses))
+        foreignKeys = cursor.fetchall()
+        for table, name, definition in foreignKeys:
+            cursor.execute("""ALTER TABLE %s DROP CONSTRAINT "%s" """ % (table, name))
+
+        for (schema, table), columns in textKeys.items():
+            cursor.execute("""ALTER TABLE %s."%s" %s""" % (schema, table, ','.join('ALTER COLUMN "%s" TYPE uuid USING "%s"::uuid' % (column, column) for column in columns)))
+            print("%s.%s : %s converted to uuid" % (schema, table, ', '.join(columns)))
+
+        for table, name, definition in foreignKeys:
+            cursor.execute("""ALTER TABLE %s ADD CONSTRAINT "%s" %s""" % (table, name, definition))
+
+    def updatePrimaryKeys(self, cursor) -> None:
+        """
+        replaces the primary keys of the vault tables that differ from the primary keys of the vault creation script, the primary key of a
+        partitioned table includes its partition key and is kept
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        cursor.execute("""SELECT t.relname, c.conname, array_agg(a.attname::text ORDER BY k.n) FROM pg_constraint c
+                          JOIN pg_class t ON t.oid = c.conrelid CROSS JOIN unnest(c.conkey) WITH ORDINALITY AS k(attnum, n)
+                          JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+                          WHERE c.contype = 'p' AND t.relnamespace = 'public'::regnamespace AND t.relkind = 'r' GROUP BY t.relname, c.conname""")
+        constraints = {}
+        vaultPrimaryKeys = {}
+        for table, name, columns in cursor.fetchall():
+            constraints[table] = name
+            vaultPrimaryKeys[table] = columns
+        for table, columns in self.changedPrimaryKeys(vaultPrimaryKeys).items():
+            cursor.execute("""ALTER TABLE "%s" DROP CONSTRAINT "%s", ADD PRIMARY KEY (%s)""" % (table, constraints[table], ','.join('"%s"' % column for column in columns)))
+            print("%s : primary key %s" % (table, ', '.join(columns)))
+
+    def convertMetaDataValues(self, cursor, fetchRows = 1000) -> None:
+        """
+        replaces the text arrays of the metadata values loaded before the hashDiff column was added by the numeric arrays the staging layer
+        loads now, so the hashDiff filled by fillHashDiff is the one of a load of the same file
+
+        Args:
+            cursor : cursor of the open transaction
+            fetchRows : number of rows read in a single batch. Defaults to 1000.
+        """
+        keys = self.primaryKeyColumns()['SatMetaDataKeyValuePair']
+        rows = cursor.connection.cursor('metaDataRows')
+        rows.execute("""SELECT %s, "value" FROM "SatMetaDataKeyValuePair" WHERE "hashDiff" IS NULL""" % ','.join('"%s"' % key for key in keys))
+        converted = 0
+        while True:
+            batch = rows.fetchmany(fetchRows)
+            if not batch:
+                break
+            updates = []
+            for row in batch:
+                if row[-1] is None:
+                    continue
+                key, value = row[keys.index('key')], pickle.loads(bytes(row[-1]))
+                convertedValue = self.metaDataValue(key, value)
+                if convertedValue is not value:
+                    updates.append([pickle.dumps(convertedValue)] + list(row[:-1]))
+            cursor.executemany("""UPDATE "SatMetaDataKeyValuePair" SET "value" = %%s WHERE %s""" % ' AND '.join('"%s" = %%s' % key for key in keys), updates)
+            converted += len(updates)
+        rows.close()
+        if converted:
+            print("SatMetaDataKeyValuePair : %d arrays converted" % converted)
+
+    def fillHashDiff(self, cursor, fetchRows = 1000) -> None:
+        """
+        fills the hashDiff of the rows of the versioned tables loaded before the hashDiff column was added with the hashDiff FileLoader gives them
+
+        The rows are read in batches with a server side cursor and updated by their primary key. The observations loaded before the hashDiff
+        column are matrices stored without tiles and codec, their hashDiff is the one of a load with the default chunkSamples and valueCodec.
+        Reloading a file whose rows are stored as the staging layer reads them now adds no version, the rows stored differently get a new version
+        on their first reload, such as the PreAutism observations of the first version of staging.py, whose timestamps were spaced by the sampling rate
+
+        Args:
+            cursor : cursor of the open transaction
+            fetchRows : number of rows read in a single batch. Defaults to 1000.
+        """
+        l = FileLoader()
+        primaryKeys = self.primaryKeyColumns()
+        tables = [(table, [column for column in tableColumns if column not in keyColumns]) for table, tableColumns, frameColumns, keyColumns in l.tables if keyColumns is not None]
+        tables.append(('SatObservationValue', ['value', 'startTime', 'samplePeriod', 'sampleCount']))
+        for table, columns in tables:
+            keys = primaryKeys[table]
+            rows = cursor.connection.cursor('hashDiffRows')
+            rows.execute("""SELECT %s FROM "%s" WHERE "hashDiff" IS NULL""" % (','.join('"%s"' % column for column in keys + columns), table))
+            updated = 0
+            while True:
+                batch = rows.fetchmany(fetchRows)
+                if not batch:
+                    break
+                frame = pd.DataFrame(batch, columns = keys + columns, dtype = object)
+                # the bytea values are read as memoryview and the matrices as lists, the staging layer hashes them as bytes and numpy arrays
+                for column in columns:
+                    frame[column] = [bytes(value) if isinstance(value, memoryview) else np.array(value, dtype = float) if isinstance(value, list) else value for value in frame[column]]
+                hashDiff = l.observationHashDiff(frame) if table == 'SatObservationValue' else l.hashDiff(frame, columns)
+                cursor.executemany("""UPDATE "%s" SET "hashDiff" = %%s WHERE %s""" % (table, ' AND '.join('"%s" = %%s' % key for key in keys)),
+                                   [[hashDiff[index]] + list(frame.loc[index, keys]) for index in frame.index])
+                updated += len(frame.index)
+            rows.close()
+            if updated:
+                print("%s : hashDiff set for %d rows" % (table, updated))
+
+    def fillExperimentType(self, cursor) -> None:
+        """
+        fills the experimentType column of SatObservationValue for the observations loaded without it
+
+        The experiment type of an observation is VM when the acronym of the experiment it was collected in is a Visuomotor acronym and PreAutism otherwise
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        cursor.execute("""UPDATE "SatObservationValue" sov SET "experimentType" = CASE WHEN sa."acronym" = ANY(%s) THEN 'VM' ELSE 'PreAutism' END
+                          FROM "HubObservation" ho JOIN "SatExperimentAcronym" sa ON sa."sequence" = ho."collectedAtSession"
+                          WHERE ho."sequence" = sov."sequence" AND sov."experimentType" IS NULL""", (self.vmAcronyms,))
+        print("experiment type set for %d observations" % cursor.rowcount)
+
+    def createIndexes(self, cursor) -> None:
+        """
+        creates the indexes of the vault creation script that do not exist in the vault
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        for statement in self.vaultStatements('create index'):
+            cursor.execute(statement)
+            print(statement)
+
+    def createTables(self, cursor) -> None:
+        """
+        creates the point in time and bridge tables of the vault creation script that do not exist in the vault and fills them from the rows of the vault
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        for statement in self.vaultStatements('create table if not exists'):
+            cursor.execute(statement)
+        
+        l = FileLoader()
+        l.updatePointInTimeTables(cursor, dt.datetime.min)
+        l.updateBridgeTables(cursor, dt.datetime.min)
+
+    def isPartitioned(self, cursor, table) -> bool:
+        """
+        tells whether a table of the vault is partitioned
+
+        Args:
+            cursor : cursor of the open transaction
+            table : name of the table
+
+        Returns:
+            bool: True when the table is partitioned
+        """
+        cursor.execute("""SELECT relkind FROM pg_class WHERE oid = %s::regclass""", ('"%s"' % table,))
+        return cursor.fetchone()[0] == 'p'
+
+    def dependentViews(self, cursor, tables) -> list:
+        """
+        reads the views and materialized views that select from tables directly or through other views, in the order they can be created
+
+        Args:
+            cursor : cursor of the open transaction
+            tables : names of the tables
+
+        Returns:
+            list: a list of tuples of view name, relkind of the view and its definition
+        """
+        cursor.execute("""WITH RECURSIVE views(oid, depth) AS (
+                              SELECT r.ev_class, 1 FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid
+                              WHERE d.refobjid = ANY(%s::regclass[]) AND r.ev_class <> d.refobjid
+                              UNION
+                              SELECT r.ev_class, v.depth + 1 FROM views v JOIN pg_depend d ON d.refobjid = v.oid JOIN pg_rewrite r ON r.oid = d.objid
+                              WHERE r.ev_class <> v.oid
+                          )
+                          SELECT c.relname, c.relkind, pg_get_viewdef(c.oid) FROM views v JOIN pg_class c ON c.oid = v.oid
+                          GROUP BY c.oid, c.relname, c.relkind ORDER BY max(v.depth), c.relname""", (['"%s"' % table for table in tables],))
+        return cursor.fetchall()
+
+    def partitionObservationValues(self, cursor) -> None:
+        """
+        replaces SatObservationValue with a table partitioned by list of experimentType holding the same rows
+
+        The indexes of the table are created again on the partitioned table, the primary key of the partitioned table includes experimentType as
+        postgres requires the partition key in the primary key. The views selecting from the table are dropped by run before the partitioning
+
+        Args:
+            cursor : cursor of the open transaction
+        """
+        cursor.execute("""SELECT conname FROM pg_constraint WHERE conrelid = '"SatObservationValue"'::regclass AND contype = 'p'""")
+        primaryKey = cursor.fetchone()[0]
+        cursor.execute("""SELECT indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = 'SatObservationValue' AND indexname <> %s""", (primaryKey,))
+        indexes = [indexdef for indexdef, in cursor.fetchall()]
+        cursor.execute("""ALTER TABLE "SatObservationValue" RENAME TO "SatObservationValueUnpartitioned" """)
+        cursor.execute("""ALTER TABLE "SatObservationValueUnpartitioned" RENAME CONSTRAINT "%s" TO "SatObservationValueUnpartitioned_pkey" """ % primaryKey)
+
+        # like copies the columns in the same order with the external storage of the encoded values, so the staging table can still be merged with SELECT *
+        cursor.execute("""CREATE TABLE "SatObservationValue"(LIKE "SatObservationValueUnpartitioned" INCLUDING DEFAULTS INCLUDING STORAGE,
+                          FOREIGN KEY ("sequence") REFERENCES "HubObservation"("sequence"),
+                          PRIMARY KEY ("sequence","timestamp","source","experimentType")) PARTITION BY LIST ("experimentType")""")
+        for experimentType in self.experimentTypes:
+            cursor.execute("""CREATE TABLE "SatObservationValue%s" PARTITION OF "SatObservationValue" FOR VALUES IN (%%s)""" % experimentType, (experimentType,))
+        cursor.execute("""CREATE TABLE "SatObservationValueDefault" PARTITION OF "SatObservationValue" DEFAULT""")
+
+        cursor.execute("""INSERT INTO "SatObservationValue" SELECT * FROM "SatObservationValueUnpartitioned" """)
+        print("%d observations moved to the partitions of SatObservationValue" % cursor.rowcount)
+        cursor.execute("""DROP TABLE "SatObservationValueUnpartitioned" """)
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+
+    def dropViews(self, cursor) -> list:
+        """
+        drops the views and materialized views that select from the tables of the vault
+
+        Args:
+            cursor : cursor of the open transaction
+
+        Returns:
+            list: a list of tuples of view name, relkind of the view and its definition, in the order they can be created
+        """
+        cursor.execute("""SELECT relname FROM pg_class WHERE relnamespace = 'public'::regnamespace AND relkind IN ('r', 'p')""")
+        views = self.dependentViews(cursor, [table for table, in cursor.fetchall()])
+        for name, kind, definition in reversed(views):
+            cursor.execute("""DROP %s "%s" """ % ('MATERIALIZED VIEW' if kind == 'm' else 'VIEW', name))
+        return views
+
+    def createViews(self, cursor, views, timestampsDropped) -> None:
+        """
+        creates again the views dropped by dropViews
+
+        The views of the first version of InformationMart.sql select the timestamps column of SatObservationValue, when it was dropped the
+        information mart is created by InformationMart.sql instead, which also fills the tables of the mart
+
+        Args:
+            cursor : cursor of the open transaction
+            views : the views returned by dropViews
+            timestampsDropped : True when convertTimestamps dropped the timestamps column
+        """
+        if views and timestampsDropped:
+            with open(self.martScript, 'r') as script:
+                cursor.execute(''.join(line for line in script if not line.startswith('\\connect')))
+            print("information mart created by %s" % os.path.basename(self.martScript))
+            return
+        for name, kind, definition in views:
+            cursor.execute("""CREATE %s "%s" AS %s""" % ('MATERIALIZED VIEW' if kind == 'm' else 'VIEW', name, definition))
+
+    def run(self, partition = False) -> bool:
+        """
+        applies the migration to the vault in a single transaction, a failed migration leaves the vault unchanged
+
+        Args:
+            partition : partitions SatObservationValue by experiment type when True and it is not partitioned yet. Defaults to False.
+
+        Returns:
+            bool: True when the migration is committed, False when an error occured
+        """
+        print("Connection to postgres with the parameters ....")
+        print("user :",self.connectionParameters['user'])
+        print("host :",self.connectionParameters['host'])
+        print("port :", self.connectionParameters['port'])
+        print("database :",self.connectionParameters['database'])
+
+        connection = None
+        cursor = None
+        try:
+            connection = psycopg2.connect(**self.connectionParameters)
+            cursor = connection.cursor()
+
+            views = self.dropViews(cursor)
+            self.createVaultTables(cursor)
+            self.addColumns(cursor)
+            timestampsDropped = self.convertTimestamps(cursor)
+            self.convertHashKeys(cursor)
+            self.updatePrimaryKeys(cursor)
+            self.convertMetaDataValues(cursor)
+            self.fillHashDiff(cursor)
+            self.fillExperimentType(cursor)
+            self.createTables(cursor)
+            self.createIndexes(cursor)
+            if partition and not self.isPartitioned(cursor, 'SatObservationValue'):
+                self.partitionObservationValues(cursor)
+            self.createViews(cursor, views, timestampsDropped)
+            connection.commit()
+            print("Migrated the data vault successfully")
+            return True
+
+        except (Exception, Error) as error:
+            print("Error while migrating the data vault", error)
+            return False
+        finally:
+            if connection:
+                if cursor:
+                    cursor.close()
+                connection.close()
+                print("PostgreSQL connection is closed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = 'upgrades an existing data vault to the tables, keys, indexes, point in time and bridge tables of dataVault.sql')
+    parser.add_argument('--partition', action = 'store_true', help = 'partition SatObservationValue by experiment type')
+    arguments = parser.parse_args()
+
+    r = FileReader()
+    connectionParameters = {}
+    config = open('config.txt', 'r', errors="ignore")
+    for parameter, fieldName in [('user', "USER"), ('password', "PASSWORD"), ('host', "HOST"), ('port', "PORT"), ('database', "DATABASE")]:
+        connectionParameters[parameter] = r.findField(config, fieldName).lstrip(',').replace('\n','').lstrip().rstrip()
+        config.seek(0)
+    config.close()
+
+    VaultMigration(connectionParameters).run(arguments.partition)
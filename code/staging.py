@@ -1,12 +1,26 @@
 import os
 import glob
+import json
+import hashlib
+import shutil
+import tempfile
+import uuid
+import threading
+import time
+import queue
+import io
+import struct
+import argparse
+import csv
 import datetime as dt
 from typing import Iterable, Union
-from dateutil import parser
 import pandas as pd
 import numpy as np
 import psycopg2, pickle
+import psycopg2.pool
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from psycopg2 import Error
+from codec import ObservationCodec
 
 
 """
@@ -32,8 +46,15 @@ class FileReader():
     The raw data needs to be present in a folder called VMData_Blinded for Visuomotor data and PreAutismData_Blinded for Pre-autism
     
     """
-    def __init__(self):
+    # the numpy types of the arrays of the .hdr sections read by getArray, the arrays not listed are read as float
+    arrayTypes = {'Gains': int, 'S-D-Mask': int}
+    
+    def __init__(self, cache = None):
+        """
+        this constructor initiates a private filename to empty string and sets the ParseCache checked before a file is parsed, files are always parsed when cache is None
+        """
         self.__filename = ""
+        self.cache = cache
     
     
     
@@ -86,10 +107,59 @@ class FileReader():
             None: position of the field key
         """
         currentLine = file.readline()
-        if fieldName in currentLine:
-            return  None
-        else:
-            return self.findFieldPosition(file, fieldName)
+        while currentLine and fieldName not in currentLine:
+            currentLine = file.readline()
+        
+        return None
+
+    
+    def scanVMHeader(self, file, fields) -> Iterable[Union[dict, int]]:
+        """
+        
+        scans the header of a Visuomotor file in a single pass and returns the raw value of every field along with the position of the data section
+        
+        Each line is read only once, the value of a field is the text following the field name on the first line that contains it.
+        The value of 'Stim Time[s]' is the line following the field name. Scanning stops at the first line containing 'Data'
+        and the position returned is the start of the line after it, so that the data can be parsed without reading the header again.
+
+        Args:
+            file : input file to be processed
+            fields : a list of field names to be retrieved from the header
+
+        Returns:
+            Iterable[Union[dict, int]]: a tuple consisting a dictionary of raw field values, empty when field is not found, and the position of the data section
+        
+        >>> Example: 
+            file
+                ID,VM0010_Viso 
+                Stim Time[s]
+                A,20,B,30
+                Data
+                col1,col2
+        >>> scanVMHeader(file, ['ID', 'Stim Time[s]'])
+        >>> ({'ID': ',VM0010_Viso\n', 'Stim Time[s]': 'A,20,B,30\n'}, 52)
+        """
+        header = dict.fromkeys(fields, "")
+        remainingFields = [field for field in fields if field != 'Stim Time[s]']
+        readStimTime = False
+        
+        currentLine = file.readline()
+        while currentLine:
+            if readStimTime:
+                header['Stim Time[s]'] = currentLine
+                readStimTime = False
+            elif 'Stim Time[s]' in fields and 'Stim Time[s]' in currentLine and not header['Stim Time[s]']:
+                readStimTime = True
+            
+            for field in [field for field in remainingFields if field in currentLine]:
+                header[field] = currentLine.split(field)[1]
+                remainingFields.remove(field)
+            
+            if 'Data' in currentLine:
+                break
+            currentLine = file.readline()
+        
+        return (header, file.tell())
 
         
     def readVMFile(self, file) -> Iterable[Union[dict, pd.core.frame.DataFrame]]:
@@ -97,8 +167,8 @@ class FileReader():
         
         reads a file for Visuomotor dataset and returns the dataset and metadata from the file
         
-        The whole file is taken as input, the fields to be found are provided in the function and it calls findField function to retrieve values for each field
-        After all the metadata values are read, the data is contained below metadata, it is read as a pandas dataframe by finding the position of data by calling findFieldPosition
+        The whole file is taken as input, the fields to be found are provided in the function and it calls scanVMHeader to retrieve values for all fields in a single pass
+        After all the metadata values are read, the data is contained below metadata, it is read as a pandas dataframe starting from the data position returned by scanVMHeader
 
         Args:
             file : input file to be processed
@@ -124,18 +194,15 @@ class FileReader():
         """
         metadata = {}
         fields = ['ID','Name','Age','Sex','AnalyzeMode','Pre Time[s]','Post Time[s]','Recovery Time[s]','Base Time[s]','Date','Mode','Wave[nm]','Sampling Period[s]','StimType','Stim Time[s]','Repeat Count']
+        header, dataPosition = self.scanVMHeader(file, fields)
         for field in fields:
             if 'Stim Time[s]' != field:
                 if 'Wave[nm]' != field:
-                    metadata[field] = self.findField(file, field).replace('\n','').lstrip(',').rstrip(',')
-                    file.seek(0)
+                    metadata[field] = header[field].replace('\n','').lstrip(',').rstrip(',')
                 else:    
-                    metadata[field] = self.findField(file, field).replace('\n','').lstrip(',').rstrip(',').split(',')
-                    file.seek(0)
+                    metadata[field] = header[field].replace('\n','').lstrip(',').rstrip(',').split(',')
             else:
-                self.findFieldPosition(file, field)
-                fieldList = file.readline().replace('\n','').replace(',,','').split(",")
-                file.seek(0)
+                fieldList = header[field].replace('\n','').replace(',,','').split(",")
                 fieldDict ={}
                 for i in range(len(fieldList) - 1):
                     if i % 2 == 0:
@@ -143,18 +210,98 @@ class FileReader():
                 
                 metadata[field] = fieldDict
 
-        self.findFieldPosition(file,'Data')
+        file.seek(dataPosition)
         data = pd.read_csv(file)
         
         return (metadata,data)
     
-    def getParameters(self, file, field, params) -> dict:
+    def indexSections(self, lines) -> dict:
+        """
+        
+        builds an index of the sections in a header file and returns the range of lines that belong to each section
+
+        Args:
+            lines : an array of line string, each element corresponds to a single line in the file
+
+        Returns:
+            dict: a dictionary with section names as keys and a tuple of first and last (exclusive) line number of the section as values
+            
+        >>> Example:
+        [GeneralInfo]
+        Date="Fri, 10 May 2019"
+        [ImagingParameters]
+        Sources=12
+        Detectors=8
+        >>> indexSections(lines)
+        {GeneralInfo: (1, 2), ImagingParameters: (3, 5)}
+        """
+        sections = {}
+        sectionName = None
+        sectionStart = 0
+        for lineNumber, currentLine in enumerate(lines):
+            currentLine = currentLine.strip()
+            if currentLine.startswith('[') and currentLine.endswith(']'):
+                if sectionName is not None:
+                    sections[sectionName] = (sectionStart, lineNumber)
+                sectionName = currentLine[1:-1]
+                sectionStart = lineNumber + 1
+        
+        if sectionName is not None:
+            sections[sectionName] = (sectionStart, len(lines))
+        
+        return sections
+    
+    
+    def findLineNumber(self, lines, fieldName, start = 0, end = None) -> int:
+        """
+        
+        finds the first line at or after start and before end that contains the given key and returns its line number, end is returned when key is not found
+
+        Args:
+            lines : an array of line string, each element corresponds to a single line in the file
+            fieldName : name of key to search in lines
+            start : line number to start searching from. Defaults to 0.
+            end : line number to stop searching at (exclusive), the number of lines when None. Defaults to None.
+
+        Returns:
+            int: line number of the first line containing the key
+        """
+        end = len(lines) if end is None else min(end, len(lines))
+        for lineNumber in range(start, end):
+            if fieldName in lines[lineNumber]:
+                return lineNumber
+        
+        return end
+    
+    
+    def getSectionRange(self, lines, sections, field) -> tuple:
+        """
+        
+        gives the line numbers of the first line and the line after the last line of a section, the section is looked up in the index and searched in lines
+        when it is not indexed, in which case it ends at the end of the file
+
+        Args:
+            lines : an array of line string, each element corresponds to a single line in the file
+            sections : a dictionary of section line ranges created by indexSections
+            field : name of the section
+
+        Returns:
+            tuple: line number of first line after the section header and line number where the section ends (exclusive)
+        """
+        if field in sections:
+            return sections[field]
+        
+        return (self.findLineNumber(lines, field) + 1, len(lines))
+    
+    
+    def getParameters(self, lines, sections, field, params) -> dict:
         """
         
         finds the parameter from the given key and retuens all the nested keys from the file
 
         Args:
-            file : input file to be processed
+            lines : an array of line string, each element corresponds to a single line in the file
+            sections : a dictionary of section line ranges created by indexSections
             field : : name of key to search in file
             params : a list of parameters to be retrieved from the field key
 
@@ -167,29 +314,34 @@ class FileReader():
         Sources=12
         Detectors=8
         ShortBundles=0
-        >>> getParameters(file, 'ImagingParameters', [Sources, Detectors, ShortBundles])
+        >>> getParameters(lines, sections, 'ImagingParameters', [Sources, Detectors, ShortBundles])
         {Sources: '12', Detectors: '8', ShortBundles: '0'}
         """
         parameters = {}
-        self.findFieldPosition(file, field)
-        headerLines = file.readlines()   
+        # a parameter is only searched within its own section so that a key of a later section is never matched
+        sectionStart, sectionEnd = self.getSectionRange(lines, sections, field)
         for param in params:
-            parameters[param] = self.findField(file, param, headerLines).replace('\n','').replace('\"','').replace('=','').replace('\t',',')
+            lineNumber = self.findLineNumber(lines, param, sectionStart, sectionEnd)
+            value = lines[lineNumber].split(param)[1] if lineNumber < sectionEnd else ""
+            parameters[param] = value.replace('\n','').replace('\"','').replace('=','').replace('\t',',')
         
-        file.seek(0)
         return parameters
 
     
-    def getArray(self, file, field, params, arrayFields) -> dict:
+    def getArray(self, lines, sections, field, params, arrayFields, arrayTypes = None) -> dict:
         """
         
         reads an array from the field seperated by # and returns a dictionary having key as string and 2D arrayas value
+        
+        The lines between the # delimiters are collected first and converted to a numeric array in a single call
 
         Args:
-            file : input file to be processed
+            lines : an array of line string, each element corresponds to a single line in the file
+            sections : a dictionary of section line ranges created by indexSections
             field : : name of key to search in file
             params : a list of parameters to be retrieved from the field key
             arrayFields : a list of arrays to be retrieved for the key
+            arrayTypes : a dictionary of numpy data types for arrayFields keys, arrays not present are read as float. Defaults to None.
 
         Returns:
             dict: a dictionary of key, value pairs, values are 2D arrays for arrayFields keys
@@ -203,29 +355,110 @@ class FileReader():
         6	7
         5	5
         #" 
-        >>> getArray(file, 'GainSettings',[Sources, Detectors],[Gains])
+        >>> getArray(lines, sections, 'GainSettings',[Sources, Detectors],[Gains], {Gains: int})
         {Sources:'12',Detectors:'8',Gains:[[6, 7],[5, 5]]}
         """
         fieldArray = {}
-        fieldArray = self.getParameters(file, field, params)
+        fieldArray = self.getParameters(lines, sections, field, params)
+        sectionStart, sectionEnd = self.getSectionRange(lines, sections, field)
+        arrayTypes = arrayTypes or {}
         
         for fieldValue in arrayFields:
-            self.findFieldPosition(file, fieldValue)
-            arrayValue = np.array([])
-            currentLine = file.readline().replace('\n','')
-            while "#" not in currentLine:
-                currentLine = currentLine.split('\t')
-                if arrayValue.shape[0] == 0:
-                    arrayValue = np.array(currentLine)
-                else:
-                    arrayValue = np.vstack((arrayValue, currentLine))
-                currentLine = file.readline().replace('\n','')
-            fieldArray[fieldValue] = arrayValue
+            arrayType = arrayTypes.get(fieldValue, float)
+            blockStart = self.findLineNumber(lines, fieldValue, sectionStart, sectionEnd) + 1
+            blockEnd = self.findLineNumber(lines, "#", min(blockStart, sectionEnd), sectionEnd)
+            
+            if blockEnd > blockStart:
+                fieldArray[fieldValue] = np.loadtxt(lines[blockStart:blockEnd], dtype=arrayType, ndmin=2)
+            else:
+                fieldArray[fieldValue] = np.empty((0, 0), dtype=arrayType)
             
         
         return fieldArray
     
     
+    def readDataFile(self, fileName, dtype = np.float64, columns = None, chunkSize = 100000) -> pd.core.frame.DataFrame:
+        """
+        
+        reads a whitespace delimited data file (.dat, .wl1, .wl2, .evt) of PreAutismData dataset from the cache or by calling parseDataFile and returns the data as a pandas dataframe
+
+        Args:
+            fileName : path of the file to be read
+            dtype : numpy data type of the values. Defaults to np.float64.
+            columns : a list of column positions to be read, all columns are read when None. Defaults to None.
+            chunkSize : number of rows parsed at a time. Defaults to 100000.
+
+        Returns:
+            pd.core.frame.DataFrame: a pandas dataframe with a row for each line and a column for each value in the file
+        """
+        if self.cache is None:
+            return self.parseDataFile(fileName, dtype, columns, chunkSize)
+        
+        key = self.cache.fileKey(fileName, 'readDataFile', np.dtype(dtype).str, columns)
+        cached = self.cache.load(key)
+        if cached is not None:
+            return cached[1][0]
+        
+        data = self.parseDataFile(fileName, dtype, columns, chunkSize)
+        self.cache.store(key, None, [data])
+        return data
+    
+    
+    def parseDataFile(self, fileName, dtype = np.float64, columns = None, chunkSize = 100000) -> pd.core.frame.DataFrame:
+        """
+        
+        parses a whitespace delimited data file (.dat, .wl1, .wl2, .evt) of PreAutismData dataset and returns the data as a pandas dataframe
+        
+        The rows in the file are counted first so that the output array is allocated once, the file is then parsed in chunks of chunkSize rows
+        and each chunk is converted to dtype and copied into the output array. Smaller chunks lower the peak memory, larger chunks are faster.
+
+        Args:
+            fileName : path of the file to be read
+            dtype : numpy data type of the values, float32 halves the memory of float64. Defaults to np.float64.
+            columns : a list of column positions to be read, all columns are read when None. Defaults to None.
+            chunkSize : number of rows parsed at a time. Defaults to 100000.
+
+        Returns:
+            pd.core.frame.DataFrame: a pandas dataframe with a row for each line and a column for each value in the file
+            
+        >>> Example:
+        file
+            0.1 0.2 0.3
+            0.4 0.5 0.6
+        >>> parseDataFile(file, np.float32, [0, 2])
+             0    2
+        0  0.1  0.3
+        1  0.4  0.6
+        """
+        rowCount = 0
+        lastCharacter = b'\n'
+        with open(fileName, 'rb') as file:
+            block = file.read(1 << 20)
+            while block:
+                rowCount = rowCount + block.count(b'\n')
+                lastCharacter = block[-1:]
+                block = file.read(1 << 20)
+        if lastCharacter != b'\n':
+            rowCount = rowCount + 1
+        
+        values = None
+        columnNames = columns
+        currentRow = 0
+        if rowCount > 0:
+            for chunk in pd.read_csv(fileName, sep=r'\s+', header=None, usecols=columns, dtype=dtype, chunksize=chunkSize, float_precision='round_trip'):
+                if values is None:
+                    values = np.empty((rowCount, chunk.shape[1]), dtype=dtype)
+                    columnNames = chunk.columns
+                values[currentRow:currentRow + chunk.shape[0]] = chunk.to_numpy(dtype=dtype)
+                currentRow = currentRow + chunk.shape[0]
+        
+        if values is None:
+            values = np.empty((0, len(columns or [])), dtype=dtype)
+        
+        # blank lines are counted but not parsed, the unused rows at the end are dropped without copying
+        return pd.DataFrame(values[:currentRow], columns=columnNames)
+    
+    
     def readPreAutismMetaData(self, file) -> dict:
         """
         
@@ -270,18 +503,337 @@ class FileReader():
         DarkNoiseArrayFields = ['Wavelength1','Wavelength2']
         ChannelsDistanceFields = ['ChanDis']
         
-            
-        metadata["GeneralInfo"] = self.getParameters(file, "GeneralInfo", GeneralInfoFields)
-        metadata["ImagingParameters"] = self.getParameters(file, "ImagingParameters", ImagingParametersFields)
-        metadata["Paradigm"] = self.getParameters(file, "Paradigm", ParadigmFields)
-        metadata["ExperimentNotes"] = self.getParameters(file, "ExperimentNotes", ExperimentNotesFields)
-        metadata["GainSettings"] = self.getArray(file, "GainSettings", GainSettingsFields, GainSettingsArrayFields)
-        metadata["Markers"] = self.getArray(file, "Markers", MarkersFields, MarkersArrayFields)
-        metadata["DataStructure"] = self.getArray(file, "DataStructure", DataStructureFields, DataStructureArrayFields)
-        metadata["DarkNoise"] = self.getArray(file, "DarkNoise", DarkNoiseFields, DarkNoiseArrayFields)
-        metadata["ChannelsDistance"] = self.getParameters(file, "ChannelsDistance", ChannelsDistanceFields)
+        # the file is read once and every section is looked up from the index instead of searching the file again for each section
+        lines = file.readlines()
+        sections = self.indexSections(lines)
+        
+        metadata["GeneralInfo"] = self.getParameters(lines, sections, "GeneralInfo", GeneralInfoFields)
+        metadata["ImagingParameters"] = self.getParameters(lines, sections, "ImagingParameters", ImagingParametersFields)
+        metadata["Paradigm"] = self.getParameters(lines, sections, "Paradigm", ParadigmFields)
+        metadata["ExperimentNotes"] = self.getParameters(lines, sections, "ExperimentNotes", ExperimentNotesFields)
+        metadata["GainSettings"] = self.getArray(lines, sections, "GainSettings", GainSettingsFields, GainSettingsArrayFields, self.arrayTypes)
+        metadata["Markers"] = self.getArray(lines, sections, "Markers", MarkersFields, MarkersArrayFields)
+        metadata["DataStructure"] = self.getArray(lines, sections, "DataStructure", DataStructureFields, DataStructureArrayFields, self.arrayTypes)
+        metadata["DarkNoise"] = self.getArray(lines, sections, "DarkNoise", DarkNoiseFields, DarkNoiseArrayFields)
+        metadata["ChannelsDistance"] = self.getParameters(lines, sections, "ChannelsDistance", ChannelsDistanceFields)
         
         return metadata    
+    
+    
+    def readVMFilePath(self, fileName) -> Iterable[Union[dict, pd.core.frame.DataFrame]]:
+        """
+        
+        opens a file for Visuomotor dataset from its path and returns the metadata and data read by readVMFile, this lets the file be read in another process
+        
+        When a ParseCache is set the result is returned from the cache if the same file content has been parsed before
+
+        Args:
+            fileName : path of the file to be read
+
+        Returns:
+            Iterable[Union[dict, pd.core.frame.DataFrame]]: a tuple consisting a dictionary of key, value pairs and a pandas dataframe of data
+        """
+        if self.cache is not None:
+            key = self.cache.fileKey(fileName, 'readVMFile')
+            cached = self.cache.load(key)
+            if cached is not None:
+                return (cached[0], cached[1][0])
+        
+        with open(fileName, 'r', errors="ignore") as file:
+            metaData, data = self.readVMFile(file)
+        
+        if self.cache is not None:
+            self.cache.store(key, metaData, [data])
+        return (metaData, data)
+    
+    
+    def readPreAutismMetaDataPath(self, fileName) -> dict:
+        """
+        
+        opens a .hdr file for PreAutismData dataset from its path and returns the metadata read by readPreAutismMetaData, this lets the file be read in another process
+        
+        When a ParseCache is set the result is returned from the cache if the same file content has been parsed before
+
+        Args:
+            fileName : path of the file to be read
+
+        Returns:
+            dict: a dictionary of all metadata in the file in the form of key, value
+        """
+        if self.cache is not None:
+            key = self.cache.fileKey(fileName, 'readPreAutismMetaData')
+            cached = self.cache.load(key)
+            if cached is not None:
+                return cached[0]
+        
+        with open(fileName, 'r', errors="ignore") as file:
+            metaData = self.readPreAutismMetaData(file)
+        
+        if self.cache is not None:
+            self.cache.store(key, metaData, [])
+        return metaData
+
+
+class ParseCache():
+    """
+    
+    ParseCache keeps the results of FileReader on disk so that a file is parsed only once for the same content
+    
+    The results are stored in a folder named after the sha256 hash of the file content and the reader used, metadata dictionaries are
+    stored with pickle and the data matrices are stored as .npy files with a file for each data type of the columns.
+    The total size of the cache is kept below maxBytes by removing the least recently used results after each store.
+    
+    """
+    
+    version = '1'
+    
+    def __init__(self, cacheFolder, maxBytes = 1 << 30):
+        """
+        this constructor creates the cache folder when it does not exist and sets the maximum size of the cache in bytes
+        """
+        self.cacheFolder = os.path.abspath(cacheFolder)
+        self.maxBytes = int(maxBytes)
+        os.makedirs(self.cacheFolder, exist_ok=True)
+    
+    def fileKey(self, fileName, readerName, *readerArguments) -> str:
+        """
+        
+        gives the key of a parsed file, the key changes when the content of file, the reader, its arguments or the cache version changes
+
+        Args:
+            fileName : path of the file
+            readerName : name of the FileReader method that parses the file
+            readerArguments : arguments of the reader that change its result
+
+        Returns:
+            str: hexadecimal key of the parsed file
+        """
+        digest = hashlib.sha256()
+        with open(fileName, 'rb') as file:
+            block = file.read(1 << 20)
+            while block:
+                digest.update(block)
+                block = file.read(1 << 20)
+        digest.update(repr((self.version, readerName, readerArguments)).encode())
+        
+        return digest.hexdigest()
+    
+    def load(self, key) -> Iterable[Union[object, list]]:
+        """
+        
+        gives the metadata and the list of dataframes stored for key, None is returned when key is not in the cache
+
+        Args:
+            key : key of the parsed file given by fileKey
+
+        Returns:
+            Iterable[Union[object, list]]: a tuple consisting the metadata and a list of pandas dataframes
+        """
+        entryFolder = os.path.join(self.cacheFolder, key)
+        try:
+            with open(os.path.join(entryFolder, 'metadata.pickle'), 'rb') as metadataFile:
+                metadata, frameLayouts = pickle.load(metadataFile)
+            
+            frames = []
+            for frameNumber, (columnNames, dtypeGroups) in enumerate(frameLayouts):
+                columns = {}
+                for groupNumber, positions in enumerate(dtypeGroups):
+                    values = np.load(os.path.join(entryFolder, 'frame%d_%d.npy' % (frameNumber, groupNumber)), allow_pickle=True)
+                    for column, position in enumerate(positions):
+                        columns[position] = values[:, column]
+                frames.append(pd.DataFrame({columnNames[position]: columns[position] for position in range(len(columnNames))}, columns=columnNames))
+            
+            # the modification time of the folder marks when the result was last used for least recently used removal
+            os.utime(entryFolder)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        
+        return (metadata, frames)
+    
+    def store(self, key, metadata, frames) -> None:
+        """
+        
+        stores the metadata and dataframes of a parsed file under key and removes the least recently used results when the cache is larger than maxBytes
+        
+        The result is written to a temporary folder first and moved into place, so a result being written is never read by another process
+
+        Args:
+            key : key of the parsed file given by fileKey
+            metadata : metadata read from the file, stored with pickle
+            frames : a list of pandas dataframes read from the file, stored as .npy files
+        """
+        entryFolder = os.path.join(self.cacheFolder, key)
+        if os.path.exists(entryFolder):
+            return
+        
+        temporaryFolder = tempfile.mkdtemp(dir=self.cacheFolder, prefix='.tmp')
+        frameLayouts = []
+        for frameNumber, frame in enumerate(frames):
+            dtypeGroups = {}
+            for position, dtype in enumerate(frame.dtypes):
+                dtypeGroups.setdefault(str(dtype), []).append(position)
+            for groupNumber, positions in enumerate(dtypeGroups.values()):
+                np.save(os.path.join(temporaryFolder, 'frame%d_%d.npy' % (frameNumber, groupNumber)), frame.iloc[:, positions].to_numpy(), allow_pickle=True)
+            frameLayouts.append((list(frame.columns), list(dtypeGroups.values())))
+        
+        with open(os.path.join(temporaryFolder, 'metadata.pickle'), 'wb') as metadataFile:
+            pickle.dump((metadata, frameLayouts), metadataFile, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        try:
+            os.rename(temporaryFolder, entryFolder)
+        except OSError:
+            shutil.rmtree(temporaryFolder, ignore_errors=True)
+        
+        self.evict()
+    
+    def evict(self) -> None:
+        """
+        removes the least recently used results until the total size of the cache is at most maxBytes
+        """
+        entries = []
+        totalBytes = 0
+        for key in os.listdir(self.cacheFolder):
+            entryFolder = os.path.join(self.cacheFolder, key)
+            if key.startswith('.tmp') or not os.path.isdir(entryFolder):
+                continue
+            try:
+                entryBytes = sum(os.path.getsize(os.path.join(entryFolder, fileName)) for fileName in os.listdir(entryFolder))
+                entries.append((os.path.getmtime(entryFolder), entryBytes, entryFolder))
+            except OSError:
+                continue
+            totalBytes = totalBytes + entryBytes
+        
+        for lastUsed, entryBytes, entryFolder in sorted(entries):
+            if totalBytes <= self.maxBytes:
+                break
+            shutil.rmtree(entryFolder, ignore_errors=True)
+            totalBytes = totalBytes - entryBytes
+
+
+class ParallelExtractor():
+    """
+    
+    ParallelExtractor runs the FileReader methods of extract stage for many files on a pool of processes
+    
+    Each file is read by one of the worker processes and the results are returned in the same order as the file names given,
+    so the lists sent to transformation stage line up exactly as when the files are read one after another.
+    With a single worker the files are read in the current process without starting a pool.
+    
+    """
+    
+    def __init__(self, workers = 1):
+        """
+        this constructor starts a pool of worker processes when more than one worker is requested
+        """
+        self.workers = max(1, int(workers))
+        self.__executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+    
+    def map(self, function, fileNames) -> list:
+        """
+        
+        calls the function on every file and returns the results in the order of fileNames
+        
+        The file names are made absolute before they are sent to the workers, as the worker processes do not follow
+        changes of the working directory made by the main process.
+
+        Args:
+            function : a FileReader method that takes the path of a file
+            fileNames : a list of file paths
+
+        Returns:
+            list: a list of results, one for each file name
+            
+        >>> Example:
+        >>> ParallelExtractor(4).map(FileReader().readDataFile, ['a.wl1', 'b.wl1'])
+        [DataFrame of a.wl1, DataFrame of b.wl1]
+        """
+        filePaths = [os.path.abspath(fileName) for fileName in fileNames]
+        if self.__executor is None:
+            return [function(filePath) for filePath in filePaths]
+        
+        return list(self.__executor.map(function, filePaths))
+    
+    def shutdown(self) -> None:
+        """
+        stops the worker processes of the pool
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+
+class HashKeyRegistry():
+    """
+    
+    HashKeyRegistry builds the business keys of the recordings and gives their hash keys in the data vault
+    
+    The business key of a hub, link or satellite row is the combination of the fields that identify a recording, for example the date and
+    experiment title of a Visuomotor file. The hash key stored in the sequence column is the 16 byte md5 hash of the business key, written as a uuid
+    so that postgres stores it in a uuid column and returns it in the same form.
+    The keys of a whole batch are joined with vectorized string operations and every distinct business key is hashed only once, so the
+    tables of a transformation share the same hash keys and the database does not have to hash them again.
+    
+    """
+    
+    def __init__(self, maxKeys = 1000000):
+        """
+        this constructor creates an empty registry that remembers at most maxKeys hash keys
+        """
+        self.maxKeys = int(maxKeys)
+        self.__hashKeys = {}
+    
+    def businessKeys(self, *fields) -> pd.core.series.Series:
+        """
+        
+        joins the fields of each row with '_' to form the business keys
+
+        Args:
+            fields : lists or series of equal length, one for each field of the business key
+
+        Returns:
+            pd.core.series.Series: a series of business keys
+            
+        >>> Example:
+        >>> businessKeys(['01/10/2022 10:00:00'], ['S01_ViMo_HBA_Probe1_Deoxy'])
+        0    01/10/2022 10:00:00_S01_ViMo_HBA_Probe1_Deoxy
+        """
+        keys = pd.Series(np.asarray(fields[0], dtype=object)).astype(str)
+        if len(fields) == 1:
+            return keys
+        
+        return keys.str.cat([pd.Series(np.asarray(field, dtype=object)).astype(str).values for field in fields[1:]], sep='_')
+    
+    def hashKeys(self, businessKeys) -> pd.core.series.Series:
+        """
+        
+        gives the md5 hash keys of business keys as uuid strings, a business key that has been hashed before is taken from the registry
+
+        Args:
+            businessKeys : a list or series of business keys
+
+        Returns:
+            pd.core.series.Series: a series of hash keys in uuid form with the index of businessKeys
+            
+        >>> Example:
+        >>> hashKeys(['a', 'a', 'b'])
+        0    0cc175b9-c0f1-b6a8-31c3-99e269772661
+        1    0cc175b9-c0f1-b6a8-31c3-99e269772661
+        2    92eb5ffe-e6ae-2fec-3ad7-1c777531578f
+        """
+        businessKeys = pd.Series(businessKeys, dtype=object)
+        if len(self.__hashKeys) > self.maxKeys:
+            self.__hashKeys = {}
+        
+        # each distinct business key is hashed once, the rows with the same key are filled in by a single map
+        hashKeys = {}
+        for businessKey in pd.unique(businessKeys.values):
+            hashKey = self.__hashKeys.get(businessKey)
+            if hashKey is None:
+                hashKey = str(uuid.UUID(bytes=hashlib.md5(businessKey.encode('utf-8')).digest()))
+                self.__hashKeys[businessKey] = hashKey
+            hashKeys[businessKey] = hashKey
+        
+        return businessKeys.map(hashKeys)
 
 
 class FileTransformer():
@@ -298,9 +850,10 @@ class FileTransformer():
     
     def __init__(self):
         """
-        this constructor initiates a private filename to empty string
+        this constructor initiates a private filename to empty string and the registry of hash keys shared by all the tables
         """
         self.__filename = ""
+        self.registry = HashKeyRegistry()
         
     def transformVMFile(self, fileName, metaData, data) -> dict:
         """
@@ -343,11 +896,16 @@ class FileTransformer():
             experimentTitle.append(file.replace('.csv',''))
             acronym.append(acro[1])
         
+        # the business key of a recording is its date and experiment title, it is built and hashed once for all the files
+        # and every hub, link and satellite below references the same hash keys from the registry
+        businessKeys = self.registry.businessKeys(dates, experimentTitle)
+        sequenceKeys = self.registry.hashKeys(businessKeys)
+        
         
         # create a dataframe to be inserted in SatMetaDataKeyValuePair Satellite table, each of the keys are placed as individual records along with their respective values
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify metadata in SatMetaDataKeyValuePair table
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify metadata in SatMetaDataKeyValuePair table
         SatMetaDataKeyValuePairDF = pd.DataFrame([])
-        SatMetaDataKeyValuePairDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatMetaDataKeyValuePairDF['sequence'] = sequenceKeys
         SatMetaDataKeyValuePairDF['key'] = pd.Series(keys)
         SatMetaDataKeyValuePairDF['value'] = pd.Series(values)
         SatMetaDataKeyValuePairDF = SatMetaDataKeyValuePairDF.set_index(['sequence']).apply(pd.Series.explode).reset_index()
@@ -357,36 +915,37 @@ class FileTransformer():
 
         # create a dataframe to be inserted in HubMetaData hub table, the sequence in this table is created such that it references SatMetaDataKeyValuePair
         HubMetaDataDF = pd.DataFrame([])
-        HubMetaDataDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubMetaDataDF['sequence'] = sequenceKeys
 
         transformData['HubMetaData'] = HubMetaDataDF
 
 
         # create a dataframe to be inserted in SatExperimentTitle Satellite table, the title attribute contains the title of experiment retrieved from file names
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify title in SatExperimentTitle table    
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify title in SatExperimentTitle table    
         SatExperimentTitleDF = pd.DataFrame([])
-        SatExperimentTitleDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatExperimentTitleDF['sequence'] = sequenceKeys
         SatExperimentTitleDF['title']= pd.Series(experimentTitle)
 
         transformData['SatExperimentTitle'] = SatExperimentTitleDF
         
         # create a dataframe to be inserted in SatExperimentAcronym Satellite table, the acronym attribute contains the acronym which is a shor form of filename
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify acronym in SatExperimentAcronym table            
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify acronym in SatExperimentAcronym table            
         SatExperimentAcronymDF = pd.DataFrame([])
-        SatExperimentAcronymDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatExperimentAcronymDF['sequence'] = sequenceKeys
         SatExperimentAcronymDF['acronym'] = pd.Series(acronym)
 
         transformData['SatExperimentAcronym'] = SatExperimentAcronymDF
         
         # create a dataframe to be inserted in HubExperiment hub table, the sequence in this table is created such that it references SatExperimentTitle and SatExperimentAcronym table records uniquely
         HubExperimentDF = pd.DataFrame([])
-        HubExperimentDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubExperimentDF['sequence'] = sequenceKeys
+        HubExperimentDF['businessKey'] = businessKeys
         
         transformData['HubExperiment'] = HubExperimentDF
 
         # create a dataframe to be inserted in HubExperimentalUnit hub table, the sequence in this table is created such that it references SatExperimentalUnitIdentifier table records uniquely        
         HubExperimentalUnitDF = pd.DataFrame([])
-        HubExperimentalUnitDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubExperimentalUnitDF['sequence'] = sequenceKeys
         
         transformData['HubExperimentalUnit'] = HubExperimentalUnitDF
         
@@ -397,9 +956,9 @@ class FileTransformer():
             identities.append(meta['ID'])
         
         # create a dataframe to be inserted in SatExperimentalUnitIdentifier Satellite table, the ID attribute contains the unique identifier for each experimental unit        
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify ID in SatExperimentalUnitIdentifier table            
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify ID in SatExperimentalUnitIdentifier table            
         SatExperimentalUnitIdentifierDF = pd.DataFrame([])
-        SatExperimentalUnitIdentifierDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatExperimentalUnitIdentifierDF['sequence'] = sequenceKeys
         SatExperimentalUnitIdentifierDF['ID'] = pd.Series(identities)
 
         transformData['SatExperimentalUnitIdentifier'] = SatExperimentalUnitIdentifierDF
@@ -411,9 +970,9 @@ class FileTransformer():
             names.append(meta['Name'])
         
         # create a dataframe to be inserted in HubSubject Hub table, the name attribute contains the name for each subject taking part in experiment
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table             
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table             
         HubSubjectDF = pd.DataFrame([])
-        HubSubjectDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubSubjectDF['sequence'] = sequenceKeys
         HubSubjectDF['name'] = pd.Series(names)
         
         transformData['HubSubject'] = HubSubjectDF
@@ -427,27 +986,27 @@ class FileTransformer():
         
         
         # create a dataframe to be inserted in SatSubjectAge Satellite table, the age attribute contains the age for each subject taking part in experiment
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify age in SatSubjectAge satellite table              
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify age in SatSubjectAge satellite table              
         SatSubjectAgeDF = pd.DataFrame([])
-        SatSubjectAgeDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatSubjectAgeDF['sequence'] = sequenceKeys
         SatSubjectAgeDF['age'] = pd.Series(ages)
 
         transformData['SatSubjectAge'] = SatSubjectAgeDF
         
         
         # create a dataframe to be inserted in SatSubjectName Satellite table, the name attribute contains the age for each subject taking part in experiment
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify name in SatSubjectName satellite table              
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify name in SatSubjectName satellite table              
         SatSubjectNameDF = pd.DataFrame([])
-        SatSubjectNameDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatSubjectNameDF['sequence'] = sequenceKeys
         SatSubjectNameDF['name'] = pd.Series(names)
 
         transformData['SatSubjectName'] = SatSubjectNameDF
         
         # create a dataframe to be inserted in ParticipatesIn link table, ParticipatesIn links HubExperimentalUnit and HubExperiment
         ParticipatesInDF = pd.DataFrame([])
-        ParticipatesInDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        ParticipatesInDF['experimentalunit'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        ParticipatesInDF['experiment'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        ParticipatesInDF['sequence'] = sequenceKeys
+        ParticipatesInDF['experimentalunit'] = sequenceKeys
+        ParticipatesInDF['experiment'] = sequenceKeys
         
         transformData['ParticipatesIn'] = ParticipatesInDF
         
@@ -455,13 +1014,13 @@ class FileTransformer():
         # create a dataframe to be inserted in SatFactorName and SatFactorLevel Satellite table
         # there are two factors Visual Stimulus,Motor Stimulus in VisuoMotor data, these are the factor names
         # the level values are defined by presence or absence of the factors treated in the particular experiment
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify title in SatSubjectName satellite table
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify title in SatSubjectName satellite table
         SatFactorDF = pd.DataFrame([])
-        SatFactorDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        SatFactorDF['experiment'] = SatFactorDF['sequence']
+        SatFactorDF['sequence'] = businessKeys
+        SatFactorDF['experiment'] = sequenceKeys
         SatFactorDF['isCofactor'] = pd.Series([False for x in range(len(SatFactorDF.index))])
         SatFactorDF['name'] = pd.Series([list(['Visual Stimulus','Motor Stimulus']) for x in range(len(SatFactorDF.index))])
-        SatFactorDF = pd.merge(SatFactorDF, SatExperimentAcronymDF, how = 'inner', left_on='sequence', right_on='sequence')
+        SatFactorDF['acronym'] = SatExperimentAcronymDF['acronym']
         
         levelValueconditions = [
             (SatFactorDF['acronym'] == "ViMo"),
@@ -476,7 +1035,7 @@ class FileTransformer():
         SatFactorDF = SatFactorDF.set_index(['sequence','experiment','isCofactor']).apply(pd.Series.explode).reset_index()
         
         # a combination of dates, experimentTitle and factor are chosen as a sequence to uniquely identify SatFactorName and SatFactorLevel satellite tables              
-        SatFactorDF['sequence'] = SatFactorDF['sequence'] + SatFactorDF['name']
+        SatFactorDF['sequence'] = self.registry.hashKeys(SatFactorDF['sequence'] + SatFactorDF['name'])
         HubFactorDF = SatFactorDF[['sequence','experiment','isCofactor']]
         
         transformData['HubFactor'] = HubFactorDF
@@ -489,10 +1048,10 @@ class FileTransformer():
         
         transformData['SatFactorLevel'] = SatFactorLevelDF
         
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify HubTreatment Hub table and HubExperiment         
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify HubTreatment Hub table and HubExperiment         
         HubTreatmentDF = pd.DataFrame([])
-        HubTreatmentDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        HubTreatmentDF['experiment'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubTreatmentDF['sequence'] = sequenceKeys
+        HubTreatmentDF['experiment'] = sequenceKeys
         
         transformData['HubTreatment'] = HubTreatmentDF
         
@@ -502,19 +1061,19 @@ class FileTransformer():
         transformData['SatTreatmentFactorLevel'] = SatTreatmentFactorLevelDF
         
         # create a dataframe to be inserted in HubGroup Hub table, the sequence in this table is created such that it references SatGroupName table records uniquely
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table
         HubGroupDF = pd.DataFrame([])
-        HubGroupDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        HubGroupDF['treatment'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubGroupDF['sequence'] = sequenceKeys
+        HubGroupDF['treatment'] = sequenceKeys
         
         transformData['HubGroup'] = HubGroupDF
         
         
         # create a dataframe to be inserted in AssignedTo link table, AssignedTo links HubExperimentalUnit and HubGroup
         AssignedToDF= pd.DataFrame([])
-        AssignedToDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        AssignedToDF['experimentalUnit'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        AssignedToDF['group'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        AssignedToDF['sequence'] = sequenceKeys
+        AssignedToDF['experimentalUnit'] = sequenceKeys
+        AssignedToDF['group'] = sequenceKeys
         
         transformData['AssignedTo'] = AssignedToDF
         
@@ -532,102 +1091,79 @@ class FileTransformer():
         transformData['SatSessionName'] = SatSessionNameDF
         
         # create a dataframe to be inserted in HubSession Hub table, the sequence in this table is created such that it references SatSessionName table records uniquely
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify SatSessionName satellite table
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify SatSessionName satellite table
         HubSessionDF = pd.DataFrame([])
-        HubSessionDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubSessionDF['sequence'] = sequenceKeys
         
         transformData['HubSession'] = HubSessionDF
         
         # create a dataframe to be inserted in AttendsSession link table, AttendsSession links HubExperimentalUnit, HubGroup and HubSession
         AttendsSessionDF = pd.DataFrame([])
-        AttendsSessionDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        AttendsSessionDF['experimentalUnit'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        AttendsSessionDF['group'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        AttendsSessionDF['session'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        AttendsSessionDF['sequence'] = sequenceKeys
+        AttendsSessionDF['experimentalUnit'] = sequenceKeys
+        AttendsSessionDF['group'] = sequenceKeys
+        AttendsSessionDF['session'] = sequenceKeys
         
         transformData['AttendsSession'] = AttendsSessionDF
         
         
         # create a dataframe to be inserted in SessionMetaData link table, SessionMetaData links HubSession and HubMetaData
         SessionMetaDataDF = pd.DataFrame([])
-        SessionMetaDataDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        SessionMetaDataDF['session'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        SessionMetaDataDF['metadata'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SessionMetaDataDF['sequence'] = sequenceKeys
+        SessionMetaDataDF['session'] = sequenceKeys
+        SessionMetaDataDF['metadata'] = sequenceKeys
         
         transformData['SessionMetaData'] = SessionMetaDataDF
         
         # create a dataframe to be inserted in HubObservation Hub table, the sequence in this table is created such that it references SatObservationName and SatObservationValue table records uniquely
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify SatObservationName and SatObservationValue satellite table
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify SatObservationName and SatObservationValue satellite table
         HubObservationDF = pd.DataFrame([])
-        HubObservationDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        HubObservationDF['collectedAtSession'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        HubObservationDF['sequence'] = sequenceKeys
+        HubObservationDF['collectedAtSession'] = sequenceKeys
         
         transformData['HubObservation'] = HubObservationDF
         
         # create a dataframe to be inserted in ObservationMetaData link table, ObservationMetaData links HubObservation and HubMetaData
         ObservationMetaDataDF = pd.DataFrame([])
-        ObservationMetaDataDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        ObservationMetaDataDF['observation'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
-        ObservationMetaDataDF['metadata'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        ObservationMetaDataDF['sequence'] = sequenceKeys
+        ObservationMetaDataDF['observation'] = sequenceKeys
+        ObservationMetaDataDF['metadata'] = sequenceKeys
         
         transformData['ObservationMetaData'] = ObservationMetaDataDF
         
         
         # create a dataframe to be inserted in SatObservationName Satellite table, the name attribute uniquely identifies the observation name in the experiment and set to experimrnt title that is derived from file name
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify name in SatObservationName table
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify name in SatObservationName table
         SatObservationNameDF = pd.DataFrame([])
-        SatObservationNameDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatObservationNameDF['sequence'] = sequenceKeys
         SatObservationNameDF['name'] = pd.Series(experimentTitle)
 
         transformData['SatObservationName'] = SatObservationNameDF
         
         arrayData=[]
-        timestampData=[]
-        for dataValue, date, samplingRate in zip(data, dateSamplingTimeDF['date'].tolist(), dateSamplingTimeDF['samplePeriod'].tolist()):
+        sampleCounts=[]
+        # the time axis of a recording is stored as its start date, sampling period and number of samples, the timestamp of a sample is
+        # the start date plus the sample number times the sampling period and is computed only when the observation is read
+        for dataValue in data:
             if 'MES' in fileName[0]:
-                dataDF = dataValue
-                dataDF['date'] = date
-                dataDF['date'] = dataDF['date'].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
-                dataDF['samplingRate'] = samplingRate
-                dataDF['sampleNumber'] = np.arange(dataDF.shape[0])
-                dataDF['timestamps'] = pd.to_datetime(dataDF['date']) + pd.to_timedelta((dataDF['samplingRate'] * dataDF['sampleNumber']), unit='s')    # .apply(lambda x: x + datetime.timedelta(seconds = x['samplingRate'] * x['sampleNumber']))
-                dataDF['timestamps']=dataDF['timestamps'].astype(str)
-               
-                timeData = dataDF['timestamps'].tolist()
-                
-                timeDataFormatted = []
-                for t in timeData:
-                    timeDataFormatted.append(dt.datetime.strptime(t,'%Y-%m-%d %H:%M:%S.%f'))
-                
-                arrayData.append(dataValue.loc[:,['CH1(698.1)','CH1(828.7)','CH2(697.1)','CH2(828.2)','CH3(698.1)','CH3(828.7)','CH4(698.3)','CH4(828.4)','CH5(697.1)','CH5(828.2)','CH6(698.3)','CH6(828.4)','CH7(698.3)','CH7(828.4)','CH8(697.5)','CH8(828.7)','CH9(698.3)','CH9(828.4)','CH10(697.9)','CH10(829.0)','CH11(697.5)','CH11(828.7)','CH12(697.9)','CH12(829.0)','CH13(698.7)','CH13(828.2)','CH14(698.2)','CH14(827.5)','CH15(698.7)','CH15(828.2)','CH16(697.7)','CH16(828.6)','CH17(698.2)','CH17(827.5)','CH18(697.7)','CH18(828.6)','CH19(697.7)','CH19(828.6)','CH20(698.4)','CH20(828.9)','CH21(697.7)','CH21(828.6)','CH22(697.1)','CH22(828.8)','CH23(698.4)','CH23(828.9)','CH24(697.1)','CH24(828.8)']].values.tolist())
-                timestampData.append(timeData)
+                arrayData.append(dataValue.loc[:,['CH1(698.1)','CH1(828.7)','CH2(697.1)','CH2(828.2)','CH3(698.1)','CH3(828.7)','CH4(698.3)','CH4(828.4)','CH5(697.1)','CH5(828.2)','CH6(698.3)','CH6(828.4)','CH7(698.3)','CH7(828.4)','CH8(697.5)','CH8(828.7)','CH9(698.3)','CH9(828.4)','CH10(697.9)','CH10(829.0)','CH11(697.5)','CH11(828.7)','CH12(697.9)','CH12(829.0)','CH13(698.7)','CH13(828.2)','CH14(698.2)','CH14(827.5)','CH15(698.7)','CH15(828.2)','CH16(697.7)','CH16(828.6)','CH17(698.2)','CH17(827.5)','CH18(697.7)','CH18(828.6)','CH19(697.7)','CH19(828.6)','CH20(698.4)','CH20(828.9)','CH21(697.7)','CH21(828.6)','CH22(697.1)','CH22(828.8)','CH23(698.4)','CH23(828.9)','CH24(697.1)','CH24(828.8)']].to_numpy(dtype=np.float64))
             else:
-                dataDF = dataValue
-                dataDF['date'] = date
-                dataDF['date'] = dataDF['date'].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
-                dataDF['samplingRate'] = samplingRate
-                dataDF['sampleNumber'] = np.arange(dataDF.shape[0])
-                dataDF['timestamps'] = pd.to_datetime(dataDF['date']) + pd.to_timedelta((dataDF['samplingRate'] * dataDF['sampleNumber']), unit='s')
-                dataDF['timestamps']=dataDF['timestamps'].astype(str)
-                
-                timeData = dataDF['timestamps'].tolist()
-                
-                timeDataFormatted = []
-                for t in timeData:
-                    timeDataFormatted.append(dt.datetime.strptime(t,'%Y-%m-%d %H:%M:%S.%f'))
-                
-                arrayData.append(dataValue.loc[:,['CH1','CH2','CH3','CH4','CH5','CH6','CH7','CH8','CH9','CH10','CH11','CH12','CH13','CH14','CH15','CH16','CH17','CH18','CH19','CH20','CH21','CH22','CH23','CH24']].values.tolist())
-                timestampData.append(timeData)
+                arrayData.append(dataValue.loc[:,['CH1','CH2','CH3','CH4','CH5','CH6','CH7','CH8','CH9','CH10','CH11','CH12','CH13','CH14','CH15','CH16','CH17','CH18','CH19','CH20','CH21','CH22','CH23','CH24']].to_numpy(dtype=np.float64))
+            sampleCounts.append(dataValue.shape[0])
         
         
         # create a dataframe to be inserted in SatObservationValue Satellite table
         # the value attribute contains a 2D array representaion of data in each of the observation
-        # the timestamps contain the timestamp during the observation in steps of sampling rate, this is 1D array representaion of time when the observation value was captured 
-        # a combination of dates and experimentTitle are chosen as a sequence to uniquely identify value and timestamps in SatObservationValue table
+        # the startTime, samplePeriod and sampleCount describe the time axis of the observation, the timestamp of a sample is startTime plus its sample number times samplePeriod
+        # the hash key of dates and experimentTitle is chosen as a sequence to uniquely identify value and time axis in SatObservationValue table
         SatObservationValueDF = pd.DataFrame([])
-        SatObservationValueDF['sequence'] = pd.Series(a + '_' +b for a, b in zip(dates, experimentTitle))
+        SatObservationValueDF['sequence'] = sequenceKeys
         SatObservationValueDF['value'] = pd.Series(arrayData)
-        SatObservationValueDF['timestamps'] = pd.Series(timestampData)
+        SatObservationValueDF['startTime'] = dateSamplingTimeDF['date']
+        SatObservationValueDF['samplePeriod'] = dateSamplingTimeDF['samplePeriod']
+        SatObservationValueDF['sampleCount'] = pd.Series(sampleCounts)
+        # the experiment type is the partition key of SatObservationValue when the vault is partitioned by migration.py
+        SatObservationValueDF['experimentType'] = 'VM'
 
         transformData['SatObservationValue'] = SatObservationValueDF
         
@@ -747,9 +1283,14 @@ class FileTransformer():
             samplingRates.append(meta['SamplingRate'])
         
         
+        # the business key of a recording is its file name, date and time, it is built and hashed once for all the files
+        # and every hub, link and satellite below references the same hash keys from the registry
+        businessKeys = self.registry.businessKeys(fileName, date, time)
+        sequenceKeys = self.registry.hashKeys(businessKeys)
+        
         # create a dataframe from all the values retrieved and add the .dat, .wl1, .wl2 and .evt data
         preAutismDF = pd.DataFrame([])
-        preAutismDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        preAutismDF['sequence'] = sequenceKeys
         preAutismDF['preAutismFileNames'] = pd.Series(preAutismFileNames)
         preAutismDF['preAutismMetaData'] = pd.Series(preAutismMetaData)
         preAutismDF['preAutismData'] = pd.Series(preAutismData)
@@ -758,9 +1299,9 @@ class FileTransformer():
         preAutismDF['preAutismEventonsData'] = pd.Series(preAutismEventonsData)
         
         # create a dataframe to be inserted in SatMetaDataKeyValuePair Satellite table, each of the keys are placed as individual records along with their respective values
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify metadata in SatMetaDataKeyValuePair table
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify metadata in SatMetaDataKeyValuePair table
         SatMetaDataKeyValuePairDF = pd.DataFrame([])
-        SatMetaDataKeyValuePairDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatMetaDataKeyValuePairDF['sequence'] = sequenceKeys
         SatMetaDataKeyValuePairDF['key'] = preAutismDF['preAutismMetaData'].apply(lambda x: self.getKeyArrays(x))
         SatMetaDataKeyValuePairDF['value'] = preAutismDF['preAutismMetaData'].apply(lambda x: self.getValueArrays(x))
         SatMetaDataKeyValuePairDF = SatMetaDataKeyValuePairDF[['sequence','key','value']] 
@@ -771,84 +1312,85 @@ class FileTransformer():
 
         # create a dataframe to be inserted in HubMetaData hub table, the sequence in this table is created such that it references SatMetaDataKeyValuePair
         HubMetaDataDF = pd.DataFrame([])
-        HubMetaDataDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        HubMetaDataDF['sequence'] = sequenceKeys
         
         transformData['HubMetaData'] = HubMetaDataDF
      
         # create a dataframe to be inserted in SatExperimentTitle Satellite table, the title attribute contains the title of experiment retrieved from file names
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify title in SatExperimentTitle table 
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify title in SatExperimentTitle table 
         SatExperimentTitleDF = pd.DataFrame([])
-        SatExperimentTitleDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatExperimentTitleDF['sequence'] = sequenceKeys
         SatExperimentTitleDF['title']= preAutismDF['preAutismFileNames'].apply(lambda x: x.split('\\')[1].replace('.hdr',''))
 
         transformData['SatExperimentTitle'] = SatExperimentTitleDF
         
         # create a dataframe to be inserted in SatExperimentAcronym Satellite table, the acronym attribute contains the acronym which is a short form of filename
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify acronym in SatExperimentAcronym table       
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify acronym in SatExperimentAcronym table       
         SatExperimentAcronymDF = pd.DataFrame([])
-        SatExperimentAcronymDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatExperimentAcronymDF['sequence'] = sequenceKeys
         SatExperimentAcronymDF['acronym'] = preAutismDF['preAutismFileNames'].apply(lambda x: x.split('\\')[0].replace('Autism','').replace('Conversation',''))
 
         transformData['SatExperimentAcronym'] = SatExperimentAcronymDF
         
         # create a dataframe to be inserted in HubExperiment hub table, the sequence in this table is created such that it references SatExperimentTitle and SatExperimentAcronym table records uniquely
         HubExperimentDF = pd.DataFrame([])
-        HubExperimentDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        HubExperimentDF['sequence'] = sequenceKeys
+        HubExperimentDF['businessKey'] = businessKeys
         
         transformData['HubExperiment'] = HubExperimentDF
         
         # create a dataframe to be inserted in HubExperimentalUnit hub table, the sequence in this table is created such that it references SatExperimentalUnitIdentifier table records uniquely
         HubExperimentalUnitDF = pd.DataFrame([])
-        HubExperimentalUnitDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        HubExperimentalUnitDF['sequence'] = sequenceKeys
         
         transformData['HubExperimentalUnit'] = HubExperimentalUnitDF
         
         # create a dataframe to be inserted in SatExperimentalUnitIdentifier Satellite table, the ID attribute contains the unique identifier for each experimental unit        
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify ID in SatExperimentalUnitIdentifier table
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify ID in SatExperimentalUnitIdentifier table
         SatExperimentalUnitIdentifierDF = pd.DataFrame([])
-        SatExperimentalUnitIdentifierDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatExperimentalUnitIdentifierDF['sequence'] = sequenceKeys
         SatExperimentalUnitIdentifierDF['ID'] = preAutismDF['preAutismFileNames'].apply(lambda x: x.split('\\')[0].split("_")[0])
 
         transformData['SatExperimentalUnitIdentifier'] = SatExperimentalUnitIdentifierDF
         
         # create a dataframe to be inserted in HubSubject Hub table, the name attribute contains the name for each subject taking part in experiment
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table    
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table    
         HubSubjectDF = pd.DataFrame([])
-        HubSubjectDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        HubSubjectDF['sequence'] = sequenceKeys
         HubSubjectDF['name'] = preAutismDF['preAutismFileNames'].apply(lambda x: x.split('\\')[0].split("-")[0])
 
         transformData['HubSubject'] = HubSubjectDF
         
         # create a dataframe to be inserted in SatSubjectAge Satellite table, the age attribute contains the age for each subject taking part in experiment
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify age in SatSubjectAge satellite table     
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify age in SatSubjectAge satellite table     
         SatSubjectAgeDF = pd.DataFrame([])
-        SatSubjectAgeDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatSubjectAgeDF['sequence'] = sequenceKeys
         SatSubjectAgeDF['age'] = pd.Series([0 for x in range(len(SatSubjectAgeDF.index))])
         
         transformData['SatSubjectAge'] = SatSubjectAgeDF
         
         # create a dataframe to be inserted in SatSubjectName Satellite table, the name attribute contains the age for each subject taking part in experiment
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify name in SatSubjectName satellite table 
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify name in SatSubjectName satellite table 
         SatSubjectNameDF = pd.DataFrame([])
-        SatSubjectNameDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatSubjectNameDF['sequence'] = sequenceKeys
         SatSubjectNameDF['name'] = preAutismDF['preAutismFileNames'].apply(lambda x: x.split('\\')[0].split("-")[0])
 
         transformData['SatSubjectName'] = SatSubjectNameDF
         
         # create a dataframe to be inserted in ParticipatesIn link table, ParticipatesIn links HubExperimentalUnit and HubExperiment
         ParticipatesInDF = pd.DataFrame([])
-        ParticipatesInDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        ParticipatesInDF['experimentalunit'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        ParticipatesInDF['experiment'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        ParticipatesInDF['sequence'] = sequenceKeys
+        ParticipatesInDF['experimentalunit'] = sequenceKeys
+        ParticipatesInDF['experiment'] = sequenceKeys
         
         transformData['ParticipatesIn'] = ParticipatesInDF
         
         # create a dataframe to be inserted in SatFactorName and SatFactorLevel Satellite table
         # there is ine factor called conversation  in pre-autism  data, these are the factor names
         # the level values are Normal and Stressed Conversation
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify title in SatSubjectName satellite table
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify title in SatSubjectName satellite table
         SatFactorDF = pd.DataFrame([])
-        SatFactorDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatFactorDF['sequence'] = sequenceKeys
         SatFactorDF['experiment'] = SatFactorDF['sequence']
         SatFactorDF['isCofactor'] = pd.Series([False for x in range(len(SatFactorDF.index))])
         SatFactorDF['name'] = pd.Series(['Conversation' for x in range(len(SatFactorDF.index))])
@@ -868,10 +1410,10 @@ class FileTransformer():
 
         transformData['SatFactorLevel'] = SatFactorLevelDF
         
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify HubTreatment Hub table and HubExperiment 
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify HubTreatment Hub table and HubExperiment 
         HubTreatmentDF = pd.DataFrame([])
-        HubTreatmentDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        HubTreatmentDF['experiment'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        HubTreatmentDF['sequence'] = sequenceKeys
+        HubTreatmentDF['experiment'] = sequenceKeys
         
         transformData['HubTreatment'] = HubTreatmentDF
         
@@ -881,18 +1423,18 @@ class FileTransformer():
         transformData['SatTreatmentFactorLevel'] = SatTreatmentFactorLevelDF
         
         # create a dataframe to be inserted in HubGroup Hub table, the sequence in this table is created such that it references SatGroupName table records uniquely
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify SatSubjectAge and SatSubjectName satellite table
         HubGroupDF = pd.DataFrame([])
-        HubGroupDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        HubGroupDF['treatment'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        HubGroupDF['sequence'] = sequenceKeys
+        HubGroupDF['treatment'] = sequenceKeys
         
         transformData['HubGroup'] = HubGroupDF
         
         # create a dataframe to be inserted in AssignedTo link table, AssignedTo links HubExperimentalUnit and HubGroup
         AssignedToDF= pd.DataFrame([])
-        AssignedToDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        AssignedToDF['experimentalUnit'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        AssignedToDF['group'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        AssignedToDF['sequence'] = sequenceKeys
+        AssignedToDF['experimentalUnit'] = sequenceKeys
+        AssignedToDF['group'] = sequenceKeys
         
         transformData['AssignedTo'] = AssignedToDF
 
@@ -909,44 +1451,45 @@ class FileTransformer():
         transformData['SatSessionName'] = SatSessionNameDF
         
         # create a dataframe to be inserted in HubSession Hub table, the sequence in this table is created such that it references SatSessionName table records uniquely
-        # a combination of dates, time and file name are chosen as a sequence to uniquely identify SatSessionName satellite table
+        # the hash key of dates, time and file name is chosen as a sequence to uniquely identify SatSessionName satellite table
         HubSessionDF = pd.DataFrame([])
-        HubSessionDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        HubSessionDF['sequence'] = sequenceKeys
         
         transformData['HubSession'] = HubSessionDF
         
         # create a dataframe to be inserted in AttendsSession link table, AttendsSession links HubExperimentalUnit, HubGroup and HubSession
         AttendsSessionDF = pd.DataFrame([])
-        AttendsSessionDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        AttendsSessionDF['experimentalUnit'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        AttendsSessionDF['group'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        AttendsSessionDF['session'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        AttendsSessionDF['sequence'] = sequenceKeys
+        AttendsSessionDF['experimentalUnit'] = sequenceKeys
+        AttendsSessionDF['group'] = sequenceKeys
+        AttendsSessionDF['session'] = sequenceKeys
         
         transformData['AttendsSession'] = AttendsSessionDF
         
         # create a dataframe to be inserted in SessionMetaData link table, SessionMetaData links HubSession and HubMetaData
         SessionMetaDataDF = pd.DataFrame([])
-        SessionMetaDataDF['sequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        SessionMetaDataDF['session'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
-        SessionMetaDataDF['metadata'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SessionMetaDataDF['sequence'] = sequenceKeys
+        SessionMetaDataDF['session'] = sequenceKeys
+        SessionMetaDataDF['metadata'] = sequenceKeys
         
         transformData['SessionMetaData'] = SessionMetaDataDF
         
         # create a dataframe to be inserted in SatObservationName Satellite table, the name attribute uniquely identifies the observation name in the experiment and set to experimrnt title that is derived from file name
-        # a combination of dates, time and file are chosen as a sequence to uniquely identify name in SatObservationName table
+        # the hash key of dates, time and file is chosen as a sequence to uniquely identify name in SatObservationName table
         SatObservationNameDF = pd.DataFrame([])
-        SatObservationNameDF['initialSequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatObservationNameDF['initialSequence'] = businessKeys
         SatObservationNameDF['name'] = SatExperimentTitleDF['title']
         SatObservationNameDF['observationType'] = pd.Series([list(['data', 'wavelengthOneData', 'wavelengthTwoData', 'eventonsData']) for x in range(len(SatObservationNameDF.index))])
         SatObservationNameDF = SatObservationNameDF.set_index(['initialSequence','name']).apply(pd.Series.explode).reset_index()
         SatObservationNameDF['name'] =  ['_'.join(i) for i in zip(SatObservationNameDF['name'],SatObservationNameDF['observationType'])]
         SatObservationNameDF['name'] = SatObservationNameDF['name'].apply(lambda x: x.replace("Conversation","").replace("Autism",""))
-        SatObservationNameDF['sequence'] = ['_'.join(i) for i in zip(SatObservationNameDF['initialSequence'],SatObservationNameDF['observationType'])]
+        SatObservationNameDF['sequence'] = self.registry.hashKeys(self.registry.businessKeys(SatObservationNameDF['initialSequence'], SatObservationNameDF['observationType']))
+        SatObservationNameDF['initialSequence'] = self.registry.hashKeys(SatObservationNameDF['initialSequence'])
 
         transformData['SatObservationName'] = SatObservationNameDF
         
         # create a dataframe to be inserted in HubObservation Hub table, the sequence in this table is created such that it references SatObservationName and SatObservationValue table records uniquely
-        # a combination of dates, time and file are chosen as a sequence to uniquely identify SatObservationName and SatObservationValue satellite table
+        # the hash key of dates, time and file is chosen as a sequence to uniquely identify SatObservationName and SatObservationValue satellite table
         HubObservationDF = pd.DataFrame([])
         HubObservationDF['sequence'] = SatObservationNameDF['sequence']
         HubObservationDF['collectedAtSession'] = SatObservationNameDF['initialSequence']
@@ -963,7 +1506,7 @@ class FileTransformer():
         
         
         SatObservationTimeStampsDF = pd.DataFrame([])
-        SatObservationTimeStampsDF['initialSequence'] = pd.Series(a + '_' + b + '_'+ c for a, b, c in zip(fileName, date, time))
+        SatObservationTimeStampsDF['initialSequence'] = businessKeys
         SatObservationTimeStampsDF['fileName'] = pd.Series(fileName)
         SatObservationTimeStampsDF['fileName'] = SatObservationTimeStampsDF['fileName'].apply(lambda x : x.replace("NIRS-","").split("_")[0])
         SatObservationTimeStampsDF['time'] = pd.Series(time)
@@ -971,59 +1514,39 @@ class FileTransformer():
         SatObservationTimeStampsDF['SamplingRate'] = pd.Series(samplingRates)
         SatObservationTimeStampsDF['observationType'] = pd.Series([list(['data', 'wavelengthOneData', 'wavelengthTwoData', 'eventonsData']) for x in range(len(SatObservationTimeStampsDF.index))])
         SatObservationTimeStampsDF = SatObservationTimeStampsDF.set_index(['initialSequence','fileName','time','SamplingRate']).apply(pd.Series.explode).reset_index()
-        SatObservationTimeStampsDF['sequence'] = ['_'.join(i) for i in zip(SatObservationTimeStampsDF['initialSequence'] ,SatObservationTimeStampsDF['observationType'])]      
-
-        def getTimestamps(startTime, shape, samplingRate) -> list:
-            """
-            gives a list of timestamps starting from srart time in increments of sampling rate
-
-            Args:
-                startTime : initial time
-                shape : the length of array to be created
-                samplingRate : duration between each element of array
-
-            Returns:
-                list: a list of timestamps
-                
-            >>> Example:
-            >>> getTimestamps(2022-10-01 00:00:00, 4, 0.5)
-            [2022-10-01 00:00:00.000, 2022-10-01 00:00:00.500, 2022-10-01 00:00:01.000, 2022-10-01 00:00:01.500]
-            """
-             
-            startDateTime = parser.parse(startTime)       
-            sampleNumbers = np.arange(shape)
-            samplingRate = float(samplingRate)
-            
-            timestamps = []
-            for sampleNumber in sampleNumbers:
-                timestamps.append(str((startDateTime + dt.timedelta(seconds= samplingRate * sampleNumber))))
-            return timestamps
+        SatObservationTimeStampsDF['sequence'] = self.registry.hashKeys(self.registry.businessKeys(SatObservationTimeStampsDF['initialSequence'], SatObservationTimeStampsDF['observationType']))
+        
+        # the time axis of an observation is its start time, the sampling period which is the inverse of the sampling rate in Hz and the number of samples
+        SatObservationTimeStampsDF['startTime'] = pd.to_datetime(SatObservationTimeStampsDF['time'])
+        SatObservationTimeStampsDF['samplePeriod'] = 1 / SatObservationTimeStampsDF['SamplingRate'].astype(float)
 
-        #get observationvalues for each data (.dat, .wl1, .wl3) and generate a timestamp with start time and in steps of sampling rate
+        #get observationvalues for each data (.dat, .wl1, .wl3) along with the start time, sampling period and number of samples
         SatObservationValueDataDF = SatObservationNameDF.set_index('name').filter(like='data', axis=0).reset_index() 
         SatObservationValueDataDF = pd.concat([SatObservationValueDataDF, preAutismDF[['preAutismData']]], axis=1)
         SatObservationValueDataDF = SatObservationValueDataDF[['sequence','preAutismData']]
         SatObservationValueDataDF = SatObservationValueDataDF.rename(columns = {'preAutismData' : 'value'})
         SatObservationValueDataDF = pd.merge(SatObservationValueDataDF, SatObservationTimeStampsDF, how = 'inner', left_on='sequence', right_on='sequence')
-        SatObservationValueDataDF['timestamps'] = SatObservationValueDataDF.apply(lambda x: getTimestamps(x['time'], x['value'].shape[0], x['SamplingRate']), axis = 1)
+        SatObservationValueDataDF['sampleCount'] = SatObservationValueDataDF['value'].apply(lambda x: x.shape[0])
         
         SatObservationValueWavelengthOneDataDF = SatObservationNameDF.set_index('name').filter(like='wavelengthOneData', axis=0).reset_index() 
-        SatObservationValueWavelengthOneDataDF = pd.concat([SatObservationValueDataDF, preAutismDF[['preAutismWavelengthOneData']]], axis=1)
+        SatObservationValueWavelengthOneDataDF = pd.concat([SatObservationValueWavelengthOneDataDF, preAutismDF[['preAutismWavelengthOneData']]], axis=1)
         SatObservationValueWavelengthOneDataDF = SatObservationValueWavelengthOneDataDF[['sequence','preAutismWavelengthOneData']]
         SatObservationValueWavelengthOneDataDF = SatObservationValueWavelengthOneDataDF.rename(columns = {'preAutismWavelengthOneData' : 'value'})
         SatObservationValueWavelengthOneDataDF = pd.merge(SatObservationValueWavelengthOneDataDF, SatObservationTimeStampsDF, how = 'inner', left_on='sequence', right_on='sequence')
-        SatObservationValueWavelengthOneDataDF['timestamps'] = SatObservationValueWavelengthOneDataDF.apply(lambda x: getTimestamps(x['time'], x['value'].shape[0], x['SamplingRate']), axis = 1)
+        SatObservationValueWavelengthOneDataDF['sampleCount'] = SatObservationValueWavelengthOneDataDF['value'].apply(lambda x: x.shape[0])
         
         SatObservationValueWavelengthTwoDataDF = SatObservationNameDF.set_index('name').filter(like='wavelengthTwoData', axis=0).reset_index() 
-        SatObservationValueWavelengthTwoDataDF = pd.concat([SatObservationValueDataDF, preAutismDF[['preAutismWavelengthTwoData']]], axis=1)
+        SatObservationValueWavelengthTwoDataDF = pd.concat([SatObservationValueWavelengthTwoDataDF, preAutismDF[['preAutismWavelengthTwoData']]], axis=1)
         SatObservationValueWavelengthTwoDataDF = SatObservationValueWavelengthTwoDataDF[['sequence','preAutismWavelengthTwoData']]
         SatObservationValueWavelengthTwoDataDF = SatObservationValueWavelengthTwoDataDF.rename(columns = {'preAutismWavelengthTwoData' : 'value'})
         SatObservationValueWavelengthTwoDataDF = pd.merge(SatObservationValueWavelengthTwoDataDF, SatObservationTimeStampsDF, how = 'inner', left_on='sequence', right_on='sequence')
-        SatObservationValueWavelengthTwoDataDF['timestamps'] = SatObservationValueWavelengthTwoDataDF.apply(lambda x: getTimestamps(x['time'], x['value'].shape[0], x['SamplingRate']), axis = 1)    
+        SatObservationValueWavelengthTwoDataDF['sampleCount'] = SatObservationValueWavelengthTwoDataDF['value'].apply(lambda x: x.shape[0])
         
         # combine all the datasets in a single dataframe to be inserted into SatObservationValue table
         SatObservationValueDF = pd.concat([SatObservationValueDataDF, SatObservationValueWavelengthOneDataDF, SatObservationValueWavelengthTwoDataDF]).reset_index()
-        SatObservationValueDF['value'] = SatObservationValueDF['value'].apply(lambda x: x.values.tolist())
+        SatObservationValueDF['value'] = SatObservationValueDF['value'].apply(lambda x: x.to_numpy(dtype=np.float64))
+        # the experiment type is the partition key of SatObservationValue when the vault is partitioned by migration.py
+        SatObservationValueDF['experimentType'] = 'PreAutism'
         
         transformData['SatObservationValue'] = SatObservationValueDF
         
@@ -1038,242 +1561,1341 @@ class FileLoader():
     This class takes the input from transform stage, connects to a postgres database using pyscopg2 and loads the individual
     links, hubs and satellites using INSERT sql query. Along the data the current timestamp and postgres user name is also added to table columns
     
+    bulkLoadDataToEnterpriseLayer loads the same tables with COPY FROM STDIN in batches of rows into unlogged copies of the tables in the staging schema,
+    the staged rows are moved into the vault with one INSERT ... SELECT ... ON CONFLICT DO NOTHING per table so that keys already in the vault are skipped
+    
+    The satellites loaded by COPY carry a hashDiff of their descriptive columns, only the rows whose hashDiff differs from the latest version
+    stored for their key are sent so that reloading unchanged data does not write the satellites again
+    
+    parallelLoadDataToEnterpriseLayer copies the tables into the staging tables at the same time on a pool of connections before merging them in a single transaction,
+    the merges run one after another in the order mergeOrder derives from the foreign keys of the vault
+    
+    The sequence columns of the dataframes already hold the md5 hash keys computed by HashKeyRegistry in the transform stage and are inserted as they are,
+    postgres stores them in uuid columns of 16 bytes
+    The observation matrices of SatObservationValue are loaded with a binary COPY built from the numpy buffers of the arrays,
+    with chunkSamples above 0 the bulk loaders store them as tiles of chunkSamples samples in SatObservationChunk instead.
+    With a valueCodec other than 'array' the matrices or tiles are encoded by ObservationCodec and stored in the encodedValue column
+    
+    After every load the point in time tables of the hubs and the bridge tables are updated for the keys with rows loaded by the load,
+    so that the information mart joins the latest row of every satellite and the keys along the common paths with equi-joins
     
     """
     
-    def loadDataToEnterpriseLayer(self,inputs, connectionParameters) -> None:
+    # the vault tables in the order they are loaded, each entry is the table name which is also the key of its dataframe in the transformed dictionary,
+    # the table columns and the dataframe columns loaded into them. The last item is None for the hubs and links whose rows already in the table are skipped,
+    # otherwise it lists the table columns identifying the versions of a row that are compared by their hashDiff column
+    tables = [
+        ('HubMetaData', ['sequence'], ['sequence'], None),
+        ('SatMetaDataKeyValuePair', ['sequence', 'key', 'value'], ['sequence', 'key', 'value'], ['sequence', 'key']),
+        ('HubExperiment', ['sequence'], ['sequence'], None),
+        ('SatExperimentTitle', ['sequence', 'title'], ['sequence', 'title'], ['sequence']),
+        ('SatExperimentAcronym', ['sequence', 'acronym'], ['sequence', 'acronym'], ['sequence']),
+        ('HubExperimentalUnit', ['sequence'], ['sequence'], None),
+        ('HubSubject', ['sequence', 'name'], ['sequence', 'name'], None),
+        ('SatSubjectAge', ['sequence', 'age'], ['sequence', 'age'], ['sequence']),
+        ('SatSubjectName', ['sequence', 'name'], ['sequence', 'name'], ['sequence']),
+        ('ParticipatesIn', ['sequence', 'experimentalUnit', 'experiment'], ['sequence', 'experimentalunit', 'experiment'], None),
+        ('SatExperimentalUnitIdentifier', ['sequence', 'ID'], ['sequence', 'ID'], ['sequence']),
+        ('HubFactor', ['sequence', 'experiment'], ['sequence', 'experiment'], None),
+        ('SatFactorName', ['sequence', 'name'], ['sequence', 'name'], ['sequence']),
+        ('SatFactorLevel', ['sequence', 'levelValue'], ['sequence', 'levelValue'], None),
+        ('HubTreatment', ['sequence', 'experiment'], ['sequence', 'experiment'], None),
+        ('SatTreatmentFactorLevel', ['sequence', 'factorLevel'], ['experiment', 'sequence'], ['sequence', 'factorLevel']),
+        ('HubGroup', ['sequence', 'treatment'], ['sequence', 'treatment'], None),
+        ('SatGroupName', ['sequence', 'name'], ['sequence', 'name'], ['sequence']),
+        ('AssignedTo', ['sequence', 'experimentalUnit', 'group'], ['sequence', 'experimentalUnit', 'group'], ['sequence']),
+        ('HubSession', ['sequence'], ['sequence'], None),
+        ('SatSessionName', ['sequence', 'name'], ['sequence', 'name'], ['sequence']),
+        ('SessionMetaData', ['sequence', 'session', 'metadata'], ['sequence', 'session', 'metadata'], ['sequence']),
+        ('HubObservation', ['sequence', 'collectedAtSession'], ['sequence', 'collectedAtSession'], None),
+        ('ObservationMetaData', ['sequence', 'observation', 'metadata'], ['sequence', 'observation', 'metadata'], ['sequence', 'observation']),
+        ('AttendsSession', ['sequence', 'experimentalUnit', 'group', 'session'], ['sequence', 'experimentalUnit', 'group', 'session'], ['sequence']),
+        ('SatObservationName', ['sequence', 'name'], ['sequence', 'name'], ['sequence'])
+    ]
+    
+    # the point in time tables with their hub and the satellites whose latest load timestamp they hold for every hub key, the satellites with
+    # several rows for a hub key such as SatMetaDataKeyValuePair keep a version for each of their keys and have no point in time table
+    pointInTimeTables = [
+        ('PitExperiment', 'HubExperiment', ['SatExperimentTitle', 'SatExperimentAcronym']),
+        ('PitFactor', 'HubFactor', ['SatFactorName', 'SatFactorLevel']),
+        ('PitSubject', 'HubSubject', ['SatSubjectName', 'SatSubjectAge']),
+        ('PitGroup', 'HubGroup', ['SatGroupName']),
+        ('PitSession', 'HubSession', ['SatSessionName']),
+        ('PitObservation', 'HubObservation', ['SatObservationName', 'SatObservationValue'])
+    ]
+    
+    # the bridge tables with their key columns and the query of the keys along their path, the query selects the paths through a row loaded at or after since
+    # with the timestamp of the first load that completed the path
+    bridgeTables = [
+        ('BridgeExperimentTreatmentFactor', ['experiment', 'treatment', 'factor'],
+         """SELECT ht."experiment", ht."sequence", stfl."factorLevel", min(greatest(ht."timestamp", stfl."timestamp"))
+            FROM "HubTreatment" ht JOIN "SatTreatmentFactorLevel" stfl ON stfl."sequence" = ht."sequence"
+            WHERE ht."sequence" IN (SELECT "sequence" FROM "HubTreatment" WHERE "timestamp" >= %(since)s UNION SELECT "sequence" FROM "SatTreatmentFactorLevel" WHERE "timestamp" >= %(since)s)
+            GROUP BY ht."experiment", ht."sequence", stfl."factorLevel" """),
+        ('BridgeExperimentalUnitObservation', ['experimentalUnit', 'group', 'session', 'observation'],
+         """SELECT ats."experimentalUnit", ats."group", ats."session", ho."sequence", min(greatest(ats."timestamp", ho."timestamp"))
+            FROM "AttendsSession" ats JOIN "HubObservation" ho ON ho."collectedAtSession" = ats."session"
+            WHERE ats."session" IN (SELECT "session" FROM "AttendsSession" WHERE "timestamp" >= %(since)s UNION SELECT "collectedAtSession" FROM "HubObservation" WHERE "timestamp" >= %(since)s)
+            GROUP BY ats."experimentalUnit", ats."group", ats."session", ho."sequence" """)
+    ]
+    
+    # timestamps are sent to postgres as microseconds since 2000-01-01, the value column declared as float(8) is a real array with the oid of real
+    postgresEpoch = np.datetime64('2000-01-01T00:00:00', 'us')
+    realOid = 700
+    
+    # number of samples in a tile of SatObservationChunk, 0 keeps every observation matrix as a single value in SatObservationValue
+    chunkSamples = 0
+    
+    # the observation matrices are stored as real arrays in the value column with 'array', the other codecs of ObservationCodec store them in encodedValue
+    valueCodec = 'array'
+    codec = ObservationCodec()
+    
+    def encodeArray(self, values) -> bytes:
         """
         
-        this function connects to a postgre server, takes the input dictionary and retrieves each of the dataframe based on keys
-        the data is inserted using pyscopg2 library
+        encodes a 2D array in the binary format of a postgres real[][] value
         
+        The array header holds the number of dimensions, the element type and the size of each dimension, it is followed by the length
+        and big-endian value of every element. The elements are written from a numpy record array in a single copy.
+
         Args:
-            inputs : a dictionary with key as table name and value as the dataframe to be inserted in "key" table
+            values : a 2D array of numbers
 
         Returns:
-            None
+            bytes: the binary representation of the array
+        """
+        values = np.asarray(values, dtype=np.float32)
+        if values.size == 0:
+            return struct.pack('>iii', 0, 0, self.realOid)
         
+        header = [values.ndim, 0, self.realOid]
+        for size in values.shape:
+            header.extend([size, 1])
         
-        """
-        user=connectionParameters['user']
-        password=connectionParameters['password']
-        host=connectionParameters['host']
-        port=connectionParameters['port']
-        database=connectionParameters['database']
+        elements = np.empty(values.size, dtype=[('length', '>i4'), ('value', '>f4')])
+        elements['length'] = 4
+        elements['value'] = values.ravel()
         
+        return np.array(header, dtype='>i4').tobytes() + elements.tobytes()
+    
+    def encodeTimestamp(self, timestamp) -> bytes:
+        """
+        encodes a timestamp in the binary format of a postgres timestamp value
+        """
+        return struct.pack('>q', int((np.datetime64(pd.Timestamp(timestamp), 'us') - self.postgresEpoch) // np.timedelta64(1, 'us')))
+    
+    def encodeMatrix(self, values) -> bytes:
+        """
         
-        print("Connection to postgres with the parameters ....")
+        writes the value, codec and encodedValue fields of an observation matrix in the binary format of postgres COPY,
+        the matrix is written to value as a real array or to encodedValue with the codec given by valueCodec
+
+        Args:
+            values : a 2D numpy array with a row for every sample
+
+        Returns:
+            bytes: the three fields with their lengths, the fields that are not used are NULL
+        """
+        null = struct.pack('>i', -1)
+        if self.valueCodec == 'array':
+            data = self.encodeArray(values)
+            return struct.pack('>i', len(data)) + data + null + null
+        
+        codec = self.valueCodec.encode('utf-8')
+        data = self.codec.encode(values, self.valueCodec)
+        return null + struct.pack('>i', len(codec)) + codec + struct.pack('>i', len(data)) + data
+    
+    def encodeObservationValues(self, SatObservationValueDF, loadTimestamp, user, withValues = True) -> io.BytesIO:
+        """
+        
+        writes the rows of SatObservationValue in the binary format of postgres COPY
+
+        Args:
+            SatObservationValueDF : the dataframe of SatObservationValue table from transform stage with its hashDiff column
+            loadTimestamp : the timestamp of the load
+            user : the postgres user name stored as source
+            withValues : writes NULL in place of the observation matrices when False, they are then stored in SatObservationChunk. Defaults to True.
+
+        Returns:
+            io.BytesIO: a stream with the binary COPY data to be read by copy_expert
+        """
+        def field(data) -> bytes:
+            return struct.pack('>i', len(data)) + data
+        
+        stream = io.BytesIO()
+        stream.write(b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0))
+        
+        timestamp = field(self.encodeTimestamp(loadTimestamp))
+        source = field(user.encode('utf-8'))
+        for sequence, value, startTime, samplePeriod, sampleCount, hashDiff, experimentType in zip(SatObservationValueDF['sequence'], SatObservationValueDF['value'], SatObservationValueDF['startTime'], SatObservationValueDF['samplePeriod'], SatObservationValueDF['sampleCount'], SatObservationValueDF['hashDiff'], SatObservationValueDF['experimentType']):
+            stream.write(struct.pack('>h', 11))
+            stream.write(field(uuid.UUID(sequence).bytes))
+            stream.write(timestamp)
+            stream.write(source)
+            stream.write(self.encodeMatrix(value) if withValues else struct.pack('>iii', -1, -1, -1))
+            stream.write(field(self.encodeTimestamp(startTime)))
+            stream.write(field(struct.pack('>f', float(samplePeriod))))
+            stream.write(field(struct.pack('>i', int(sampleCount))))
+            stream.write(field(hashDiff.encode('utf-8')))
+            stream.write(field(experimentType.encode('utf-8')))
+        
+        stream.write(struct.pack('>h', -1))
+        stream.seek(0)
+        return stream
+    
+    def encodeObservationChunks(self, SatObservationValueDF, loadTimestamp, user) -> io.BytesIO:
+        """
+        
+        splits the observation matrices into tiles of chunkSamples samples and writes them as rows of SatObservationChunk in the binary format of postgres COPY
+        
+        A tile holds all the channels of its samples and starts at the time of its first sample, the last tile of an observation may be shorter
+
+        Args:
+            SatObservationValueDF : the dataframe of SatObservationValue table from transform stage with its hashDiff column
+            loadTimestamp : the timestamp of the load
+            user : the postgres user name stored as source
+
+        Returns:
+            io.BytesIO: a stream with the binary COPY data to be read by copy_expert
+        
+        >>> Example: 
+            an observation of 2500 samples with chunkSamples 1000 is written as tiles of 1000, 1000 and 500 samples
+            starting at startTime, startTime + 1000 * samplePeriod and startTime + 2000 * samplePeriod
+        """
+        def field(data) -> bytes:
+            return struct.pack('>i', len(data)) + data
+        
+        stream = io.BytesIO()
+        stream.write(b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0))
+        
+        timestamp = field(self.encodeTimestamp(loadTimestamp))
+        source = field(user.encode('utf-8'))
+        for sequence, value, startTime, samplePeriod, hashDiff in zip(SatObservationValueDF['sequence'], SatObservationValueDF['value'], SatObservationValueDF['startTime'], SatObservationValueDF['samplePeriod'], SatObservationValueDF['hashDiff']):
+            # the start of a tile is computed from the sample number as in expandTimestamps of InformationDelivery
+            firstSamples = np.arange(0, value.shape[0], self.chunkSamples)
+            chunkStarts = np.datetime64(pd.Timestamp(startTime), 'us') + np.round(firstSamples * (float(samplePeriod) * 1e6)).astype('timedelta64[us]')
+            for firstSample, chunkStart in zip(firstSamples, chunkStarts):
+                chunk = value[firstSample:firstSample + self.chunkSamples]
+                stream.write(struct.pack('>h', 9))
+                stream.write(field(uuid.UUID(sequence).bytes))
+                stream.write(timestamp)
+                stream.write(source)
+                stream.write(field(hashDiff.encode('utf-8')))
+                stream.write(field(self.encodeTimestamp(chunkStart)))
+                stream.write(field(struct.pack('>i', chunk.shape[0])))
+                stream.write(self.encodeMatrix(chunk))
+        
+        stream.write(struct.pack('>h', -1))
+        stream.seek(0)
+        return stream
+    
+    def loadDataToEnterpriseLayer(self,inputs, connectionParameters, journal = None, batchKey = None) -> bool:
+        """
+        
+        this function connects to a postgre server, takes the input dictionaries and retrieves each of the dataframe based on keys
+        the data is inserted using pyscopg2 library
+        
+        Hubs are insert only, a hub row whose sequence is already in the table is left unchanged so that a changed file can be loaded again.
+        The satellite rows are given a hashDiff of their columns and a row is only inserted when it differs from the latest version stored for its key
+        
+        The rows are inserted one at a time and the rows of a table are committed together, so a failed load leaves every table either loaded or not.
+        When a journal is given every committed table is recorded in it, so loading the batch again with the same journal
+        loads only the tables that were not committed
+        
+        Args:
+            inputs : a list of dictionaries, one for every transformed batch, with key as table name and value as the dataframe to be inserted in "key" table
+            connectionParameters : a dictionary of postgres connection parameters
+            journal : the LoadJournal of the run. Defaults to None which does not keep a checkpoint.
+            batchKey : key of the batch in the journal. Defaults to None.
+
+        Returns:
+            bool: True when all the data is inserted, False when an error occured
+        
+        
+        """
+        user=connectionParameters['user']
+        password=connectionParameters['password']
+        host=connectionParameters['host']
+        port=connectionParameters['port']
+        database=connectionParameters['database']
+        
+        
+        print("Connection to postgres with the parameters ....")
         print("user :",connectionParameters['user'])
         print("password :",connectionParameters['password'])
         print("host :",connectionParameters['host'])
         print("port :", connectionParameters['port'])
         print("database :",connectionParameters['database'])
     
+        connection = None
+        cursor = None
+        try:
+            connection = psycopg2.connect(user=user,password=password,host=host,port=port,database=database)
+            
+            # every row is inserted with the timestamp of the transaction of its table, the point in time and bridge tables are updated from the first one,
+            # which is the start of the first attempt for a batch in the journal
+            cursor = connection.cursor()
+            cursor.execute("SELECT localtimestamp")
+            loadStart = cursor.fetchone()[0]
+            committed = set()
+            if journal:
+                loadStart = journal.start(batchKey, loadStart)
+                committed = journal.committedTables(batchKey)
+            
+            # the tables are loaded in the order of the tables attribute, which lists every table after the tables it references,
+            # the satellites and links that are not insert only get the hashDiff of their columns and only their new or changed rows are inserted, as in the bulk loaders
+            for table, tableColumns, frameColumns, keyColumns in self.tables:
+                if table in committed:
+                    continue
+                
+                cursor.execute("SELECT localtimestamp")
+                tableTimestamp = cursor.fetchone()[0]
+                for input in inputs:
+                    frame, rowColumns, frameRowColumns = input[table], tableColumns, frameColumns
+                    if keyColumns is not None:
+                        frame, rowColumns, frameRowColumns = self.versionRows(cursor, table, tableColumns, frame, frameColumns, keyColumns)
+                    
+                    columns = ','.join('"%s"' % column for column in rowColumns[:1] + ['timestamp', 'source'] + rowColumns[1:])
+                    values = ','.join(['%s', 'current_timestamp', '%s'] + ['%s'] * (len(rowColumns) - 1))
+                    # a row whose key is already in the table, or repeated in the batch with the timestamp of the transaction, is skipped as in the bulk merge
+                    query = 'INSERT INTO "%s" (%s) VALUES (%s) ON CONFLICT DO NOTHING' % (table, columns, values)
+                    for row in zip(*[frame[column] for column in frameRowColumns]):
+                        cursor.execute(query, (row[0], user) + row[1:])
+                self.logLoad(cursor, tableTimestamp, user)
+                connection.commit()
+                if journal:
+                    journal.record(batchKey, [table])
+            
+            # the observation matrices are streamed in the binary COPY format instead of array literals, the unchanged matrices are not sent again
+            if 'SatObservationValue' not in committed:
+                cursor.execute("SELECT localtimestamp")
+                loadTimestamp = cursor.fetchone()[0]
+                copied = set()
+                for input in inputs:
+                    SatObservationValueDF = input['SatObservationValue']
+                    SatObservationValueDF = SatObservationValueDF.assign(hashDiff = self.observationHashDiff(SatObservationValueDF))
+                    SatObservationValueDF = self.changedRows(cursor, 'SatObservationValue', SatObservationValueDF, ['sequence'], ['sequence'])
+                    # COPY has no ON CONFLICT, the first row of a sequence repeated in the batch is kept as in the bulk merge
+                    SatObservationValueDF = SatObservationValueDF[~SatObservationValueDF['sequence'].duplicated() & ~SatObservationValueDF['sequence'].isin(copied)]
+                    copied.update(SatObservationValueDF['sequence'])
+                    cursor.copy_expert("""COPY "SatObservationValue" (sequence,timestamp,source,value,codec,"encodedValue","startTime","samplePeriod","sampleCount","hashDiff","experimentType") FROM STDIN WITH (FORMAT binary)""", 
+                                       self.encodeObservationValues(SatObservationValueDF, loadTimestamp, user))
+                self.logLoad(cursor, loadTimestamp, user)
+                connection.commit()
+                if journal:
+                    journal.record(batchKey, ['SatObservationValue'])
+            
+            # the bridge rows get the timestamps of the rows they join, which are at or after the start of the load
+            self.updatePointInTimeTables(cursor, loadStart)
+            self.updateBridgeTables(cursor, loadStart)
+            self.logLoad(cursor, loadStart, user)
+            connection.commit()
+
+            print("Inserted data successfully in PostgreSQL ")
+            return True
+
+        except (Exception, Error) as error:
+            print("Error while connecting to PostgreSQL", error)
+            return False
+        finally:
+            if connection:
+                if cursor:
+                    cursor.close()
+                connection.close()
+                print("PostgreSQL connection is closed")
+    
+    def encodeRows(self, frame, frameColumns, loadTimestamp, user) -> io.StringIO:
+        """
+        
+        writes the rows of a dataframe in the csv format of postgres COPY with the load timestamp and source after the sequence
+        
+        Strings are quoted so that an empty string is not read as NULL and bytes are written in the hexadecimal format of bytea
+
+        Args:
+            frame : the dataframe from transform stage
+            frameColumns : the columns of the dataframe to be written, the first one is the sequence
+            loadTimestamp : the timestamp of the load
+            user : the postgres user name stored as source
+
+        Returns:
+            io.StringIO: a stream with the csv COPY data to be read by copy_expert
+        """
+        rows = frame[frameColumns].copy()
+        rows.columns = range(len(frameColumns))
+        for column in rows.columns:
+            if len(rows) and isinstance(rows[column].iloc[0], bytes):
+                rows[column] = rows[column].map(lambda value: '\\x' + value.hex())
+        rows.insert(1, 'timestamp', pd.Timestamp(loadTimestamp).isoformat())
+        rows.insert(2, 'source', user)
+        
+        stream = io.StringIO()
+        rows.to_csv(stream, header=False, index=False, quoting=csv.QUOTE_NONNUMERIC)
+        stream.seek(0)
+        return stream
+    
+    def hashDiff(self, frame, columns) -> pd.core.series.Series:
+        """
+        
+        computes the md5 hash of the descriptive columns of every row, the hash changes when any of the columns change
+        
+        The columns are joined with '|' as text, bytes are written in hexadecimal and numpy arrays are replaced by the md5 hash of their buffer
+
+        Args:
+            frame : the dataframe from transform stage
+            columns : the descriptive columns of the dataframe
+
+        Returns:
+            pd.core.series.Series: the md5 hex hash of every row with the index of the dataframe
+        
+        >>> Example: 
+        >>> hashDiff(pd.DataFrame({'sequence': ['a1'], 'name': ['HbO']}), ['name'])
+        >>> 0    b31a65766aa6f711a9f78e872db3cd02
+        """
+        def text(value) -> str:
+            if isinstance(value, np.ndarray):
+                return hashlib.md5(np.ascontiguousarray(value).tobytes()).hexdigest()
+            if isinstance(value, bytes):
+                return value.hex()
+            return str(value)
+        
+        rows = ['|'.join(values) for values in zip(*[frame[column].map(text) for column in columns])] if columns else [''] * len(frame.index)
+        return pd.Series([hashlib.md5(row.encode('utf-8')).hexdigest() for row in rows], index=frame.index, dtype=object)
+    
+    def changedRows(self, cursor, table, frame, keyColumns, frameKeyColumns) -> pd.core.frame.DataFrame:
+        """
+        
+        keeps the rows of a dataframe whose hashDiff differs from the latest version stored in the table for the same key
+        
+        The latest hashDiff of every key in the dataframe is read with a single query, so reloading unchanged rows costs the comparison of their hashes
+
+        Args:
+            cursor : cursor of the open transaction
+            table : name of the vault table
+            frame : the dataframe from transform stage with its hashDiff column
+            keyColumns : the table columns identifying the versions of a row
+            frameKeyColumns : the dataframe columns loaded into keyColumns
+
+        Returns:
+            pd.core.frame.DataFrame: the rows that are new or changed since the last load
+        """
+        if len(frame.index) == 0:
+            return frame
+        
+        keys = ','.join('"%s"' % column for column in keyColumns)
+        cursor.execute('SELECT DISTINCT ON (%s) %s, "hashDiff" FROM "%s" WHERE "%s" = ANY(%%s::uuid[]) ORDER BY %s, "timestamp" DESC' % (keys, keys, table, keyColumns[0], keys), 
+                       (list(frame[frameKeyColumns[0]].unique()),))
+        stored = set(tuple(str(value) for value in row) for row in cursor.fetchall())
+        
+        loaded = zip(*[frame[column].map(str) for column in frameKeyColumns + ['hashDiff']])
+        return frame[[row not in stored for row in loaded]]
+    
+    def versionRows(self, cursor, table, tableColumns, frame, frameColumns, keyColumns) -> tuple:
+        """
+        
+        gives the rows of a table that is not insert only with the hashDiff of their columns outside keyColumns, only the rows that are new
+        or changed since the last load are kept
+
+        Args:
+            cursor : cursor of the open transaction
+            table : name of the vault table
+            tableColumns : the columns of the table after sequence, timestamp and source are added
+            frame : the dataframe from transform stage
+            frameColumns : the columns of the dataframe loaded into tableColumns
+            keyColumns : the table columns identifying the versions of a row
+
+        Returns:
+            tuple: the new or changed rows, the table columns and the dataframe columns with hashDiff added
+        """
+        frameKeyColumns = [frameColumns[tableColumns.index(column)] for column in keyColumns]
+        frame = frame.assign(hashDiff = self.hashDiff(frame, [column for column in frameColumns if column not in frameKeyColumns]))
+        frame = self.changedRows(cursor, table, frame, keyColumns, frameKeyColumns)
+        return frame, tableColumns + ['hashDiff'], frameColumns + ['hashDiff']
+    
+    def copyTable(self, cursor, table, tableColumns, frame, frameColumns, keyColumns, loadTimestamp, user, copyRows = 10000) -> None:
+        """
+        
+        copies a dataframe into the unlogged staging copy of a vault table with COPY statements of at most copyRows rows
+        
+        The rows of the tables that are not insert only are given a hashDiff of their columns outside keyColumns and only the rows
+        that are new or changed are copied, the staged rows are moved into the vault table by mergeTable
+
+        Args:
+            cursor : cursor of the open transaction
+            table : name of the vault table
+            tableColumns : the columns of the table after sequence, timestamp and source are added
+            frame : the dataframe from transform stage
+            frameColumns : the columns of the dataframe loaded into tableColumns
+            keyColumns : the table columns identifying the versions of a row, None for insert only tables
+            loadTimestamp : the timestamp of the load
+            user : the postgres user name stored as source
+            copyRows : number of rows sent in a single COPY statement. Defaults to 10000.
+        """
+        if keyColumns is not None:
+            frame, tableColumns, frameColumns = self.versionRows(cursor, table, tableColumns, frame, frameColumns, keyColumns)
+        
+        columns = ','.join('"%s"' % column for column in tableColumns[:1] + ['timestamp', 'source'] + tableColumns[1:])
+        for start in range(0, len(frame.index), int(copyRows)):
+            cursor.copy_expert('COPY staging."%s" (%s) FROM STDIN WITH (FORMAT csv)' % (table, columns), 
+                               self.encodeRows(frame.iloc[start:start + int(copyRows)], frameColumns, loadTimestamp, user))
+    
+    def mergeTable(self, cursor, table) -> None:
+        """
+        
+        moves the staged rows of a table into the vault with a single INSERT ... SELECT and empties the staging table
+        
+        The foreign keys and unique keys of the vault table are checked once for the whole batch, the rows whose keys are already
+        in the vault are skipped with ON CONFLICT DO NOTHING. When the statement fails the transaction is rolled back and the rows stay in staging
+
+        Args:
+            cursor : cursor of the open transaction
+            table : name of the vault table
+        """
+        cursor.execute('INSERT INTO "%s" SELECT * FROM staging."%s" ON CONFLICT DO NOTHING' % (table, table))
+        cursor.execute('TRUNCATE staging."%s"' % table)
+    
+    def logLoad(self, cursor, loadTimestamp, user) -> None:
+        """
+        
+        records a load in LoadLog in the transaction that commits its rows, the information mart refreshes the keys of the rows loaded at or after
+        the earliest timestamp of the loads it has not refreshed yet, so a load is refreshed once it is committed whatever the timestamp of its rows
+
+        Args:
+            cursor : cursor of the open transaction
+            loadTimestamp : the earliest timestamp of the rows committed by the transaction
+            user : the postgres user name stored as source
+        """
+        cursor.execute('INSERT INTO "LoadLog" ("timestamp","source") VALUES (%s,%s)', (loadTimestamp, user))
+    
+    def updatePointInTimeTables(self, cursor, since) -> None:
+        """
+        
+        updates the point in time tables for the hub keys with satellite rows loaded at or after since
+        
+        The row of a hub key holds the load timestamp of the latest row of each of its satellites and the latest of these timestamps,
+        so the latest version of a satellite is joined on its sequence and timestamp instead of being searched among all its versions
+
+        Args:
+            cursor : cursor of the open transaction
+            since : the timestamp of the load
+        
+        >>> Example: 
+        >>> updatePointInTimeTables(cursor, loadTimestamp)
+        >>> PitGroup : sequence | timestamp | SatGroupName
+        >>>            0cc175b9-c0f1-b6a8-31c3-99e269772661 | 2022-12-01 10:00:00 | 2022-12-01 10:00:00
+        """
+        for pointInTimeTable, hub, satellites in self.pointInTimeTables:
+            columns = ','.join('"%s"' % satellite for satellite in satellites)
+            latest = ','.join('(SELECT max(s."timestamp") FROM "%s" s WHERE s."sequence" = h."sequence") AS "%s"' % (satellite, satellite) for satellite in satellites)
+            changedKeys = ' UNION '.join('SELECT "sequence" FROM "%s" WHERE "timestamp" >= %%(since)s' % satellite for satellite in satellites)
+            updates = ','.join('"%s" = excluded."%s"' % (satellite, satellite) for satellite in satellites)
+            cursor.execute("""INSERT INTO "%s" ("sequence","timestamp",%s)
+                              SELECT "sequence", greatest(%s), %s FROM (SELECT h."sequence", %s FROM "%s" h WHERE h."sequence" IN (%s)) AS latest
+                              ON CONFLICT ("sequence") DO UPDATE SET "timestamp" = excluded."timestamp", %s""" % (pointInTimeTable, columns, columns, columns, latest, hub, changedKeys, updates),
+                           {'since': since})
+    
+    def updateBridgeTables(self, cursor, since) -> None:
+        """
+        
+        adds to the bridge tables the paths of keys through the hub, link and satellite rows loaded at or after since,
+        the paths already in a bridge table are skipped
+
+        Args:
+            cursor : cursor of the open transaction
+            since : the timestamp of the load
+        """
+        for bridgeTable, columns, query in self.bridgeTables:
+            cursor.execute("""INSERT INTO "%s" (%s,"timestamp") %s ON CONFLICT DO NOTHING""" % (bridgeTable, ','.join('"%s"' % column for column in columns), query),
+                           {'since': since})
+    
+    def bulkLoadDataToEnterpriseLayer(self, inputs, connectionParameters, copyRows = 10000, journal = None, batchKey = None) -> bool:
+        """
+        
+        this function connects to a postgre server and loads every dataframe of the input dictionaries with COPY FROM STDIN
+        
+        The tables of the inputs are first copied into their unlogged staging copies, which are not written to the write ahead log, and committed.
+        The staged rows are then merged into the vault tables in the order given by mergeOrder in a single transaction, a batch is either loaded completely or not at all
+        and a failed merge leaves the batch in the staging tables. The rows of every table share the timestamp of the load.
+        
+        When a journal is given the batch is recorded in it with its timestamp, the tables are recorded once the merge is committed
+        and a batch whose tables are all committed by an earlier attempt is not loaded again
+        
+        Args:
+            inputs : a list of dictionaries, one for every transformed batch, with key as table name and value as the dataframe to be inserted in "key" table
+            connectionParameters : a dictionary of postgres connection parameters
+            copyRows : number of rows sent in a single COPY statement. Defaults to 10000.
+            journal : the LoadJournal of the run. Defaults to None which does not keep a checkpoint.
+            batchKey : key of the batch in the journal. Defaults to None.
+
+        Returns:
+            bool: True when all the data is inserted, False when an error occured
+        """
+        user=connectionParameters['user']
+        
+        print("Connection to postgres with the parameters ....")
+        print("user :",connectionParameters['user'])
+        print("host :",connectionParameters['host'])
+        print("port :", connectionParameters['port'])
+        print("database :",connectionParameters['database'])
+        
+        connection = None
+        cursor = None
+        try:
+            connection = psycopg2.connect(**connectionParameters)
+            cursor = connection.cursor()
+            cursor.execute("SELECT localtimestamp")
+            loadTimestamp = cursor.fetchone()[0]
+            
+            tables = self.loadOrder()
+            if journal:
+                loadTimestamp = journal.start(batchKey, loadTimestamp)
+                tables = [table for table in tables if table not in journal.committedTables(batchKey)]
+            
+            for table in tables:
+                self.stageTable(cursor, table, inputs, loadTimestamp, user, copyRows)
+            connection.commit()
+            
+            for table in self.mergeOrder(cursor, tables):
+                self.mergeTable(cursor, table)
+            self.updatePointInTimeTables(cursor, loadTimestamp)
+            self.updateBridgeTables(cursor, loadTimestamp)
+            self.logLoad(cursor, loadTimestamp, user)
+            connection.commit()
+            if journal:
+                journal.record(batchKey, tables)
+            print("Inserted data successfully in PostgreSQL ")
+            return True
+
+        except (Exception, Error) as error:
+            print("Error while connecting to PostgreSQL", error)
+            return False
+        finally:
+            if connection:
+                if cursor:
+                    cursor.close()
+                connection.close()
+                print("PostgreSQL connection is closed")
+    
+    def copyObservationValues(self, cursor, SatObservationValueDF, loadTimestamp, user, copyRows = 10000) -> None:
+        """
+        
+        copies the observation matrices of SatObservationValue into its staging table with binary COPY statements of at most copyRows rows,
+        the rows whose hashDiff equals the latest version stored for their sequence are skipped
+
+        Args:
+            cursor : cursor of the open transaction
+            SatObservationValueDF : the SatObservationValue dataframe from transform stage
+            loadTimestamp : the timestamp of the load
+            user : the postgres user name stored as source
+            copyRows : number of rows sent in a single COPY statement. Defaults to 10000.
+        """
+        # the observation matrices that did not change since the last load are not sent to postgres again
+        SatObservationValueDF = SatObservationValueDF.assign(hashDiff = self.observationHashDiff(SatObservationValueDF))
+        SatObservationValueDF = self.changedRows(cursor, 'SatObservationValue', SatObservationValueDF, ['sequence'], ['sequence'])
+        
+        for start in range(0, len(SatObservationValueDF.index), int(copyRows)):
+            cursor.copy_expert("""COPY staging."SatObservationValue" (sequence,timestamp,source,value,codec,"encodedValue","startTime","samplePeriod","sampleCount","hashDiff","experimentType") FROM STDIN WITH (FORMAT binary)""", 
+                               self.encodeObservationValues(SatObservationValueDF.iloc[start:start + int(copyRows)], loadTimestamp, user, not self.chunkSamples))
+    
+    def copyObservationChunks(self, cursor, SatObservationValueDF, loadTimestamp, user, copyRows = 10000) -> None:
+        """
+        
+        copies the tiles of the observation matrices into the staging table of SatObservationChunk when chunkSamples is above 0,
+        the observations whose hashDiff equals the latest version of their tiles are skipped
+
+        Args:
+            cursor : cursor of the open transaction
+            SatObservationValueDF : the SatObservationValue dataframe from transform stage
+            loadTimestamp : the timestamp of the load
+            user : the postgres user name stored as source
+            copyRows : number of observations sent in a single COPY statement. Defaults to 10000.
+        """
+        if not self.chunkSamples:
+            return
+        
+        SatObservationValueDF = SatObservationValueDF.assign(hashDiff = self.observationHashDiff(SatObservationValueDF))
+        SatObservationValueDF = self.changedRows(cursor, 'SatObservationChunk', SatObservationValueDF, ['sequence'], ['sequence'])
+        
+        for start in range(0, len(SatObservationValueDF.index), int(copyRows)):
+            cursor.copy_expert("""COPY staging."SatObservationChunk" (sequence,timestamp,source,"hashDiff","chunkStart","sampleCount",value,codec,"encodedValue") FROM STDIN WITH (FORMAT binary)""", 
+                               self.encodeObservationChunks(SatObservationValueDF.iloc[start:start + int(copyRows)], loadTimestamp, user))
+    
+    def observationHashDiff(self, SatObservationValueDF) -> pd.core.series.Series:
+        """
+        
+        gives the hashDiff of the observation matrices, the size of the tiles and the codec are part of the hash so that changing
+        chunkSamples or valueCodec loads a new version
+        
+        The matrices are hashed as the float32 values stored by every codec, so the hashDiff of a stored matrix can be computed again from the vault
+        """
+        SatObservationValueDF = SatObservationValueDF.assign(value = [np.asarray(value, dtype='<f4') for value in SatObservationValueDF['value']])
+        columns = ['value', 'startTime', 'samplePeriod', 'sampleCount']
+        if self.chunkSamples:
+            SatObservationValueDF = SatObservationValueDF.assign(chunkSamples = self.chunkSamples)
+            columns.append('chunkSamples')
+        if self.valueCodec != 'array':
+            SatObservationValueDF = SatObservationValueDF.assign(valueCodec = self.valueCodec)
+            columns.append('valueCodec')
+        return self.hashDiff(SatObservationValueDF, columns)
+    
+    def loadOrder(self) -> list:
+        """
+        
+        returns the names of the vault tables loaded by the bulk loaders in the order of the tables attribute
+        """
+        return [table for table, tableColumns, frameColumns, keyColumns in self.tables] + ['SatObservationValue', 'SatObservationChunk']
+    
+    def dependencyGraph(self, cursor, tables) -> dict:
+        """
+        
+        reads the foreign keys of the vault from the postgres catalog and returns the tables each table references
+        
+        Only the references between the given tables are kept, a table that references no other table has an empty set
+
+        Args:
+            cursor : cursor of an open connection to the vault
+            tables : names of the tables to be loaded
+
+        Returns:
+            dict: a dictionary with key as table name and value as the set of table names it references
+        
+        >>> Example: 
+        >>> dependencyGraph(cursor, ['HubExperiment', 'HubTreatment', 'HubGroup'])
+        >>> {'HubExperiment': set(), 'HubTreatment': {'HubExperiment'}, 'HubGroup': {'HubTreatment'}}
+        """
+        cursor.execute("""SELECT DISTINCT child.relname, parent.relname FROM pg_constraint c 
+                          JOIN pg_class child ON child.oid = c.conrelid JOIN pg_class parent ON parent.oid = c.confrelid 
+                          WHERE c.contype = 'f' AND pg_table_is_visible(child.oid)""")
+        
+        graph = {table : set() for table in tables}
+        for child, parent in cursor.fetchall():
+            if child in graph and parent in graph and child != parent:
+                graph[child].add(parent)
+        return graph
+    
+    def mergeOrder(self, cursor, tables) -> list:
+        """
+        
+        orders the staged tables so that every table is merged after the tables its foreign keys reference, the tables without
+        a reference between them keep their order in tables. The foreign keys are read with dependencyGraph
+
+        Args:
+            cursor : cursor of an open connection to the vault
+            tables : names of the tables to be merged
+
+        Returns:
+            list: the names of the tables in the order they are merged
+        
+        >>> Example: 
+        >>> mergeOrder(cursor, ['HubGroup', 'HubTreatment', 'HubExperiment'])
+        >>> ['HubExperiment', 'HubTreatment', 'HubGroup']
+        """
+        pending = self.dependencyGraph(cursor, tables)
+        order = []
+        while pending:
+            ready = next((table for table in tables if table in pending and not pending[table] - set(order)), None)
+            if ready is None:
+                raise ValueError("the foreign keys of the tables %s form a cycle" % ', '.join(pending))
+            order.append(ready)
+            del pending[ready]
+        return order
+    
+    def stageTable(self, cursor, table, inputs, loadTimestamp, user, copyRows = 10000) -> None:
+        """
+        
+        empties the staging copy of a vault table and copies the dataframes of the table from every input dictionary into it
+
+        Args:
+            cursor : cursor of the open transaction
+            table : name of the vault table
+            inputs : a list of dictionaries with key as table name and value as the dataframe to be inserted in "key" table
+            loadTimestamp : the timestamp of the load
+            user : the postgres user name stored as source
+            copyRows : number of rows sent in a single COPY statement. Defaults to 10000.
+        """
+        # rows left in staging by a failed merge are replaced by the current batch
+        cursor.execute('TRUNCATE staging."%s"' % table)
+        for input in inputs:
+            if table == 'SatObservationValue':
+                self.copyObservationValues(cursor, input[table], loadTimestamp, user, copyRows)
+                continue
+            
+            if table == 'SatObservationChunk':
+                self.copyObservationChunks(cursor, input['SatObservationValue'], loadTimestamp, user, copyRows)
+                continue
+            
+            tableColumns, frameColumns, keyColumns = next(spec[1:] for spec in self.tables if spec[0] == table)
+            self.copyTable(cursor, table, tableColumns, input[table], frameColumns, keyColumns, loadTimestamp, user, copyRows)
+    
+    def parallelLoadDataToEnterpriseLayer(self, inputs, connectionParameters, copyRows = 10000, connections = 4, journal = None, batchKey = None) -> bool:
+        """
+        
+        this function copies the vault tables into their staging tables at the same time on a pool of postgres connections and merges them in a single transaction
+        
+        The staging tables have no foreign keys, so every table of the batch is streamed with COPY as soon as a connection of the pool is free
+        and the satellites of a hub are copied at the same time as the hub. Only the copies run in parallel: once all the tables are staged they are merged
+        one after another on a single connection, in the order mergeOrder derives from the foreign keys in pg_constraint, together with the point in time
+        and bridge tables in a single transaction as in bulkLoadDataToEnterpriseLayer, so a batch is either loaded completely or not at all
+        and a failed merge leaves the batch in the staging tables.
+        
+        When a journal is given the batch is recorded in it with its timestamp and the tables are recorded once the merge is committed,
+        so loading the batch again with the same journal uses the timestamp of the first attempt
+        
+        Args:
+            inputs : a list of dictionaries, one for every transformed batch, with key as table name and value as the dataframe to be inserted in "key" table
+            connectionParameters : a dictionary of postgres connection parameters
+            copyRows : number of rows sent in a single COPY statement. Defaults to 10000.
+            connections : number of connections copying tables at the same time. Defaults to 4.
+            journal : the LoadJournal of the run. Defaults to None which does not keep a checkpoint.
+            batchKey : key of the batch in the journal. Defaults to None.
+
+        Returns:
+            bool: True when all the data is inserted, False when an error occured
+        """
+        user=connectionParameters['user']
+        
+        print("Connection to postgres with the parameters ....")
+        print("user :",connectionParameters['user'])
+        print("host :",connectionParameters['host'])
+        print("port :", connectionParameters['port'])
+        print("database :",connectionParameters['database'])
+        print("connections :", connections)
+        
+        def stageTable(table) -> None:
+            """
+            copies a single table into its staging table and commits it on a connection of the pool
+            """
+            connection = pool.getconn()
+            try:
+                with connection.cursor() as cursor:
+                    self.stageTable(cursor, table, inputs, loadTimestamp, user, copyRows)
+                connection.commit()
+            except:
+                connection.rollback()
+                raise
+            finally:
+                pool.putconn(connection)
+        
+        pool = None
+        try:
+            pool = psycopg2.pool.ThreadedConnectionPool(1, int(connections), **connectionParameters)
+            connection = pool.getconn()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT localtimestamp")
+                loadTimestamp = cursor.fetchone()[0]
+            connection.commit()
+            pool.putconn(connection)
+            
+            tables = self.loadOrder()
+            if journal:
+                loadTimestamp = journal.start(batchKey, loadTimestamp)
+                tables = [table for table in tables if table not in journal.committedTables(batchKey)]
+            
+            # the largest tables are submitted first so that they do not start last and keep the other connections waiting
+            with ThreadPoolExecutor(int(connections)) as executor:
+                for future in [executor.submit(stageTable, table) for table in sorted(tables, key=lambda table: table not in ('SatObservationValue', 'SatObservationChunk'))]:
+                    future.result()
+            
+            # the staged tables are merged on a single connection so that the batch is committed at once
+            connection = pool.getconn()
+            try:
+                with connection.cursor() as cursor:
+                    for table in self.mergeOrder(cursor, tables):
+                        self.mergeTable(cursor, table)
+                    self.updatePointInTimeTables(cursor, loadTimestamp)
+                    self.updateBridgeTables(cursor, loadTimestamp)
+                    self.logLoad(cursor, loadTimestamp, user)
+                connection.commit()
+            except:
+                connection.rollback()
+                raise
+            finally:
+                pool.putconn(connection)
+            if journal:
+                journal.record(batchKey, tables)
+            
+            print("Inserted data successfully in PostgreSQL ")
+            return True
+
+        except (Exception, Error) as error:
+            print("Error while connecting to PostgreSQL", error)
+            return False
+        finally:
+            if pool:
+                pool.closeall()
+                print("PostgreSQL connection is closed")
+    
+    def refreshInformationMart(self, connectionParameters, since = None) -> bool:
+        """
+        
+        this function refreshes the tables of the information mart with the rows loaded in the vault since the last refresh
+        
+        The refresh is done by the refreshInformationMart function created by InformationMart.sql, which selects again from the views
+        the rows of every key with vault rows of the loads recorded in LoadLog since the last refresh. The refresh is skipped when the information mart is not created.
+
+        Args:
+            connectionParameters : a dictionary of postgres connection parameters
+            since : the rows loaded at or after this timestamp are refreshed as well, for rows loaded without a row in LoadLog. Defaults to None.
+
+        Returns:
+            bool: True when the information mart is refreshed or not created, False when an error occured
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = psycopg2.connect(**connectionParameters)
+            cursor = connection.cursor()
+            cursor.execute("""SELECT to_regproc('public."refreshInformationMart"')""")
+            if cursor.fetchone()[0] is None:
+                print("information mart is not created, refresh skipped")
+                return True
+            
+            cursor.execute("""SELECT "refreshInformationMart"(%s)""", (since,))
+            connection.commit()
+            print("Refreshed the information mart successfully")
+            return True
+
+        except (Exception, Error) as error:
+            print("Error while refreshing the information mart", error)
+            return False
+        finally:
+            if connection:
+                if cursor:
+                    cursor.close()
+                connection.close()
+
+
+class PipelinedExecutor():
+    """
+    
+    PipelinedExecutor runs the extract, transform and load stages of ETL process at the same time on different batches
+    
+    Reader threads extract batches, transformer threads transform the extracted batches and the loader stage loads the transformed batches
+    in the calling thread. The stages are connected by queues holding at most queueSize batches, a stage waits when the queue after it is full
+    so that no more than a few batches are in memory. Reading the files in worker processes, transforming in pandas and waiting for postgres
+    overlap with each other. The depth of each queue is printed every reportInterval seconds, a full queue before a stage shows that the stage
+    is the bottleneck, and the time spent in each stage is printed at the end.
+    
+    """
+    
+    def __init__(self, readers = 1, transformers = 1, queueSize = 2, reportInterval = 10):
+        """
+        this constructor sets the number of threads of extract and transform stages and creates the bounded queues between the stages
+        """
+        self.readers = max(1, int(readers))
+        self.transformers = max(1, int(transformers))
+        self.reportInterval = float(reportInterval)
+        self.queues = {'batches': queue.Queue(max(1, int(queueSize))), 'extracted': queue.Queue(max(1, int(queueSize))), 'transformed': queue.Queue(max(1, int(queueSize)))}
+        self.stageSeconds = {'extract': 0.0, 'transform': 0.0, 'load': 0.0}
+        self.__end = object()
+        self.__stop = threading.Event()
+        self.__lock = threading.Lock()
+    
+    def queueDepths(self) -> dict:
+        """
+        
+        gives the number of batches waiting in each queue
+
+        Returns:
+            dict: a dictionary with queue names as keys and number of waiting batches as values
+            
+        >>> Example:
+        >>> queueDepths()
+        {batches: 2, extracted: 2, transformed: 0}
+        """
+        return {name: stageQueue.qsize() for name, stageQueue in self.queues.items()}
+    
+    def __put(self, stageQueue, item) -> bool:
+        """
+        puts an item in a queue, waiting while the queue is full until the pipeline is stopped
+        """
+        while not self.__stop.is_set():
+            try:
+                stageQueue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def __get(self, stageQueue):
+        """
+        takes an item from a queue, waiting while the queue is empty until the pipeline is stopped
+        """
+        while not self.__stop.is_set():
+            try:
+                return stageQueue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return self.__end
+    
+    def __feed(self, batches) -> None:
+        """
+        puts every batch in the batches queue followed by the end marker
+        """
+        for batch in batches:
+            if not self.__put(self.queues['batches'], (batch, None)):
+                return
+        self.__put(self.queues['batches'], self.__end)
+    
+    def __work(self, stage, function, inputQueue, outputQueue, runningWorkers) -> None:
+        """
+        
+        calls function on the items of inputQueue and puts the results in outputQueue until the end marker is received
+        
+        The end marker is put back for the other workers of the stage, the last worker of the stage to finish passes it on to outputQueue
+        """
+        while True:
+            item = self.__get(inputQueue)
+            if item is self.__end:
+                self.__put(inputQueue, self.__end)
+                break
+            
+            batch, value = item
+            start = time.perf_counter()
+            try:
+                result = function(batch, value)
+            except Exception as error:
+                print("Error in %s stage" % stage, error)
+                self.__stop.set()
+                break
+            with self.__lock:
+                self.stageSeconds[stage] = self.stageSeconds[stage] + time.perf_counter() - start
+            
+            if not self.__put(outputQueue, (batch, result)):
+                break
+        
+        with self.__lock:
+            runningWorkers[0] = runningWorkers[0] - 1
+            lastWorker = runningWorkers[0] == 0
+        
+        # the end marker is put outside the lock, the other stages take the lock while the output queue is full
+        if lastWorker:
+            self.__put(outputQueue, self.__end)
+    
+    def __report(self) -> None:
+        """
+        prints the depth of every queue every reportInterval seconds until the pipeline is stopped
+        """
+        while not self.__stop.wait(self.reportInterval):
+            print("queue depths :", ", ".join("%s %d/%d" % (name, depth, self.queues[name].maxsize) for name, depth in self.queueDepths().items()))
+    
+    def run(self, batches, extract, transform, load) -> bool:
+        """
+        
+        runs the three stages on all the batches and returns when every batch is loaded or a stage fails
+
+        Args:
+            batches : an iterable of batches
+            extract : a function called with a batch and None that returns the extracted data of the batch
+            transform : a function called with a batch and its extracted data that returns the transformed data of the batch
+            load : a function called with a batch and its transformed data that returns False when the batch could not be loaded
+
+        Returns:
+            bool: True when all batches are loaded
+        """
+        readersRunning = [self.readers]
+        transformersRunning = [self.transformers]
+        threads = [threading.Thread(target=self.__feed, args=(batches,), daemon=True)]
+        threads.extend(threading.Thread(target=self.__work, args=('extract', extract, self.queues['batches'], self.queues['extracted'], readersRunning), daemon=True) for i in range(self.readers))
+        threads.extend(threading.Thread(target=self.__work, args=('transform', transform, self.queues['extracted'], self.queues['transformed'], transformersRunning), daemon=True) for i in range(self.transformers))
+        threads.append(threading.Thread(target=self.__report, daemon=True))
+        for thread in threads:
+            thread.start()
+        
+        loaded = True
         try:
-            connection = psycopg2.connect(user=user,password=password,host=host,port=port,database=database)
-
-            for input in inputs:
-                
-                HubMetaDataDF = input['HubMetaData']
-                for i in HubMetaDataDF.index:
-                    cursor = connection.cursor()
-                    query = f"""INSERT INTO "HubMetaData" (sequence,timestamp,source) VALUES (md5('%s'),current_timestamp,'{user}'); """ % (HubMetaDataDF['sequence'][i])
-                    cursor.execute(query)
-                    connection.commit()
-                
-                SatMetaDataKeyValuePairDF = input['SatMetaDataKeyValuePair']
-                for i in SatMetaDataKeyValuePairDF.index:
-                    cursor = connection.cursor()
-                    query = f"""INSERT INTO "SatMetaDataKeyValuePair" (sequence,timestamp,source,key,value) VALUES (md5('%s'),current_timestamp,'{user}','%s',%s); """ % (SatMetaDataKeyValuePairDF['sequence'][i],SatMetaDataKeyValuePairDF['key'][i], psycopg2.Binary(SatMetaDataKeyValuePairDF['value'][i]) )
-                    cursor.execute(query)
-                    connection.commit()
-                
-                HubExperimentDF = input['HubExperiment']
-                for i in HubExperimentDF.index:
-                    cursor = connection.cursor()
-                    query = f"""INSERT INTO "HubExperiment" (sequence,timestamp,source) VALUES (md5('%s'),current_timestamp,'{user}'); """ % (HubExperimentDF['sequence'][i])
-                    cursor.execute(query)
-                    connection.commit()
-
-                SatExperimentTitleDF = input['SatExperimentTitle']
-                for i in SatExperimentTitleDF.index:
-                    cursor = connection.cursor()
-                    query = f"""INSERT INTO "SatExperimentTitle" (sequence,timestamp,source,title) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatExperimentTitleDF['sequence'][i],SatExperimentTitleDF['title'][i])
-                    cursor.execute(query)
-                    connection.commit()
-                    
-                SatExperimentAcronymDF = input['SatExperimentAcronym']
-                for i in SatExperimentAcronymDF.index:
-                    cursor = connection.cursor()
-                    query = f"""INSERT INTO "SatExperimentAcronym" (sequence,timestamp,source,acronym) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatExperimentAcronymDF['sequence'][i],SatExperimentAcronymDF['acronym'][i])
-                    cursor.execute(query)
-                    connection.commit()
-                
-                HubExperimentalUnitDF = input['HubExperimentalUnit']
-                for i in HubExperimentalUnitDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "HubExperimentalUnit" (sequence,timestamp,source) VALUES (md5('%s'),current_timestamp,'{user}'); """ % (HubExperimentalUnitDF['sequence'][i])
-                        cursor.execute(query)
-                        connection.commit()
-                
-                HubSubjectDF = input['HubSubject']
-                for i in HubSubjectDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "HubSubject" (sequence,timestamp,source,name) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (HubSubjectDF['sequence'][i],HubSubjectDF['name'][i])
-                        cursor.execute(query)
-                        connection.commit()
-                        
-                SatSubjectAgeDF = input['SatSubjectAge']
-                for i in SatSubjectAgeDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatSubjectAge" (sequence,timestamp,source,age) VALUES (md5('%s'),current_timestamp,'{user}',%s); """ % (SatSubjectAgeDF['sequence'][i],SatSubjectAgeDF['age'][i])
-                        cursor.execute(query)
-                        connection.commit()
-                
-                SatSubjectNameDF = input['SatSubjectName']
-                for i in SatSubjectNameDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatSubjectName" (sequence,timestamp,source,name) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatSubjectNameDF['sequence'][i],SatSubjectNameDF['name'][i])
-                        cursor.execute(query)
-                        connection.commit()
-                        
-                ParticipatesInDF = input['ParticipatesIn']
-                for i in ParticipatesInDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "ParticipatesIn" (sequence,timestamp,source,"experimentalUnit",experiment) VALUES (md5('%s'),current_timestamp,'{user}',md5('%s'),md5('%s')); """ % (ParticipatesInDF['sequence'][i],ParticipatesInDF['experimentalunit'][i],ParticipatesInDF['experiment'][i])
-                        cursor.execute(query)
-                        connection.commit()
-                        
-                SatExperimentalUnitIdentifierDF = input['SatExperimentalUnitIdentifier']
-                for i in SatExperimentalUnitIdentifierDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatExperimentalUnitIdentifier" (sequence,timestamp,source,"ID") VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatExperimentalUnitIdentifierDF['sequence'][i],SatExperimentalUnitIdentifierDF['ID'][i])
-                        cursor.execute(query)
-                        connection.commit()
-                
-                HubFactorDF = input['HubFactor']
-                for i in HubFactorDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "HubFactor" (sequence,timestamp,source,experiment) VALUES (md5('%s'),current_timestamp,'{user}',md5('%s')); """ % (HubFactorDF['sequence'][i],HubFactorDF['experiment'][i])
-                        cursor.execute(query)
-                        connection.commit()     
-                        
-                SatFactorNameDF = input['SatFactorName']
-                for i in SatFactorNameDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatFactorName" (sequence,timestamp,source,name) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatFactorNameDF['sequence'][i],SatFactorNameDF['name'][i])
-                        cursor.execute(query)
-                        connection.commit()         
-
-        
-                SatFactorLevelDF = input['SatFactorLevel']          
-                for i in SatFactorLevelDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatFactorLevel" (sequence,timestamp,source,"levelValue") VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatFactorLevelDF['sequence'][i],SatFactorLevelDF['levelValue'][i])
-                        cursor.execute(query)
-                        connection.commit()  
-                
-                HubTreatmentDF = input['HubTreatment']
-                for i in HubTreatmentDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "HubTreatment" (sequence,timestamp,source,experiment) VALUES (md5('%s'),current_timestamp,'{user}',md5('%s')); """ % (HubTreatmentDF['sequence'][i],HubTreatmentDF['experiment'][i])
-                        cursor.execute(query)
-                        connection.commit()  
-                
-                SatTreatmentFactorLevelDF = input['SatTreatmentFactorLevel']
-                for i in SatTreatmentFactorLevelDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatTreatmentFactorLevel" (sequence,timestamp,source,"factorLevel") VALUES (md5('%s'),current_timestamp,'{user}',md5('%s')); """ % (SatTreatmentFactorLevelDF['experiment'][i],SatTreatmentFactorLevelDF['sequence'][i])
-                        cursor.execute(query)
-                        connection.commit()  
-                
-                HubGroupDF = input['HubGroup']
-                for i in HubGroupDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "HubGroup" (sequence,timestamp,source,treatment) VALUES (md5('%s'),current_timestamp,'{user}',md5('%s')); """ % (HubGroupDF['sequence'][i],HubGroupDF['treatment'][i])
-                        cursor.execute(query)
-                        connection.commit()  
-                
-                SatGroupNameDF = input['SatGroupName']
-                for i in SatGroupNameDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatGroupName" (sequence,timestamp,source,name) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatGroupNameDF['sequence'][i],SatGroupNameDF['name'][i])
-                        cursor.execute(query)
-                        connection.commit() 
-                
-                AssignedToDF = input['AssignedTo']
-                for i in AssignedToDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "AssignedTo" (sequence,timestamp,source,"experimentalUnit","group") VALUES (md5('%s'),current_timestamp,'{user}',md5('%s'),md5('%s')); """ % (AssignedToDF['sequence'][i],AssignedToDF['experimentalUnit'][i],AssignedToDF['group'][i])
-                        cursor.execute(query)
-                        connection.commit() 
-                        
-                HubSessionDF = input['HubSession']
-                for i in HubSessionDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "HubSession" (sequence,timestamp,source) VALUES (md5('%s'),current_timestamp,'{user}'); """ % (HubSessionDF['sequence'][i])
-                        cursor.execute(query)
-                        connection.commit() 
-                        
-                SatSessionNameDF = input['SatSessionName']
-                for i in SatSessionNameDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatSessionName" (sequence,timestamp,source,name) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatSessionNameDF['sequence'][i],SatSessionNameDF['name'][i])
-                        cursor.execute(query)
-                        connection.commit() 
-                        
-                SessionMetaDataDF = input['SessionMetaData']
-                for i in SessionMetaDataDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SessionMetaData" (sequence,timestamp,source,session,metadata) VALUES (md5('%s'),current_timestamp,'{user}',md5('%s'),md5('%s')); """ % (SessionMetaDataDF['sequence'][i],SessionMetaDataDF['session'][i],SessionMetaDataDF['metadata'][i])
-                        cursor.execute(query)
-                        connection.commit() 
-                
-                HubObservationDF = input['HubObservation']
-                for i in HubObservationDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "HubObservation" (sequence,timestamp,source,"collectedAtSession") VALUES (md5('%s'),current_timestamp,'{user}',md5('%s')); """ % (HubObservationDF['sequence'][i],HubObservationDF['collectedAtSession'][i])
-                        cursor.execute(query)
-                        connection.commit() 
+            while True:
+                item = self.__get(self.queues['transformed'])
+                if item is self.__end:
+                    break
                 
-                ObservationMetaDataDF = input['ObservationMetaData']
-                for i in ObservationMetaDataDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "ObservationMetaData" (sequence,timestamp,source,observation,metadata) VALUES (md5('%s'),current_timestamp,'{user}',md5('%s'),md5('%s')); """ % (ObservationMetaDataDF['sequence'][i],ObservationMetaDataDF['observation'][i],ObservationMetaDataDF['metadata'][i])
-                        cursor.execute(query)
-                        connection.commit()                 
-                
-                AttendsSessionDF = input['AttendsSession']
-                for i in AttendsSessionDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "AttendsSession" (sequence,timestamp,source,"experimentalUnit","group","session") VALUES (md5('%s'),current_timestamp,'{user}',md5('%s'),md5('%s'),md5('%s')); """ % (AttendsSessionDF['sequence'][i],AttendsSessionDF['experimentalUnit'][i],AttendsSessionDF['group'][i],AttendsSessionDF['session'][i])
-                        cursor.execute(query)
-                        connection.commit() 
-                
-                SatObservationNameDF = input['SatObservationName']
-                for i in SatObservationNameDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatObservationName" (sequence,timestamp,source,name) VALUES (md5('%s'),current_timestamp,'{user}','%s'); """ % (SatObservationNameDF['sequence'][i],SatObservationNameDF['name'][i])
-                        cursor.execute(query)
-                        connection.commit() 
-                
-                SatObservationValueDF = input['SatObservationValue']
-                for i in SatObservationValueDF.index:
-                        cursor = connection.cursor()
-                        query = f"""INSERT INTO "SatObservationValue" (sequence,timestamp,source,value,timestamps) VALUES (md5('%s'),current_timestamp,'{user}',array%s,array%s::timestamp[]); """ % (SatObservationValueDF['sequence'][i],SatObservationValueDF['value'][i],SatObservationValueDF['timestamps'][i])
-                        cursor.execute(query)
-                        connection.commit() 
+                batch, transformedData = item
+                del item
+                start = time.perf_counter()
+                if not load(batch, transformedData):
+                    loaded = False
+                    break
+                del transformedData
+                self.stageSeconds['load'] = self.stageSeconds['load'] + time.perf_counter() - start
+            
+            # a stage that failed sets the stop event before the end marker reaches the loader
+            loaded = loaded and not self.__stop.is_set()
+        finally:
+            self.__stop.set()
+            for thread in threads:
+                thread.join()
+        
+        print("stage time :", ", ".join("%s %.1f s" % (stage, seconds) for stage, seconds in self.stageSeconds.items()))
+        return loaded
 
-            print("Inserted data successfully in PostgreSQL ")
 
-        except (Exception, Error) as error:
-            print("Error while connecting to PostgreSQL", error)
-        finally:
-            if connection:
-                cursor.close()
-                connection.close()
-                print("PostgreSQL connection is closed")
+class FileManifest():
+    """
+    
+    FileManifest keeps a record of the raw files that have been loaded into the Enterprise data warehouse
+    
+    The manifest is a json file with an entry for each loaded file containing its size, modification time, content hash and the
+    sequences of the experiment created from it in the data vault. A file is processed again only when it is not in the manifest or
+    its content has changed, the content hash is computed only for files whose size or modification time differs from the manifest.
+    
+    """
+    
+    def __init__(self, manifestPath):
+        """
+        this constructor reads the manifest from manifestPath, an empty manifest is created when the file does not exist
+        """
+        self.manifestPath = os.path.abspath(manifestPath)
+        self.__entries = {}
+        if os.path.exists(self.manifestPath):
+            with open(self.manifestPath, 'r') as manifestFile:
+                self.__entries = json.load(manifestFile)
+    
+    def contentHash(self, fileName) -> str:
+        """
+        
+        gives the sha256 hash of the content of a file in hexadecimal form
+
+        Args:
+            fileName : path of the file
+
+        Returns:
+            str: hexadecimal hash of file content
+        """
+        digest = hashlib.sha256()
+        with open(fileName, 'rb') as file:
+            block = file.read(1 << 20)
+            while block:
+                digest.update(block)
+                block = file.read(1 << 20)
+        
+        return digest.hexdigest()
+    
+    def isChanged(self, fileName) -> bool:
+        """
+        
+        checks if a file is new or has changed since it was recorded in the manifest
+
+        Args:
+            fileName : path of the file
+
+        Returns:
+            bool: True when the file is not in the manifest or its content is different
+        """
+        entry = self.__entries.get(os.path.abspath(fileName))
+        if entry is None:
+            return True
+        
+        fileStat = os.stat(fileName)
+        if entry['size'] == fileStat.st_size and entry['mtime'] == fileStat.st_mtime:
+            return False
+        
+        return entry['hash'] != self.contentHash(fileName)
+    
+    def filterChanged(self, fileGroups, dataPath = '') -> list:
+        """
+        
+        gives the groups of files that have to be processed, a group is processed when any of its files is new or changed
+        
+        A group contains all the files of a single recording, for Visuomotor dataset it is a single .csv file and for Pre-autism
+        dataset it is the .hdr file together with the .dat, .wl1, .wl2 and .evt files of the recording
+
+        Args:
+            fileGroups : a list of lists of file paths
+            dataPath : folder the file paths are relative to. Defaults to ''.
+
+        Returns:
+            list: a list of groups that are new or changed, in the order of fileGroups
+        """
+        return [fileGroup for fileGroup in fileGroups if any(self.isChanged(os.path.join(dataPath, fileName)) for fileName in fileGroup)]
+    
+    def record(self, fileGroup, sequence, hashKey) -> None:
+        """
+        
+        adds the files of a recording to the manifest along with the sequence of the experiment that was created from it
+
+        Args:
+            fileGroup : a list of file paths of a single recording
+            sequence : the business key of the experiment created from the recording
+            hashKey : the hash key of the experiment in the data vault
+        """
+        for fileName in fileGroup:
+            fileStat = os.stat(fileName)
+            self.__entries[os.path.abspath(fileName)] = {
+                'size': fileStat.st_size,
+                'mtime': fileStat.st_mtime,
+                'hash': self.contentHash(fileName),
+                'sequence': sequence,
+                'hashKey': hashKey
+            }
+    
+    def save(self) -> None:
+        """
+        writes the manifest to manifestPath, the file is replaced only after it is completely written
+        """
+        temporaryPath = self.manifestPath + '.tmp'
+        with open(temporaryPath, 'w') as manifestFile:
+            json.dump(self.__entries, manifestFile, indent=1)
+        os.replace(temporaryPath, self.manifestPath)
+
+
+class LoadJournal():
+    """
+    
+    LoadJournal keeps a checkpoint of the batches whose load into the Enterprise data warehouse has started but not finished
+    
+    The journal is a json file with an entry for each unfinished batch containing the timestamp of its load and the vault tables
+    that are already committed. An entry is removed once the batch is loaded and recorded in the FileManifest, so a load that is
+    stopped by an error can be resumed by loading only the tables of the batch that are missing, with the timestamp of the first attempt.
+    
+    """
+    
+    def __init__(self, journalPath):
+        """
+        this constructor reads the journal from journalPath, an empty journal is created when the file does not exist
+        """
+        self.journalPath = os.path.abspath(journalPath)
+        self.__lock = threading.Lock()
+        self.__entries = {}
+        if os.path.exists(self.journalPath):
+            with open(self.journalPath, 'r') as journalFile:
+                self.__entries = json.load(journalFile)
+    
+    def batchKey(self, fileNames) -> str:
+        """
+        
+        gives the key of a batch in the journal from the paths of its files
+
+        Args:
+            fileNames : the paths of all the files of the batch
+
+        Returns:
+            str: md5 hash of the sorted absolute paths in hexadecimal form
+        """
+        return hashlib.md5('\n'.join(sorted(os.path.abspath(fileName) for fileName in fileNames)).encode('utf-8')).hexdigest()
+    
+    def start(self, batchKey, loadTimestamp) -> dt.datetime:
+        """
+        
+        adds a batch to the journal, a batch that is already in the journal keeps the timestamp of its first load
+
+        Args:
+            batchKey : key of the batch given by batchKey
+            loadTimestamp : the timestamp of the current load
+
+        Returns:
+            dt.datetime: the timestamp the rows of the batch are loaded with
+        """
+        with self.__lock:
+            entry = self.__entries.setdefault(batchKey, {'timestamp': pd.Timestamp(loadTimestamp).isoformat(), 'tables': []})
+            self.save()
+        return dt.datetime.fromisoformat(entry['timestamp'])
+    
+    def committedTables(self, batchKey) -> set:
+        """
+        gives the names of the tables of a batch that are already committed
+        """
+        with self.__lock:
+            return set(self.__entries.get(batchKey, {}).get('tables', []))
+    
+    def record(self, batchKey, tables) -> None:
+        """
+        
+        adds committed tables to the entry of a batch and writes the journal
+
+        Args:
+            batchKey : key of the batch given by batchKey
+            tables : names of the tables committed
+        """
+        with self.__lock:
+            self.__entries[batchKey]['tables'].extend(tables)
+            self.save()
+    
+    def finish(self, batchKey) -> None:
+        """
+        removes a batch from the journal once it is loaded and recorded in the manifest
+        """
+        with self.__lock:
+            self.__entries.pop(batchKey, None)
+            self.save()
+    
+    def clear(self) -> None:
+        """
+        removes all the batches from the journal, the unfinished batches are then loaded again from the start
+        """
+        with self.__lock:
+            self.__entries = {}
+            self.save()
+    
+    def unfinished(self) -> int:
+        """
+        gives the number of batches whose load has not finished
+        """
+        return len(self.__entries)
+    
+    def save(self) -> None:
+        """
+        writes the journal to journalPath, the file is replaced only after it is completely written
+        """
+        temporaryPath = self.journalPath + '.tmp'
+        with open(temporaryPath, 'w') as journalFile:
+            json.dump(self.__entries, journalFile, indent=1)
+        os.replace(temporaryPath, self.journalPath)
+
+
+class FolderWatcher():
+    """
+    
+    FolderWatcher decides when a raw file that is still being written by the acquisition software can be read
+    
+    The size and modification time of every file are remembered between scans of the data folders. A file is settled when its size and
+    modification time are the same as in the previous scan and it has not been modified for settleTime seconds, a recording is read
+    only when all of its files are settled so that partially copied recordings are not loaded.
+    
+    """
+    
+    def __init__(self, settleTime = 60):
+        """
+        this constructor sets the number of seconds a file has to stay unchanged before it is read
+        """
+        self.settleTime = float(settleTime)
+        self.__seen = {}
+    
+    def isSettled(self, fileName) -> bool:
+        """
+        
+        checks if a file has stopped changing since the previous scan
+
+        Args:
+            fileName : path of the file
+
+        Returns:
+            bool: True when the file is unchanged since the previous scan and older than settleTime seconds
+        """
+        fileName = os.path.abspath(fileName)
+        if not os.path.exists(fileName):
+            self.__seen.pop(fileName, None)
+            return False
+        
+        fileStat = os.stat(fileName)
+        state = (fileStat.st_size, fileStat.st_mtime)
+        previousState = self.__seen.get(fileName)
+        self.__seen[fileName] = state
+        
+        return previousState == state and time.time() - fileStat.st_mtime >= self.settleTime
+    
+    def filterSettled(self, fileGroups, dataPath = '') -> list:
+        """
+        
+        gives the groups of files that can be read, a group is read only when all of its files are settled
+
+        Args:
+            fileGroups : a list of lists of file paths
+            dataPath : folder the file paths are relative to. Defaults to ''.
 
+        Returns:
+            list: a list of settled groups, in the order of fileGroups
+        """
+        # every file of a group is checked so that the state of all the files is remembered for the next scan
+        return [fileGroup for fileGroup in fileGroups if all([self.isSettled(os.path.join(dataPath, fileName)) for fileName in fileGroup])]
 
 
 class ExtractTransformLoadHelper:
@@ -1284,23 +2906,23 @@ class ExtractTransformLoadHelper:
     
     **step 1:**  
              a. Read all the HbR files in VMData_Blinded folder and call readVMFile method to read metadata and data for VM Deoxy files
-             b. the metadata received is added to a list called vmDeoxyMetaData that is to be sent for transformation stage
-             c. the data received is added to a list called vmDeoxyData that is to be sent for transformation stage
-             d. all the names of files are added to a list called vmDeoxyFileNames that is to be sent for transformation stage
+             b. the metadata received is added to a list called vmMetaData that is to be sent for transformation stage
+             c. the data received is added to a list called vmData that is to be sent for transformation stage
+             d. all the names of files are added to a list called vmFileNames that is to be sent for transformation stage
              e. transformVMFile method is called to transform all the HbR data and appended to a list caleed transformedData that is to be sent for loading stage
     
     step 2:  
              a. Read all the HbO2 files in VMData_Blinded folder and call readVMFile method to read metadata and data for VM Oxy files
-             b. the metadata received is added to a list called vmOxyMetaData that is to be sent for transformation stage
-             c. the data received is added to a list called vmOxyData that is to be sent for transformation stage
-             d. all the names of files are added to a list called vmOxyFileNames that is to be sent for transformation stage
+             b. the metadata received is added to a list called vmMetaData that is to be sent for transformation stage
+             c. the data received is added to a list called vmData that is to be sent for transformation stage
+             d. all the names of files are added to a list called vmFileNames that is to be sent for transformation stage
              e. transformVMFile method is called to transform all the HbO2 data and appended to a list caleed transformedData that is to be sent for loading stage
     
     step 3:  
              a. Read all the raw intensity files in VMData_Blinded folder and call readVMFile method to read metadata and data for VM MES files
-             b. the metadata received is added to a list called vmMesMetaData that is to be sent for transformation stage
-             c. the data received is added to a list called vmMesData that is to be sent for transformation stage
-             d. all the names of files are added to a list called vmMesFileNames that is to be sent for transformation stage
+             b. the metadata received is added to a list called vmMetaData that is to be sent for transformation stage
+             c. the data received is added to a list called vmData that is to be sent for transformation stage
+             d. all the names of files are added to a list called vmFileNames that is to be sent for transformation stage
              e. transformVMFile method is called to transform all the raw data and appended to a list caleed transformedData that is to be sent for loading stage
              
     **step 4: read .dat files for pre-autism data for both normal ans stressed conversation and store in preAutismData to be sent for transformation stage**
@@ -1316,11 +2938,160 @@ class ExtractTransformLoadHelper:
     **step 9: transformPreAutismFile is called to transform all the pre-autism data for both Normal and Stressed conversation, the transformed data is added to transformedData list to be sent for loading stage**
     
     **step 10: loadDataToEnterpriseLayer is called and it loads all the data to Enterprise data warehouse**
+    
+    The recordings are processed in batches of BATCHSIZE recordings from config.txt, steps 1 to 10 are run for a batch before the next batch is read
+    so that the memory used stays the same as the number of recordings grows, a BATCHSIZE of 0 processes all the recordings of a step as a single batch
+    
+    Only the files that are new or changed since the last run according to the FileManifest at MANIFEST in config.txt are processed in steps 1 to 9,
+    the manifest is updated with the loaded files after step 10 completes
+    
+    The files in steps 1 to 8 are read by ParallelExtractor on the number of worker processes given by WORKERS in config.txt, a single worker reads them in the current process
+    
+    When PIPELINE is 1 in config.txt, the batches are passed through PipelinedExecutor so that steps 1 to 8, step 9 and step 10 run at the same time on
+    different batches, TRANSFORMTHREADS threads transform the batches and at most QUEUESIZE batches wait between two steps
+    
+    When BULKLOAD is 1 in config.txt, step 10 calls bulkLoadDataToEnterpriseLayer which streams every table with COPY statements of COPYROWS rows
+    in a single transaction per batch instead of inserting the rows one at a time, with LOADCONNECTIONS above 1 parallelLoadDataToEnterpriseLayer
+    copies the tables at the same time on LOADCONNECTIONS connections before merging the batch in a single transaction
+    
+    The committed tables of every batch are recorded in the LoadJournal at JOURNAL in config.txt until the batch is in the manifest,
+    running the staging with --resume after a failed load loads only the tables of the unfinished batches that were not committed
+    
+    With --watch the data folders are scanned every POLLINTERVAL seconds and steps 1 to 10 are run for the new recordings whose files
+    have not changed for SETTLETIME seconds according to FolderWatcher, until the process is stopped
     """
-    def main():
+    def findFileGroups(m, vmDataPath, preAutismDataPath, w = None) -> list:
+        """
+        
+        finds the recordings in both data folders that are new or changed according to the manifest and groups them by the transformation they need
+        
+        A file group holds the files of a single recording, a Visuomotor recording is a single .csv file and a Pre-autism recording is a .hdr file 
+        with the .dat, .wl1, .wl2 and .evt files of the same name in its folder. File names are relative to the data folder and sorted so that every run 
+        finds them in the same order.
+
+        Args:
+            m : the FileManifest of loaded files
+            vmDataPath : folder of Visuomotor dataset
+            preAutismDataPath : folder of Pre-autism dataset
+            w : the FolderWatcher that holds back recordings still being written, all recordings are found when None. Defaults to None.
+
+        Returns:
+            list: a list of tuples consisting the data folder, the kind of recording ('VM' or 'PreAutism') and a list of file groups
+        """
+        fileGroupsByKind = []
+        
+        # step 1, 2 and 3 each transform a single type of Visuomotor files
+        for pattern in ['*_HBA_Probe1_Deoxy.csv', '*_HBA_Probe1_Oxy.csv', '*_MES_Probe1.csv']:
+            fileNames = sorted(glob.glob(os.path.join(glob.escape(vmDataPath), pattern)))
+            fileGroups = [[os.path.relpath(fileName, vmDataPath)] for fileName in fileNames]
+            if w:
+                fileGroups = w.filterSettled(fileGroups, vmDataPath)
+            fileGroupsByKind.append((vmDataPath, 'VM', m.filterChanged(fileGroups, vmDataPath)))
+        
+        fileGroups = []
+        for pattern in ['*_NormalConversation/*.hdr', '*_StressedConversation/*.hdr']:
+            for fileName in sorted(glob.glob(os.path.join(glob.escape(preAutismDataPath), pattern))):
+                fileName = os.path.relpath(fileName, preAutismDataPath)
+                fileGroup = [fileName] + [os.path.splitext(fileName)[0] + extension for extension in ['.dat', '.wl1', '.wl2', '.evt']]
+                if all(os.path.exists(os.path.join(preAutismDataPath, groupFileName)) for groupFileName in fileGroup):
+                    fileGroups.append(fileGroup)
+                elif not w:
+                    # the missing files of a recording that is being copied are found by a later scan in watch mode
+                    print("Skipping incomplete recording :", fileName)
+        if w:
+            fileGroups = w.filterSettled(fileGroups, preAutismDataPath)
+        fileGroupsByKind.append((preAutismDataPath, 'PreAutism', m.filterChanged(fileGroups, preAutismDataPath)))
+        
+        return fileGroupsByKind
+    
+    def extractBatch(r, p, dataPath, kind, fileGroups) -> tuple:
+        """
+        
+        reads the files of a batch of recordings of the same kind and returns the arguments of the transformation for the kind
+
+        Args:
+            r : the FileReader of extract stage
+            p : the ParallelExtractor that runs the FileReader methods
+            dataPath : folder of the dataset
+            kind : 'VM' for Visuomotor recordings and 'PreAutism' for Pre-autism recordings
+            fileGroups : a list of file groups found by findFileGroups
+
+        Returns:
+            tuple: arguments of transformVMFile for 'VM' recordings or transformPreAutismFile for 'PreAutism' recordings
+        """
+        filePaths = [[os.path.join(dataPath, fileName) for fileName in fileGroup] for fileGroup in fileGroups]
+        
+        if kind == 'VM':
+            vmMetaData=[]
+            vmData=[]
+            vmFileNames = [fileGroup[0] for fileGroup in fileGroups]
+            for metaData, data in p.map(r.readVMFilePath, [filePath[0] for filePath in filePaths]):
+                vmMetaData.append(metaData)
+                vmData.append(data)
+            
+            return (vmFileNames, vmMetaData, vmData)
+        
+        # step 4
+        preAutismData = p.map(r.readDataFile, [filePath[1] for filePath in filePaths])
+        
+        # step 5    
+        preAutismWavelengthOneData = p.map(r.readDataFile, [filePath[2] for filePath in filePaths])
+        
+        # step 6  
+        preAutismWavelengthTwoData = p.map(r.readDataFile, [filePath[3] for filePath in filePaths])
+        
+        # step 7            
+        preAutismEventonsData = p.map(r.readDataFile, [filePath[4] for filePath in filePaths])
+        
+        # step 8     
+        preAutismFileNames = [fileGroup[0] for fileGroup in fileGroups]
+        preAutismMetaData = p.map(r.readPreAutismMetaDataPath, [filePath[0] for filePath in filePaths])
+        
+        return (preAutismFileNames, preAutismMetaData, preAutismData, preAutismWavelengthOneData, preAutismWavelengthTwoData, preAutismEventonsData)
+    
+    def transformBatch(t, kind, extractedData) -> dict:
+        """
+        
+        transforms a batch of recordings read by extractBatch
+
+        Args:
+            t : the FileTransformer of transform stage
+            kind : 'VM' for Visuomotor recordings and 'PreAutism' for Pre-autism recordings
+            extractedData : the arguments of the transformation returned by extractBatch
+
+        Returns:
+            dict: a dictionary with keys of table names and values containing the dataframe to be loaded in respective key tables
+        """
+        if kind == 'VM':
+            return t.transformVMFile(*extractedData)
+        
+        # step 9
+        return t.transformPreAutismFile(*extractedData)
+    
+    def splitBatches(fileGroupsByKind, batchSize = 0):
+        """
+        
+        splits the recordings of each kind into batches of batchSize recordings
+
+        Args:
+            fileGroupsByKind : a list of data folders, kinds and file groups found by findFileGroups
+            batchSize : number of recordings in a batch, all recordings of a kind are a single batch when 0. Defaults to 0.
+
+        Yields:
+            (dataPath, kind, fileGroups): a tuple containing the data folder, kind and file groups of a batch
+        """
+        for dataPath, kind, fileGroups in fileGroupsByKind:
+            size = int(batchSize) or max(1, len(fileGroups))
+            for start in range(0, len(fileGroups), size):
+                yield (dataPath, kind, fileGroups[start:start + size])
+    
+    def main(watch = False, resume = False):
         """
         This is the main function that executes staging process
         
+        Args:
+            watch : keeps scanning the data folders and loads new recordings as they are written when True. Defaults to False.
+            resume : continues the batches left unfinished in the journal by loading only their missing tables when True. Defaults to False.
         """
         r=FileReader()
         t=FileTransformer()
@@ -1349,132 +3120,180 @@ class ExtractTransformLoadHelper:
         connectionParameters['database'] = r.findField(config, "DATABASE").lstrip(',').replace('\n','').lstrip().rstrip()
         config.seek(0)
         
-        print("vmDataPath :",vmDataPath)
-        print("preAutismDataPath : ", preAutismDataPath)
-        print("Postgres Details ...")
-        print("user :",connectionParameters['user'])
-        print("password :",connectionParameters['password'])
-        print("host :",connectionParameters['host'])
-        print("port :", connectionParameters['port'])
-        print("database :",connectionParameters['database'])
+        workers = r.findField(config, "WORKERS").lstrip(',').replace('\n','').lstrip().rstrip() or 1
+        config.seek(0)
         
-        transformedData = []
+        manifestPath = os.path.abspath(r.findField(config, "MANIFEST").lstrip(',').replace('\n','').lstrip().rstrip() or 'manifest.json')
+        config.seek(0)
         
-        vmDeoxyMetaData=[]
-        vmDeoxyData=[]
-        vmDeoxyFileNames=[]
-
-
-        os.chdir(vmDataPath)
-        #step 1
-        for fileName in glob.glob('*_HBA_Probe1_Deoxy.csv'):
-            with open(fileName, 'r', errors="ignore") as file:
-                metaData, data = r.readVMFile(file)
-                vmDeoxyMetaData.append(metaData)
-                vmDeoxyData.append(data)
-                vmDeoxyFileNames.append(fileName)
+        journalPath = os.path.abspath(r.findField(config, "JOURNAL").lstrip(',').replace('\n','').lstrip().rstrip() or 'journal.json')
+        config.seek(0)
         
-        transformedVmDeoxyData = t.transformVMFile(vmDeoxyFileNames, vmDeoxyMetaData, vmDeoxyData)
+        cacheFolder = r.findField(config, "CACHEFOLDER").lstrip(',').replace('\n','').lstrip().rstrip()
+        config.seek(0)
         
-        transformedData.append(transformedVmDeoxyData)
-
-        vmOxyMetaData=[]
-        vmOxyData=[]
-        vmOxyFileNames=[]
+        cacheSize = r.findField(config, "CACHESIZE").lstrip(',').replace('\n','').lstrip().rstrip() or 1024
+        config.seek(0)
         
-        #step 2
-        for fileName in glob.glob('*_HBA_Probe1_Oxy.csv'):
-            with open(fileName, 'r', errors="ignore") as file:
-                metaData, data = r.readVMFile(file)
-                vmOxyMetaData.append(metaData)
-                vmOxyData.append(data)
-                vmOxyFileNames.append(fileName)
+        batchSize = r.findField(config, "BATCHSIZE").lstrip(',').replace('\n','').lstrip().rstrip() or 0
+        config.seek(0)
         
-        transformedVmOxyData = t.transformVMFile(vmOxyFileNames, vmOxyMetaData, vmOxyData)
+        pipeline = r.findField(config, "PIPELINE").lstrip(',').replace('\n','').lstrip().rstrip() or 0
+        config.seek(0)
         
-        transformedData.append(transformedVmOxyData)
+        transformThreads = r.findField(config, "TRANSFORMTHREADS").lstrip(',').replace('\n','').lstrip().rstrip() or 1
+        config.seek(0)
         
-        vmMesMetaData=[]
-        vmMesData=[]
-        vmMesFileNames=[]
+        queueSize = r.findField(config, "QUEUESIZE").lstrip(',').replace('\n','').lstrip().rstrip() or 2
+        config.seek(0)
         
-        #step 3
-        for fileName in glob.glob('*_MES_Probe1.csv'):
-            with open(fileName, 'r', errors="ignore") as file:
-                metaData, data = r.readVMFile(file)
-                vmMesMetaData.append(metaData)
-                vmMesData.append(data)
-                vmMesFileNames.append(fileName)
+        pollInterval = r.findField(config, "POLLINTERVAL").lstrip(',').replace('\n','').lstrip().rstrip() or 30
+        config.seek(0)
         
-        transformedVmMesData = t.transformVMFile(vmMesFileNames, vmMesMetaData, vmMesData)
+        settleTime = r.findField(config, "SETTLETIME").lstrip(',').replace('\n','').lstrip().rstrip() or 60
+        config.seek(0)
         
-        transformedData.append(transformedVmMesData)     
+        bulkLoad = r.findField(config, "BULKLOAD").lstrip(',').replace('\n','').lstrip().rstrip() or 1
+        config.seek(0)
         
-        preAutismMetaData=[]
-        preAutismFileNames=[]
-        preAutismData=[]
-        preAutismWavelengthOneData=[]
-        preAutismWavelengthTwoData=[]
-        preAutismEventonsData=[]
+        copyRows = r.findField(config, "COPYROWS").lstrip(',').replace('\n','').lstrip().rstrip() or 10000
+        config.seek(0)
         
-        os.chdir(preAutismDataPath)
-        # step 4
-        for fileName in glob.glob('*_NormalConversation/*.dat'):
-            data = pd.DataFrame(np.genfromtxt(fileName))
-            preAutismData.append(data)
+        loadConnections = r.findField(config, "LOADCONNECTIONS").lstrip(',').replace('\n','').lstrip().rstrip() or 1
+        config.seek(0)
         
-        for fileName in glob.glob('*_StressedConversation/*.dat'):
-            data = pd.DataFrame(np.genfromtxt(fileName))
-            preAutismData.append(data)
+        chunkSamples = r.findField(config, "CHUNKSAMPLES").lstrip(',').replace('\n','').lstrip().rstrip() or 0
+        config.seek(0)
         
-        # step 5    
-        for fileName in glob.glob('*_NormalConversation/*.wl1'):
-            data = pd.DataFrame(np.genfromtxt(fileName))
-            preAutismWavelengthOneData.append(data)
+        valueCodec = r.findField(config, "VALUECODEC").lstrip(',').replace('\n','').lstrip().rstrip() or 'array'
+        config.seek(0)
         
-        for fileName in glob.glob('*_StressedConversation/*.wl1'):
-            data = pd.DataFrame(np.genfromtxt(fileName))
-            preAutismWavelengthOneData.append(data)
+        martRefresh = r.findField(config, "MARTREFRESH").lstrip(',').replace('\n','').lstrip().rstrip() or 1
+        config.seek(0)
         
-        # step 6  
-        for fileName in glob.glob('*_NormalConversation/*.wl2'):
-            data = pd.DataFrame(np.genfromtxt(fileName))
-            preAutismWavelengthTwoData.append(data)
+        # the parsed files are kept in the cache so that running the transform and load stages again does not parse the files again
+        if cacheFolder:
+            r.cache = ParseCache(cacheFolder, float(cacheSize) * (1 << 20))
         
-        for fileName in glob.glob('*_StressedConversation/*.wl2'):
-            data = pd.DataFrame(np.genfromtxt(fileName))
-            preAutismWavelengthTwoData.append(data)
+        # the observation matrices are stored as time tiles so that a window or a channel is read without reading the whole matrix
+        l.chunkSamples = int(chunkSamples)
         
-        # step 7            
-        for fileName in glob.glob('*_NormalConversation/*.evt'):
-            data = pd.DataFrame(np.genfromtxt(fileName))
-            preAutismEventonsData.append(data)
+        # the observation matrices are stored as real arrays or compressed by ObservationCodec
+        if valueCodec != 'array' and valueCodec not in ObservationCodec.codecs:
+            raise ValueError("VALUECODEC must be array, " + " or ".join(ObservationCodec.codecs))
+        l.valueCodec = valueCodec
         
-        for fileName in glob.glob('*_StressedConversation/*.evt'):
-            data = pd.DataFrame(np.genfromtxt(fileName))  
-            preAutismEventonsData.append(data)
+        print("vmDataPath :",vmDataPath)
+        print("preAutismDataPath : ", preAutismDataPath)
+        print("Postgres Details ...")
+        print("user :",connectionParameters['user'])
+        print("password :",connectionParameters['password'])
+        print("host :",connectionParameters['host'])
+        print("port :", connectionParameters['port'])
+        print("database :",connectionParameters['database'])
+        print("workers :", workers)
+        print("manifest :", manifestPath)
+        print("journal :", journalPath)
+        print("cache :", r.cache.cacheFolder if r.cache else "disabled")
+        print("batch size :", batchSize)
+        print("pipeline :", "enabled" if int(pipeline) else "disabled")
+        print("bulk load :", "%s rows per COPY" % copyRows if int(bulkLoad) else "disabled")
+        if int(bulkLoad):
+            print("load connections :", loadConnections)
+            print("chunk samples :", chunkSamples if int(chunkSamples) else "disabled")
+        print("value codec :", valueCodec)
+        print("mart refresh :", "after every batch" if int(martRefresh) else "disabled")
+        if watch:
+            print("poll interval :", pollInterval)
+            print("settle time :", settleTime)
+        
+        # only the files that are not yet recorded in the manifest or have changed since they were loaded are processed
+        m = FileManifest(manifestPath)
+        
+        # the journal keeps the tables committed for the batches that are not yet in the manifest, without resume they are loaded again from the start
+        j = LoadJournal(journalPath)
+        if resume:
+            print("resuming", j.unfinished(), "unfinished batches")
+        else:
+            j.clear()
         
-        # step 8     
-        for fileName in glob.glob('*_NormalConversation/*.hdr'):
-            with open(fileName, 'r', errors="ignore") as file:
-                metaData = r.readPreAutismMetaData(file)
-                preAutismMetaData.append(metaData)
-                preAutismFileNames.append(fileName)    
-        
-        for fileName in glob.glob('*_StressedConversation/*.hdr'):
-            with open(fileName, 'r', errors="ignore") as file:
-                metaData = r.readPreAutismMetaData(file)
-                preAutismMetaData.append(metaData)
-                preAutismFileNames.append(fileName)
+        # the files are read by a pool of workers processes, the file names are sorted so that every run reads them in the same order
+        p = ParallelExtractor(workers)
         
-        # step 9
-        transformedData.append(t.transformPreAutismFile(preAutismFileNames, preAutismMetaData, preAutismData, preAutismWavelengthOneData, preAutismWavelengthTwoData, preAutismEventonsData))
+        def loadBatch(batch, transformedData) -> bool:
+            """
+            loads a transformed batch and records its files in the manifest when the load succeeds
+            """
+            dataPath, kind, batchFileGroups = batch
+            batchKey = j.batchKey([os.path.join(dataPath, fileName) for fileGroup in batchFileGroups for fileName in fileGroup])
+            
+            # step 10
+            if int(bulkLoad) and int(loadConnections) > 1:
+                # the tables that do not reference each other are streamed with COPY at the same time on a pool of connections
+                if not l.parallelLoadDataToEnterpriseLayer([transformedData], connectionParameters, copyRows, loadConnections, j, batchKey):
+                    return False
+            elif int(bulkLoad):
+                # every table of the batch is streamed with COPY in a single transaction
+                if not l.bulkLoadDataToEnterpriseLayer([transformedData], connectionParameters, copyRows, j, batchKey):
+                    return False
+            elif not l.loadDataToEnterpriseLayer([transformedData], connectionParameters, j, batchKey):
+                return False
+            
+            for fileGroup, sequence, hashKey in zip(batchFileGroups, transformedData['HubExperiment']['businessKey'], transformedData['HubExperiment']['sequence']):
+                m.record([os.path.join(dataPath, fileName) for fileName in fileGroup], sequence, hashKey)
+            m.save()
+            j.finish(batchKey)
+            
+            # the tables of the information mart are refreshed with the rows of the batch, a failed refresh is done again by the next refresh
+            if int(martRefresh):
+                l.refreshInformationMart(connectionParameters)
+            return True
         
-        # step 10
-        l.loadDataToEnterpriseLayer(transformedData, connectionParameters)
-
+        def loadFileGroups(fileGroupsByKind) -> None:
+            """
+            extracts, transforms and loads the recordings found by findFileGroups in batches
+            """
+            if int(pipeline):
+                # the next batches are extracted and transformed by threads while the current batch is loaded
+                e = PipelinedExecutor(1, transformThreads, queueSize)
+                e.run(ExtractTransformLoadHelper.splitBatches(fileGroupsByKind, batchSize),
+                      lambda batch, value: ExtractTransformLoadHelper.extractBatch(r, p, batch[0], batch[1], batch[2]),
+                      lambda batch, extractedData: ExtractTransformLoadHelper.transformBatch(t, batch[1], extractedData),
+                      loadBatch)
+            else:
+                # each batch is extracted, transformed and loaded before the next batch is read, so only one batch is held in memory at a time
+                for batch in ExtractTransformLoadHelper.splitBatches(fileGroupsByKind, batchSize):
+                    transformedData = ExtractTransformLoadHelper.transformBatch(t, batch[1], ExtractTransformLoadHelper.extractBatch(r, p, *batch))
+                    if not loadBatch(batch, transformedData):
+                        break
+                    del transformedData
+        
+        if watch:
+            # the data folders are scanned every pollInterval seconds, recordings are loaded once all their files stop changing
+            # a recording that fails to load stays out of the manifest and is loaded again by the next scan
+            w = FolderWatcher(settleTime)
+            print("Watching data folders, press Ctrl+C to stop")
+            try:
+                while True:
+                    fileGroupsByKind = ExtractTransformLoadHelper.findFileGroups(m, vmDataPath, preAutismDataPath, w)
+                    if any(fileGroups for dataPath, kind, fileGroups in fileGroupsByKind):
+                        print(dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "loading", sum(len(fileGroups) for dataPath, kind, fileGroups in fileGroupsByKind), "new recordings")
+                        loadFileGroups(fileGroupsByKind)
+                    time.sleep(float(pollInterval))
+            except KeyboardInterrupt:
+                print("Stopped watching data folders")
+        else:
+            fileGroupsByKind = ExtractTransformLoadHelper.findFileGroups(m, vmDataPath, preAutismDataPath)
+            if not any(fileGroups for dataPath, kind, fileGroups in fileGroupsByKind):
+                print("No new or changed files to load")
+            loadFileGroups(fileGroupsByKind)
         
+        p.shutdown()
 
 
 if __name__ == "__main__":
-    ExtractTransformLoadHelper.main()
\ No newline at end of file
+    argumentParser = argparse.ArgumentParser(description="loads the raw files of the data folders in config.txt into the Enterprise data warehouse")
+    argumentParser.add_argument('--watch', action='store_true', help="keep watching the data folders and load new recordings as they are written")
+    argumentParser.add_argument('--resume', action='store_true', help="continue the batches whose load stopped with an error, loading only the tables that were not committed")
+    arguments = argumentParser.parse_args()
+    ExtractTransformLoadHelper.main(arguments.watch, arguments.resume)
\ No newline at end of file
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+from codec import ObservationCodec
+
+
+"""
+
+Codec tests
+--------------------------------------
+
+This python file checks that the codecs of ObservationCodec give back the float32 values of the observation matrices bit for bit.
+
+Execute the tests from the code folder
+    python -m unittest test_codec
+
+"""
+class ObservationCodecTest(unittest.TestCase):
+    """
+    ObservationCodecTest encodes and decodes matrices with every codec of ObservationCodec
+    """
+
+    def setUp(self):
+        self.codec = ObservationCodec()
+
+    def assertRoundTrip(self, values, shape) -> None:
+        """
+        encodes values with every codec and checks that the decoded matrix has the given shape and the same float32 bits
+        """
+        expected = np.asarray(values, dtype='<f4').reshape(shape)
+        for codec in ObservationCodec.codecs:
+            with self.subTest(codec = codec):
+                decoded = self.codec.decode(self.codec.encode(values, codec), codec)
+                self.assertEqual(decoded.dtype, np.dtype('<f4'))
+                self.assertEqual(decoded.shape, shape)
+                np.testing.assert_array_equal(decoded.view('<i4'), expected.view('<i4'))
+
+    def testMatrix(self):
+        values = np.cumsum(np.random.default_rng(0).normal(size=(500, 8)), axis=0)
+        self.assertRoundTrip(values, (500, 8))
+
+    def testSpecialValues(self):
+        values = np.array([[np.nan, -0.0, 0.0], [np.inf, -np.inf, 1e-45], [3.4e38, -3.4e38, np.nan]])
+        self.assertRoundTrip(values, (3, 3))
+
+    def testNegativeZeroKeepsSign(self):
+        for codec in ObservationCodec.codecs:
+            decoded = self.codec.decode(self.codec.encode(np.array([[1.0], [-0.0]]), codec), codec)
+            self.assertTrue(np.signbit(decoded[1, 0]))
+
+    def testZeroSamples(self):
+        self.assertRoundTrip(np.zeros((0, 4)), (0, 4))
+
+    def testZeroSamplesOneDimension(self):
+        self.assertRoundTrip(np.zeros(0), (0, 1))
+
+    def testOneDimension(self):
+        self.assertRoundTrip(np.array([1.5, np.nan, -np.inf, -0.0]), (4, 1))
+
+    def testDecodeFromMemoryview(self):
+        encoded = memoryview(self.codec.encode(np.eye(3), 'delta'))
+        np.testing.assert_array_equal(self.codec.decode(encoded, 'delta'), np.eye(3, dtype='<f4'))
+
+    def testUnknownCodec(self):
+        with self.assertRaises(ValueError):
+            self.codec.encode(np.eye(2), 'gzip')
+        with self.assertRaises(ValueError):
+            self.codec.decode(self.codec.encode(np.eye(2), 'float32'), 'gzip')
+
+
+if __name__ == "__main__":
+    unittest.main()
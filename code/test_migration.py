@@ -0,0 +1,131 @@
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+from staging import FileReader
+from migration import VaultMigration
+
+
+"""
+
+Migration tests
+--------------------------------------
+
+This python file checks the changes VaultMigration plans for a data vault created by the first version of dataVault.sql, whose create table
+statements are kept in baselineScript.
+
+Execute the tests from the code folder
+    python -m unittest test_migration
+
+"""
+# the create table statements of the first version of dataVault.sql
+baselineScript = """\
+create table "HubExperiment"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY ("sequence","timestamp","source"));
+create table "HubTreatment"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"experiment" text not null REFERENCES "HubExperiment"("sequence"),PRIMARY KEY ("sequence","timestamp","source"));
+create table "HubFactor"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"experiment" text not null REFERENCES "HubExperiment"("sequence"),"isCofactor" bool DEFAULT false,PRIMARY KEY("sequence","timestamp","source","experiment"));
+create table "SatFactorName"("sequence" text not null REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatFactorLevel"("sequence" text not null unique REFERENCES "HubFactor"("sequence"),"timestamp" timestamp not null,"source" text not null,"levelValue"  varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatTreatmentFactorLevel"("sequence" text not null REFERENCES "HubTreatment"("sequence"),"timestamp" timestamp not null,"source" text not null,"factorLevel"  text not null REFERENCES "SatFactorLevel"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatExperimentTitle"("sequence" text not null REFERENCES "HubExperiment"("sequence"),"timestamp" timestamp not null,"source" text not null,"title"  varchar(255),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatExperimentAcronym"("sequence" text not null REFERENCES "HubExperiment"("sequence"),"timestamp" timestamp not null,"source" text not null,"acronym"  varchar(15),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubExperimentalUnit"("sequence" text not null unique ,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
+create table "ParticipatesIn"("sequence" text not null unique ,"timestamp" timestamp not null,"source" text not null,"experimentalUnit" text not null REFERENCES "HubExperimentalUnit"("sequence"),"experiment" text not null REFERENCES "HubExperiment"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatExperimentalUnitIdentifier"("sequence" text not null REFERENCES "ParticipatesIn"("sequence"),"timestamp" timestamp not null,"source" text not null,"ID" varchar(15),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubSubject"("sequence" text not null unique REFERENCES "HubExperimentalUnit"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatSubjectAge"("sequence" text not null REFERENCES "HubSubject"("sequence"),"timestamp" timestamp not null,"source" text not null,"age" int,PRIMARY KEY("sequence","timestamp","source"));
+create table "SatSubjectName"("sequence" text not null REFERENCES "HubSubject"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubGroup"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"treatment" text not null REFERENCES "HubTreatment"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "AssignedTo"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"experimentalUnit" text not null REFERENCES "HubExperimentalUnit"("sequence"),"group" text not null REFERENCES "HubGroup"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatGroupName"("sequence" text not null REFERENCES "HubGroup"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubSession"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
+create table "SatSessionName"("sequence" text not null REFERENCES "HubSession"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "AttendsSession"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"experimentalUnit" text not null REFERENCES "HubExperimentalUnit"("sequence"),"group" text not null REFERENCES "HubGroup"("sequence"),"session" text not null REFERENCES "HubSession"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "HubObservation"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,"collectedAtSession" text not null REFERENCES "HubSession"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatObservationName"("sequence" text not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"source" text not null,"name" varchar(40),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatObservationValue"("sequence" text not null REFERENCES "HubObservation"("sequence"),"timestamp" timestamp not null,"source" text not null,"value" float(8)[][],"timestamps" timestamp[],PRIMARY KEY("sequence","timestamp","source"));
+create table "HubMetaData"("sequence" text not null unique,"timestamp" timestamp not null,"source" text not null,PRIMARY KEY("sequence","timestamp","source"));
+create table "ObservationMetaData"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"observation" text not null REFERENCES "HubObservation"("sequence"),"metadata" text not null REFERENCES "HubMetaData"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SessionMetaData"("sequence" text not null,"timestamp" timestamp not null,"source" text not null,"session" text not null REFERENCES "HubSession"("sequence"),"metadata" text not null REFERENCES "HubMetaData"("sequence"),PRIMARY KEY("sequence","timestamp","source"));
+create table "SatMetaDataKeyValuePair"("sequence" text not null REFERENCES "HubMetaData"("sequence"),"timestamp" timestamp not null,"source" text not null,"key" varchar(40) not null,"value" bytea,PRIMARY KEY("sequence","timestamp","source"));
+"""
+
+
+class VaultMigrationTest(unittest.TestCase):
+    """
+    VaultMigrationTest compares the tables of the first version of dataVault.sql with the tables of the current script
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.NamedTemporaryFile('w', suffix = '.sql', delete = False) as script:
+            script.write(baselineScript)
+        cls.baselineScript = script.name
+        cls.baseline = VaultMigration(None, vaultScript = cls.baselineScript)
+        cls.migration = VaultMigration(None)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.baselineScript)
+
+    def baselineColumns(self) -> dict:
+        return {table: [column for column, columnType in columns] for table, columns in self.baseline.tableColumns().items()}
+
+    def testMissingTables(self):
+        missing = set(self.migration.tableColumns()) - set(self.baseline.tableColumns())
+        self.assertIn('SatObservationChunk', missing)
+        self.assertEqual(set(table for table in missing if not table.startswith(('Pit', 'Bridge'))), {'SatObservationChunk', 'LoadLog'})
+
+    def testObservationValueColumns(self):
+        missing = self.migration.missingColumns(self.baselineColumns())
+        self.assertEqual(missing['SatObservationValue'], [('hashDiff', 'text'), ('codec', 'text'), ('encodedValue', 'bytea'), ('startTime', 'timestamp'),
+                                                          ('samplePeriod', 'float(8)'), ('sampleCount', 'integer'), ('experimentType', 'varchar(15)')])
+        self.assertIn('timestamps', self.baselineColumns()['SatObservationValue'])
+
+    def testHashDiffColumns(self):
+        missing = self.migration.missingColumns(self.baselineColumns())
+        self.assertEqual(missing['SatFactorName'], [('hashDiff', 'text')])
+        self.assertEqual(missing['ObservationMetaData'], [('hashDiff', 'text')])
+        # the hubs and SatFactorLevel are insert only and get no hashDiff
+        self.assertNotIn('SatFactorLevel', missing)
+        self.assertNotIn('HubObservation', missing)
+
+    def testMissingColumnsOfCurrentScript(self):
+        self.assertEqual(self.migration.missingColumns({table: [column for column, columnType in columns] for table, columns in self.migration.tableColumns().items()}), {})
+
+    def testChangedPrimaryKeys(self):
+        self.assertEqual(self.migration.changedPrimaryKeys(self.baseline.primaryKeyColumns()), {
+            'SatTreatmentFactorLevel': ['sequence', 'factorLevel', 'timestamp', 'source'],
+            'ObservationMetaData': ['sequence', 'observation', 'timestamp', 'source'],
+            'SatMetaDataKeyValuePair': ['sequence', 'key', 'timestamp', 'source']})
+
+    def testTextKeysBecomeUuid(self):
+        # every text column of the first version referencing a hub or a satellite is a uuid column of the current script
+        hashKeys = self.migration.hashKeyColumns()
+        for table, columns in self.baseline.tableColumns().items():
+            textKeys = [column for column, columnType in columns if columnType == 'text' and column not in ('source', 'hashDiff')]
+            with self.subTest(table = table):
+                self.assertEqual(textKeys, hashKeys[table])
+        self.assertEqual(hashKeys['SatTreatmentFactorLevel'], ['sequence', 'factorLevel'])
+
+
+    def testMetaDataTextArrays(self):
+        # the first version kept the text of the .hdr arrays, a single line as a one dimensional array and an empty block as an empty float array
+        r = FileReader()
+        lines = ['[GainSettings]\n', 'Gains="#\n', '6\t7\n', '5\t5\n', '#"\n', '[Markers]\n', 'Events="#\n', '#"\n', '[DarkNoise]\n', 'Wavelength1="#\n', '0.5\t1.25\n', '#"\n']
+        sections = r.indexSections(lines)
+        for key, field, value in [('Gains', 'GainSettings', np.array([['6', '7'], ['5', '5']])), ('Events', 'Markers', np.array([])), ('Wavelength1', 'DarkNoise', np.array(['0.5', '1.25']))]:
+            with self.subTest(key = key):
+                # the pickled value is the one the staging layer loads, so its hashDiff is the hashDiff of a load of the same file
+                self.assertEqual(pickle.dumps(self.migration.metaDataValue(key, value)), pickle.dumps(r.getArray(lines, sections, field, [], [key], r.arrayTypes)[key]))
+
+    def testMetaDataValuesKept(self):
+        numeric = np.array([[6, 7]])
+        self.assertIs(self.migration.metaDataValue('Gains', numeric), numeric)
+        self.assertEqual(self.migration.metaDataValue('Notes', 'first session'), 'first session')
+        text = np.array([['n/a', '7']])
+        self.assertIs(self.migration.metaDataValue('Gains', text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import hashlib
+import unittest
+import numpy as np
+import pandas as pd
+from staging import HashKeyRegistry, FileLoader
+
+
+"""
+
+Staging tests
+--------------------------------------
+
+This python file checks the hash keys of HashKeyRegistry and the hashDiff of FileLoader, which decide which rows the staging layer loads, and the order the bulk loaders merge the tables in.
+
+Execute the tests from the code folder
+    python -m unittest test_staging
+
+"""
+class HashKeyRegistryTest(unittest.TestCase):
+    """
+    HashKeyRegistryTest checks the business keys and their hash keys
+    """
+
+    def testBusinessKeys(self):
+        keys = HashKeyRegistry().businessKeys(['01/10/2022 10:00:00', '02/10/2022'], ['S01', 'S02'], [1, 2])
+        self.assertEqual(keys.tolist(), ['01/10/2022 10:00:00_S01_1', '02/10/2022_S02_2'])
+
+    def testHashKeyIsMd5AsUuid(self):
+        hashKeys = HashKeyRegistry().hashKeys(['a', 'b'])
+        self.assertEqual(hashKeys.tolist(), ['0cc175b9-c0f1-b6a8-31c3-99e269772661', '92eb5ffe-e6ae-2fec-3ad7-1c777531578f'])
+        # the hex digits of the uuid are the md5 text keys of the vaults created before the keys were stored as uuid
+        self.assertEqual(hashKeys[0].replace('-', ''), hashlib.md5(b'a').hexdigest())
+
+    def testRepeatedKeys(self):
+        hashKeys = HashKeyRegistry().hashKeys(pd.Series(['a', 'b', 'a'], index=[5, 6, 7]))
+        self.assertEqual(hashKeys.index.tolist(), [5, 6, 7])
+        self.assertEqual(hashKeys[5], hashKeys[7])
+        self.assertNotEqual(hashKeys[5], hashKeys[6])
+
+    def testRegistryLimit(self):
+        # the keys hashed after the registry is emptied are the same as the keys of a new registry
+        registry = HashKeyRegistry(maxKeys = 2)
+        registry.hashKeys(['a', 'b', 'c'])
+        self.assertEqual(registry.hashKeys(['c', 'd', 'a']).tolist(), HashKeyRegistry().hashKeys(['c', 'd', 'a']).tolist())
+
+    def testUnicodeKey(self):
+        self.assertEqual(HashKeyRegistry().hashKeys(['Prä']).tolist()[0].replace('-', ''), hashlib.md5('Prä'.encode('utf-8')).hexdigest())
+
+
+class HashDiffTest(unittest.TestCase):
+    """
+    HashDiffTest checks that the hashDiff of a row changes exactly when its descriptive columns change
+    """
+
+    def setUp(self):
+        self.loader = FileLoader()
+
+    def testKnownValue(self):
+        hashDiff = self.loader.hashDiff(pd.DataFrame({'sequence': ['a1'], 'name': ['HbO']}), ['name'])
+        self.assertEqual(hashDiff[0], hashlib.md5(b'HbO').hexdigest())
+
+    def testColumnsAreJoined(self):
+        frame = pd.DataFrame({'first': ['a', 'a|b'], 'second': ['b|c', 'c']})
+        hashDiff = self.loader.hashDiff(frame, ['first', 'second'])
+        self.assertEqual(hashDiff[0], hashlib.md5(b'a|b|c').hexdigest())
+
+    def testKeyColumnsAreIgnored(self):
+        frame = pd.DataFrame({'sequence': ['a1', 'b2'], 'name': ['HbO', 'HbO']}, index=[3, 4])
+        hashDiff = self.loader.hashDiff(frame, ['name'])
+        self.assertEqual(hashDiff.index.tolist(), [3, 4])
+        self.assertEqual(hashDiff[3], hashDiff[4])
+
+    def testChangedColumn(self):
+        frame = pd.DataFrame({'name': ['HbO', 'HbR'], 'age': [7, 7]})
+        hashDiff = self.loader.hashDiff(frame, ['name', 'age'])
+        self.assertNotEqual(hashDiff[0], hashDiff[1])
+
+    def testBytesAndArrays(self):
+        frame = pd.DataFrame({'value': [b'\x00\x01', b'\x00\x02'], 'matrix': [np.eye(2), np.eye(2)]})
+        hashDiff = self.loader.hashDiff(frame, ['value', 'matrix'])
+        self.assertEqual(hashDiff[0], hashlib.md5(('0001|' + hashlib.md5(np.eye(2).tobytes()).hexdigest()).encode('utf-8')).hexdigest())
+        self.assertNotEqual(hashDiff[0], hashDiff[1])
+
+    def testChangedMatrix(self):
+        changed = np.eye(2)
+        changed[1, 1] = np.nextafter(1.0, 2.0)
+        hashDiff = self.loader.hashDiff(pd.DataFrame({'matrix': [np.eye(2), changed, np.eye(2).T]}), ['matrix'])
+        self.assertNotEqual(hashDiff[0], hashDiff[1])
+        self.assertEqual(hashDiff[0], hashDiff[2])
+
+    def testObservationMatrixAsStored(self):
+        # the vault stores the matrices as float32, a matrix read back from the vault has the hashDiff of the loaded matrix
+        values = np.array([[0.1234567891, 2.0], [np.pi, -1e-9]])
+        frame = pd.DataFrame({'value': [values, values.astype('<f4').tolist(), values + 1e-3], 'startTime': [pd.Timestamp('2022-12-01')] * 3,
+                              'samplePeriod': [0.128] * 3, 'sampleCount': [2] * 3})
+        hashDiff = self.loader.observationHashDiff(frame)
+        self.assertEqual(hashDiff[0], hashDiff[1])
+        self.assertNotEqual(hashDiff[0], hashDiff[2])
+
+    def testNoColumns(self):
+        hashDiff = self.loader.hashDiff(pd.DataFrame({'sequence': ['a1', 'b2']}), [])
+        self.assertEqual(hashDiff.tolist(), [hashlib.md5(b'').hexdigest()] * 2)
+
+    def testEmptyFrame(self):
+        self.assertEqual(len(self.loader.hashDiff(pd.DataFrame({'name': []}), ['name'])), 0)
+
+
+class MergeOrderTest(unittest.TestCase):
+    """
+    MergeOrderTest checks that the staged tables are merged after the tables their foreign keys reference
+    """
+
+    def setUp(self):
+        self.loader = FileLoader()
+        graph = {'HubExperiment': set(), 'HubTreatment': {'HubExperiment'}, 'HubGroup': {'HubTreatment'}, 'SatExperimentTitle': {'HubExperiment'}}
+        self.loader.dependencyGraph = lambda cursor, tables: {table: graph[table] & set(tables) for table in tables}
+
+    def testReferencedTablesFirst(self):
+        order = self.loader.mergeOrder(None, ['HubGroup', 'SatExperimentTitle', 'HubTreatment', 'HubExperiment'])
+        self.assertEqual(order, ['HubExperiment', 'SatExperimentTitle', 'HubTreatment', 'HubGroup'])
+
+    def testIndependentTablesKeepOrder(self):
+        self.assertEqual(self.loader.mergeOrder(None, ['HubGroup', 'SatExperimentTitle']), ['HubGroup', 'SatExperimentTitle'])
+
+    def testCycle(self):
+        self.loader.dependencyGraph = lambda cursor, tables: {'HubExperiment': {'HubTreatment'}, 'HubTreatment': {'HubExperiment'}}
+        with self.assertRaises(ValueError):
+            self.loader.mergeOrder(None, ['HubExperiment', 'HubTreatment'])
+
+
+if __name__ == "__main__":
+    unittest.main()